@@ -1,162 +1,1035 @@
 import os
-import json
+import re
+import time
 import pickle
-from collections import Counter, defaultdict, deque
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, deque, namedtuple
+from itertools import islice
 from tqdm import tqdm
-import torch
-from transformers import pipeline, AutoTokenizer
 from concurrent.futures import ThreadPoolExecutor
+from index_format import (write_index, is_binary_index, IndexReader, fold_name,
+                          PostingsView, FrequencyView, CooccurrenceView, DocList)
+from manifest import Manifest, manifest_path, bytes_hash
+from ner_cache import NERCache
+from cooccurrence import CooccurrenceGraph, SCOPES
+from query import parse, evaluate
+from timeline import Timeline, to_ordinal, day_range, top_between, trending, last_day
+from corpus import (json_decoder, strip_bom, pack_shards, shard_files, iter_shard_records,
+                    read_path_list)
+from ner_backends import BACKENDS, backend_tag, export_onnx, load_pipeline
+from gazetteer import Gazetteer, HybridNER
+from metrics import METRICS
+
+INDEX_PATH = 'index.bin'
+NER_CACHE_PATH = 'ner_cache.db'
 
 class IndexManager:
-    def __init__(self):
+    def __init__(self, cooccurrence_scope=None, window=None, max_pairs=None):
+        # Constructor arguments, so shard workers can build a matching IndexManager.
+        # See cooccurrence.CooccurrenceGraph for the scope/window/max_pairs options;
+        # scope and window left as None mean 'chunk' and 200 for a new index, and
+        # whatever the index was built with after load()
+        self.options = {'cooccurrence_scope': cooccurrence_scope, 'window': window,
+                        'max_pairs': max_pairs}
         self.inverted_index = defaultdict(set)
         self.entity_frequency = Counter()
-        self.co_occurrence = defaultdict(Counter)
+        self.entity_types = defaultdict(Counter)
+        self.co_occurrence = CooccurrenceGraph(**self.cooccurrence_options)
+        self.timeline = Timeline()
+        self.reader = None
+        self._folded = None
     
+    @property
+    def cooccurrence_options(self):
+        """self.options under CooccurrenceGraph's argument names, defaults filled in."""
+        options = self.options
+        return {'scope': options['cooccurrence_scope'] or 'chunk',
+                'window': 200 if options['window'] is None else options['window'],
+                'max_pairs': options['max_pairs']}
+
+    def _check_cooccurrence(self, scope, window, source, explicit_only=False):
+        """
+        Refuse co-occurrence counts made with other settings than this
+        manager's: adding or retracting them would not cancel out. With
+        explicit_only, settings left as None are not compared (load() adopts them).
+        """
+        options = self.cooccurrence_options
+        check_scope = not explicit_only or self.options['cooccurrence_scope'] is not None
+        check_window = not explicit_only or self.options['window'] is not None
+        if (check_scope and scope != options['scope']) or \
+                (scope == 'window' and check_window and window != options['window']):
+            raise ValueError(f"{source} counts co-occurrence with scope={scope!r}, window={window}, "
+                             f"but this IndexManager is set to scope={options['scope']!r}, "
+                             f"window={options['window']}")
+
     def add_document(self, file_path, entities):
-        # entities is a list of (entity_text, entity_type)
-        unique_entities = set([e[0] for e in entities])
-        
-        for entity_text, _ in entities:
+        self._ensure_mutable()
+        self._folded = None
+        # entities is a list of (entity_text, entity_type[, start, end, sentence])
+        for e in entities:
+             entity_text = e[0]
              self.inverted_index[entity_text].add(file_path)
              self.entity_frequency[entity_text] += 1
-             
-        unique_list = list(unique_entities)
-        for i in range(len(unique_list)):
-            e1 = unique_list[i]
-            for j in range(i + 1, len(unique_list)):
-                e2 = unique_list[j]
-                self.co_occurrence[e1][e2] += 1
-                self.co_occurrence[e2][e1] += 1
-
-    def save(self, path='index.pkl'):
-        # Convert to standard dicts
-        with open(path, 'wb') as f:
-            pickle.dump({
-                'inverted_index': dict(self.inverted_index),
-                'entity_frequency': self.entity_frequency,
-                'co_occurrence': dict(self.co_occurrence)
-            }, f)
-        print(f"Index saved to {path} with {len(self.inverted_index)} entities.")
-
-    def load(self, path='index.pkl'):
-        pass
+             self.entity_types[entity_text][e[1]] += 1
+
+        self.co_occurrence.add(entities)
+        self.timeline.add(file_path, entities)
+
+    def remove_document(self, file_path, chunks):
+        """
+        Retract everything `file_path` contributed. `chunks` are the entity
+        lists that were passed to add_document for each of its chunks.
+        """
+        self._ensure_mutable()
+        self._folded = None
+        touched = set()
+        for entities in chunks:
+            for e in entities:
+                entity_text = e[0]
+                touched.add(entity_text)
+                self.entity_frequency[entity_text] -= 1
+                if self.entity_frequency[entity_text] <= 0:
+                    del self.entity_frequency[entity_text]
+                types = self.entity_types.get(entity_text)
+                if types is not None:
+                    types[e[1]] -= 1
+                    if types[e[1]] <= 0:
+                        del types[e[1]]
+                    if not types:
+                        del self.entity_types[entity_text]
+            self.co_occurrence.remove(entities)
+            self.timeline.remove(file_path, entities)
+
+        for entity_text in touched:
+            postings = self.inverted_index.get(entity_text)
+            if postings is not None:
+                postings.discard(file_path)
+                if not postings:
+                    del self.inverted_index[entity_text]
+
+    def merge(self, other):
+        """
+        Fold a partial index (e.g. from another shard) into this one.
+        Posting sets are unioned, frequencies and co-occurrence weights added.
+        `other` hands over its containers and should not be used afterwards.
+        """
+        other_options = other.cooccurrence_options
+        self._check_cooccurrence(other_options['scope'], other_options['window'], "the merged index")
+        self._ensure_mutable()
+        other._ensure_mutable()
+        self._folded = None
+        for entity, paths in other.inverted_index.items():
+            postings = self.inverted_index.get(entity)
+            if postings is None:
+                self.inverted_index[entity] = paths
+            else:
+                postings |= paths
+        self.entity_frequency.update(other.entity_frequency)
+        for entity, types in other.entity_types.items():
+            self.entity_types[entity].update(types)
+        self.co_occurrence.merge(other.co_occurrence)
+        self.timeline.merge(other.timeline)
+        return self
+
+    # --- Queries ---
+    # On a loaded index these are answered straight from the mapped file:
+    # exact lookups are a binary search, top-k reads a pre-sorted table.
+
+    def search(self, entity):
+        """Paths of the articles mentioning `entity` (exact name)."""
+        if self.reader is not None:
+            i = self.reader.find(entity)
+            return DocList(self.reader, self.reader.postings(i) if i >= 0 else ())
+        return sorted(self.inverted_index.get(entity, ()))
+
+    def boolean_search(self, query, page=1, per_page=10):
+        """
+        Articles matching a boolean entity query such as
+        '"Hà Nội" AND "Bộ Y tế" NOT "COVID"' (see query.py).
+        A name without an exact match stands for all its case/diacritic
+        variants. Returns (total matches, paths of the requested page).
+        Raises query.QueryError on a malformed query.
+        """
+        reader = self.reader
+        if reader is not None:
+            def lookup(name):
+                i = reader.find(name)
+                ids = [i] if i >= 0 else reader.find_folded(name)
+                return [reader.posting_list(i) for i in ids]
+            universe = lambda: list(range(reader.n_docs))
+        else:
+            def lookup(name):
+                names = [name] if name in self.inverted_index else self.resolve(name)
+                return [sorted(self.inverted_index[n]) for n in names]
+            universe = lambda: sorted(set().union(*self.inverted_index.values()))
+
+        matches = evaluate(parse(query), lookup, universe)
+        start = (page - 1) * per_page
+        hits = matches[start:start + per_page]
+        if reader is not None:
+            hits = [reader.doc(d) for d in hits]
+        return len(matches), hits
+
+    def resolve(self, keyword):
+        """
+        Entity names matching `keyword` ignoring case and diacritics,
+        most frequent first. An exact match always comes first.
+        """
+        if self.reader is not None:
+            ids = self.reader.find_folded(keyword)
+            freq = self.reader.frequency
+            ids.sort(key=lambda i: -freq(i))
+            names = [self.reader.entity(i) for i in ids]
+        else:
+            if self._folded is None:
+                self._folded = defaultdict(list)
+                for name in self.inverted_index:
+                    self._folded[fold_name(name)].append(name)
+            names = sorted(self._folded.get(fold_name(keyword), ()),
+                           key=lambda name: -self.entity_frequency[name])
+        if keyword in names:
+            names.remove(keyword)
+            names.insert(0, keyword)
+        return names
+
+    def entity_type(self, entity):
+        """Most frequent NER type of `entity` ('PER', 'LOC', 'ORG') or None."""
+        if self.reader is not None:
+            i = self.reader.find(entity)
+            return self.reader.entity_type(i) if i >= 0 else None
+        types = self.entity_types.get(entity)
+        return types.most_common(1)[0][0] if types else None
+
+    def get_top_entities(self, k=20):
+        return self.entity_frequency.most_common(k)
+
+    # --- Time-sliced queries ---
+    # Days are date objects, 'YYYY-MM-DD' strings or date ordinals; ranges
+    # are inclusive. Each per-entity count is O(log T) on a loaded index.
+
+    def _ranked(self):
+        """(entity, total mentions), most frequent first."""
+        if self.reader is not None:
+            reader = self.reader
+            return ((i, reader.frequency(i)) for i in reader.top_entities(reader.n_entities))
+        return iter(self.entity_frequency.most_common())
+
+    def _count_between(self):
+        if self.reader is not None:
+            return self.reader.mentions_between
+        return self.timeline.count
+
+    def _named(self, rows):
+        if self.reader is None:
+            return rows
+        return [(self.reader.entity(row[0]),) + tuple(row[1:]) for row in rows]
+
+    def last_day(self):
+        """Most recent publish date in the index, as a date ordinal (None if undated)."""
+        if self.reader is not None:
+            return self.reader.last_day
+        return last_day(self.timeline.days)
+
+    def mentions_between(self, entity, start, end):
+        start, end = to_ordinal(start), to_ordinal(end)
+        if self.reader is not None:
+            i = self.reader.find(entity)
+            return self.reader.mentions_between(i, start, end) if i >= 0 else 0
+        return self.timeline.count(entity, start, end)
+
+    def get_top_entities_between(self, start, end, k=20):
+        """Top-k entities by mentions in articles published from `start` to `end`."""
+        rows = top_between(self._ranked(), self._count_between(),
+                           to_ordinal(start), to_ordinal(end), k)
+        return self._named(rows)
+
+    def get_trending_entities(self, days=7, end=None, k=20):
+        """
+        Entities gaining the most mentions in the last `days` days up to
+        `end` (default: the newest article) over the `days` before, as
+        (entity, current, previous).
+        """
+        end = to_ordinal(end) if end is not None else self.last_day()
+        if end is None:
+            return []
+        return self._named(trending(self._ranked(), self._count_between(), end, days, k))
+
+    def get_frequency_series(self, entity, start=None, end=None):
+        """Daily mentions of `entity` as [(date, count)], zero days included."""
+        if self.reader is not None:
+            i = self.reader.find(entity)
+            counts = dict(self.reader.day_counts(i)) if i >= 0 else {}
+        else:
+            counts = dict(self.timeline.series(entity))
+        if not counts:
+            return []
+        start = to_ordinal(start) if start is not None else min(counts)
+        end = to_ordinal(end) if end is not None else max(counts)
+        return [(day, counts.get(day.toordinal(), 0)) for day in day_range(start, end)]
+
+    def get_entity_sources(self, entity):
+        """[(source site, mentions)] of `entity`, most mentions first."""
+        if self.reader is not None:
+            i = self.reader.find(entity)
+            return self.reader.source_counts(i) if i >= 0 else []
+        return self.timeline.source_counts(entity)
+
+    def get_related_entities(self, entity, k=10):
+        """Top-k co-occurring entities as (name, weight), heaviest first."""
+        if self.reader is not None:
+            i = self.reader.find(entity)
+            if i < 0:
+                return []
+            nbrs, wts = self.reader.neighbors(i)
+            return [(self.reader.entity(j), w) for j, w in zip(nbrs[:k], wts[:k])]
+        return self.co_occurrence.related(entity, k)
+
+    def _ensure_mutable(self):
+        # A loaded index is a read-only view over the mapped file; copy it
+        # into plain dicts the first time someone wants to modify it.
+        if self.reader is None:
+            return
+        inverted_index = defaultdict(set)
+        for entity, paths in self.inverted_index.items():
+            inverted_index[entity] = set(paths)
+        entity_frequency = Counter(dict(self.entity_frequency.items()))
+        co_occurrence = CooccurrenceGraph(**self.cooccurrence_options)
+        entity_types = defaultdict(Counter)
+        timeline = Timeline()
+        reader = self.reader
+        for i in range(reader.n_entities):
+            name = reader.entity(i)
+            for day, n in reader.day_counts(i):
+                timeline.days[name][day] = n
+            for source, n in reader.source_counts(i):
+                timeline.sources[name][source] = n
+            # Only the majority type is saved; carry it with the full count
+            if reader.entity_type(i) and reader.frequency(i):
+                entity_types[name][reader.entity_type(i)] = reader.frequency(i)
+            for j, w in zip(*reader.neighbors(i)):
+                if j > i:
+                    co_occurrence.add_pair(name, reader.entity(j), w)
+        self.close()
+        self.inverted_index = inverted_index
+        self.entity_frequency = entity_frequency
+        self.entity_types = entity_types
+        self.co_occurrence = co_occurrence
+        self.timeline = timeline
+
+    def save(self, path=INDEX_PATH):
+        self._ensure_mutable()
+        n_entities, n_docs = write_index(path, self.inverted_index,
+                                         self.entity_frequency, self.co_occurrence,
+                                         self.entity_types, self.timeline)
+        print(f"Index saved to {path} with {n_entities} entities over {n_docs} documents.")
+
+    def load(self, path=INDEX_PATH):
+        """
+        Memory-map a binary index. The tables become read-only views, so
+        opening is near-instant and only the pages a query touches are read.
+        Older pickled indexes are still accepted and loaded fully.
+        The co-occurrence scope and window saved with the index replace this
+        manager's; ValueError if they were set explicitly and differ.
+        """
+        self.close()
+        if not is_binary_index(path):
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+            self.inverted_index = defaultdict(set, data['inverted_index'])
+            self.entity_frequency = Counter(data['entity_frequency'])
+            self.entity_types = defaultdict(Counter)
+            self.timeline = Timeline()
+            self.co_occurrence = CooccurrenceGraph.from_mapping(data['co_occurrence'],
+                                                                **self.cooccurrence_options)
+            return self
+
+        reader = IndexReader(path)
+        if reader.cooccurrence_scope is not None:
+            try:
+                self._check_cooccurrence(reader.cooccurrence_scope, reader.cooccurrence_window,
+                                         path, explicit_only=True)
+            except ValueError:
+                reader.close()
+                raise
+            self.options['cooccurrence_scope'] = reader.cooccurrence_scope
+            self.options['window'] = reader.cooccurrence_window
+        self.reader = reader
+        self.inverted_index = PostingsView(self.reader)
+        self.entity_frequency = FrequencyView(self.reader)
+        self.co_occurrence = CooccurrenceView(self.reader)
+        return self
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
 
 class DataLoader:
-    def __init__(self, root_dir):
+    """
+    Finds and parses crawl articles.
+    Files are discovered lazily with os.scandir, so work can start before
+    the whole tree has been walked. With `shard_dir`, articles are read from
+    shards written by corpus.pack_shards instead of individual files.
+    Paths in `exclude` (e.g. near-duplicate articles) are skipped.
+    Parse failures are counted per exception type (see report_errors).
+    """
+    def __init__(self, root_dir, shard_dir=None, json_backend='auto', io_workers=4, exclude=None):
         self.root_dir = root_dir
+        self.shard_dir = shard_dir
+        self.io_workers = io_workers
+        self.exclude = {os.path.normpath(p) for p in exclude} if exclude else None
+        self.json_backend, self._loads = json_decoder(json_backend)
+        self.parsed = 0
+        self.errors = Counter()
+        self.error_samples = []
+
+    def iter_files(self):
+        """Yields .txt paths as they are found (iterative, no recursion)."""
+        stack = [self.root_dir]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    subdirs = []
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.endswith(".txt") and not self._excluded(entry.path):
+                            yield entry.path
+            except OSError as e:
+                self._record_error(directory, e)
+                continue
+            # Reverse so directories are visited in listing order
+            stack.extend(reversed(subdirs))
+
+    def _excluded(self, path):
+        return self.exclude is not None and os.path.normpath(path) in self.exclude
 
     def get_files(self):
-        file_paths = []
-        for root, _, files in os.walk(self.root_dir):
-            for file in files:
-                if file.endswith(".txt"):
-                    file_paths.append(os.path.join(root, file))
-        return file_paths
+        if self.shard_dir:
+            return [path for shard in shard_files(self.shard_dir)
+                    for path, _ in iter_shard_records(shard) if not self._excluded(path)]
+        return list(self.iter_files())
 
-    def parse_file(self, file_path):
+    def fingerprints(self):
+        """
+        For a shard loader, path -> (shard name, shard mtime, record size,
+        record hash) of every article, which the manifest records instead of
+        stat-ing the original file. None when reading plain files.
+        """
+        if not self.shard_dir:
+            return None
+        prints = {}
+        for shard in shard_files(self.shard_dir):
+            name, mtime = os.path.basename(shard), os.stat(shard).st_mtime
+            for path, raw in iter_shard_records(shard):
+                if not self._excluded(path):
+                    prints[path] = (name, mtime, len(raw), bytes_hash(raw))
+        return prints
+
+    def parse_bytes(self, file_path, raw):
         try:
-            with open(file_path, 'r', encoding='utf-8-sig') as f:
-                content = f.read()
-                data = json.loads(content)
-                text = f"{data.get('Subject', '')} . {data.get('Summary', '')} . {data.get('Content', '')}"
-                return text
-        except Exception:
+            data = self._loads(strip_bom(raw))
+            text = f"{data.get('Subject', '')} . {data.get('Summary', '')} . {data.get('Content', '')}"
+            self.parsed += 1
+            return text
+        except Exception as e:
+            self._record_error(file_path, e)
             return ""
 
-# Global queue to track which file each chunk belongs to.
-chunk_file_map = deque()
+    def parse_file(self, file_path):
+        with METRICS.stage('io'):
+            try:
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+            except OSError as e:
+                self._record_error(file_path, e)
+                return ""
+            return self.parse_bytes(file_path, raw)
+
+    def _record_error(self, path, error):
+        self.errors[type(error).__name__] += 1
+        if len(self.error_samples) < 20:
+            self.error_samples.append((path, str(error)))
 
-def data_generator(loader, files, tokenizer, max_tokens=500):
+    def report_errors(self):
+        total = sum(self.errors.values())
+        print(f"Parsed {self.parsed} articles, {total} failures"
+              + (f" ({', '.join(f'{k}: {v}' for k, v in self.errors.most_common())})" if total else ""))
+        for path, message in self.error_samples[:5]:
+            print(f"  - {path}: {message}")
+
+    def iter_documents(self, files=None):
+        """
+        Yields (path, text) for `files`, or for every article if files is None.
+        File reads run on a small thread pool with a bounded read-ahead, so
+        discovery, I/O and the consumer overlap without queueing the whole crawl.
+        """
+        if self.shard_dir:
+            wanted = set(files) if files is not None else None
+            for shard in shard_files(self.shard_dir):
+                for path, raw in iter_shard_records(shard):
+                    if (path in wanted) if wanted is not None else not self._excluded(path):
+                        yield path, self.parse_bytes(path, raw)
+            return
+
+        paths = iter(files) if files is not None else self.iter_files()
+        read_ahead = self.io_workers * 8
+        # Named threads, so they are easy to tell apart in py-spy output
+        with ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='io') as executor:
+            pending = deque()
+            for path in paths:
+                pending.append((path, executor.submit(self.parse_file, path)))
+                if len(pending) >= read_ahead:
+                    # Reads already finished and waiting: near 0 means I/O bound,
+                    # near read_ahead means the consumer is the bottleneck
+                    METRICS.sample_queue('read_ahead', sum(f.done() for _, f in pending))
+                    path, future = pending.popleft()
+                    yield path, future.result()
+            while pending:
+                path, future = pending.popleft()
+                yield path, future.result()
+
+# A chunk knows which file it came from and where it sits in that file's
+# text, so results never depend on the pipeline keeping input order and
+# several pipelines can run side by side. Consecutive chunks of a file
+# overlap; [own_start, own_end) is the part of the text this chunk is
+# responsible for, and entities starting outside it are dropped as
+# duplicates of the neighbouring chunk.
+Chunk = namedtuple('Chunk', 'file_id path start end text n_tokens own_start own_end')
+
+# A sentence ends at . ! ? or … (plus closing quotes/brackets) followed by
+# whitespace, or at a line break.
+SENTENCE_END = re.compile(r'[.!?…]+["”’)\]]*\s+|\n+')
+
+def split_chunks(text, tokenizer, max_tokens=500, overlap=64):
     """
-    Yields chunk text one by one.
-    Uses ThreadPoolExecutor to read files in parallel for IO bound speedup.
+    Cut `text` into chunks of at most `max_tokens` tokens, preferring
+    sentence boundaries, with about `overlap` tokens shared between
+    neighbours. Returns (start, end, n_tokens, own_start, own_end) character
+    spans; the text itself is sliced from the original, never decoded.
     """
-    # 4 workers is usually enough for disk IO without thrashing
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        # executor.map guarantees results match input order
-        results = executor.map(loader.parse_file, files)
-        
-        for file_path, text in zip(files, results):
-            if not text:
-                continue
-            
-            # Tokenize (fast tokenizer)
-            tokenized = tokenizer(text, add_special_tokens=False)
-            input_ids = tokenized['input_ids']
-            
-            # Split into chunks
-            for i in range(0, len(input_ids), max_tokens):
-                chunk_ids = input_ids[i : i + max_tokens]
-                if not chunk_ids: continue
-                
-                chunk_text = tokenizer.decode(chunk_ids)
-                
-                # Record mapping BEFORE yielding so it stays in sync
-                chunk_file_map.append(file_path)
-                yield chunk_text
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)['offset_mapping']
+    n = len(offsets)
+    if n == 0:
+        return []
+    starts = [o[0] for o in offsets]
+    # Token index at which each sentence starts
+    bounds = sorted({bisect_left(starts, m.end()) for m in SENTENCE_END.finditer(text)} - {0, n})
+    bounds = [b for b in bounds if b < n]
 
-def main():
-    root_dir = "/Users/nguyensiry/Documents/Code_practice/Data_structure_algorithms/BTL/Article_Crawl"
-    
-    print("Initializing Deep Learning Model (High Speed Mode)...")
-    device = -1
-    if torch.cuda.is_available():
-        device = 0
-    elif torch.backends.mps.is_available():
-        device = "mps" 
-        
-    print(f"Using device: {device}")
-    
-    model_name = "NlpHUST/ner-vietnamese-electra-base"
-    
+    spans = []
+    s = 0
+    while True:
+        hard = s + max_tokens
+        if hard >= n:
+            e = n
+        else:
+            # Last sentence boundary in the second half of the window, else a hard cut
+            j = bisect_right(bounds, hard) - 1
+            e = bounds[j] if j >= 0 and bounds[j] > s + max_tokens // 2 else hard
+        spans.append((s, e))
+        if e >= n:
+            break
+        # Restart at a sentence start inside the overlap; when the cut itself
+        # fell on a sentence boundary nothing is split, so no overlap is needed.
+        target = max(e - overlap, s + 1)
+        j = bisect_left(bounds, target)
+        if j < len(bounds) and bounds[j] < e:
+            s = bounds[j]
+        elif e in bounds[j:j + 1]:
+            s = e
+        else:
+            s = target
+
+    # Ownership cut between neighbours: middle of their shared characters
+    cuts = []
+    for (s1, e1), (s2, _) in zip(spans, spans[1:]):
+        a, b = starts[s2], offsets[e1 - 1][1]
+        cuts.append((a + b) // 2 if a < b else a)
+
+    chunks = []
+    for k, (s, e) in enumerate(spans):
+        own_start = cuts[k - 1] if k else 0
+        own_end = cuts[k] if k < len(cuts) else len(text)
+        chunks.append((starts[s], offsets[e - 1][1], e - s, own_start, own_end))
+    return chunks
+
+def data_generator(loader, files, tokenizer, max_tokens=500, overlap=64, chunk_log=None):
+    """
+    Yields Chunk records one by one, for `files` or (files=None) for every
+    article the loader discovers. File ids count documents in input order.
+    Every document read gets an entry in `chunk_log`, even one that yields
+    no chunks, so the manifest knows about it.
+    """
+    documents = METRICS.timed('read', loader.iter_documents(files))
+    for file_id, (file_path, text) in enumerate(documents):
+        METRICS.count('files')
+        if chunk_log is not None:
+            chunk_log.setdefault(file_path, [])
+        if not text:
+            continue
+
+        with METRICS.stage('tokenize'):
+            spans = split_chunks(text, tokenizer, max_tokens, overlap)
+        METRICS.count('chunks', len(spans))
+        for start, end, n_tokens, own_start, own_end in spans:
+            METRICS.count('tokens', n_tokens)
+            yield Chunk(file_id, file_path, start, end, text[start:end], n_tokens, own_start, own_end)
+
+def localize_entities(chunk, entities):
+    """
+    Shift chunk-relative entity offsets to file offsets and drop the ones
+    that start outside the chunk's ownership span (seen by a neighbour).
+    Each entity also gets the index of its sentence within the chunk, for
+    sentence-scoped co-occurrence.
+    Returns (text, type, start, end, sentence) tuples.
+    """
+    sentence_starts = [0] + [m.end() for m in SENTENCE_END.finditer(chunk.text)]
+    located = []
+    for text, entity_type, start, end in entities:
+        if start < 0:
+            located.append((text, entity_type, start, end, 0))
+            continue
+        sentence = bisect_right(sentence_starts, start) - 1
+        start += chunk.start
+        if chunk.own_start <= start < chunk.own_end:
+            located.append((text, entity_type, start, end + chunk.start, sentence))
+    return located
+
+ROOT_DIR = "/Users/nguyensiry/Documents/Code_practice/Data_structure_algorithms/BTL/Article_Crawl"
+MODEL_NAME = "NlpHUST/ner-vietnamese-electra-base"
+ENTITY_TYPES = {'PERSON': 'PER', 'LOCATION': 'LOC', 'ORGANIZATION': 'ORG'}
+
+def extract_entities(result):
+    """
+    Keep PER/LOC/ORG spans of one pipeline result as
+    (text, short_type, start, end), offsets relative to the chunk text
+    (-1 if the pipeline did not report them).
+    """
+    chunk_entities = []
+    for item in result:
+        short_type = ENTITY_TYPES.get(item['entity_group'])
+        if short_type:
+            start = item.get('start')
+            end = item.get('end')
+            chunk_entities.append((item['word'], short_type,
+                                   -1 if start is None else start,
+                                   -1 if end is None else end))
+    return chunk_entities
+
+NER_MODES = ('model', 'fast', 'hybrid')
+
+def load_model(model_name, device=None, backend='torch', intra_op=None, inter_op=None,
+               ner_mode='model', gazetteer=None):
+    """
+    Returns (tokenizer, ner_pipe). `backend` is one of ner_backends.BACKENDS;
+    the ONNX backends always run on CPU.
+    ner_mode 'fast' tags with `gazetteer` alone (only the tokenizer is
+    loaded, for chunking); 'hybrid' sends the model only the chunks the
+    gazetteer cannot account for.
+    """
+    if ner_mode == 'fast':
+        from transformers import AutoTokenizer
+        print("Using the gazetteer only (fast mode)")
+        return AutoTokenizer.from_pretrained(model_name), gazetteer
+    if device is None:
+        device = -1
+        if backend == 'torch':
+            import torch
+            if torch.cuda.is_available():
+                device = 0
+            elif torch.backends.mps.is_available():
+                device = "mps"
+    print(f"Using device: {device} ({backend} backend)")
+    tokenizer, ner_pipe = load_pipeline(model_name, backend, device, intra_op, inter_op)
+    if ner_mode == 'hybrid':
+        ner_pipe = HybridNER(gazetteer, ner_pipe)
+    return tokenizer, ner_pipe
+
+def length_buckets(lengths, token_budget, max_batch):
+    """
+    Group chunk indices into batches of similar token length.
+    Indices are sorted by length and cut greedily so that
+    batch size * longest member (+2 special tokens) stays within
+    `token_budget`: short chunks travel in large batches, long ones in
+    small batches, and little of any batch is padding.
+    """
+    batches = []
+    current = []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        padded = lengths[i] + 2
+        if current and (len(current) == max_batch or (len(current) + 1) * padded > token_budget):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+def padding_ratio(lengths, batches):
+    """Share of the token slots in `batches` that are padding."""
+    real = padded = 0
+    for batch in batches:
+        longest = max(lengths[i] for i in batch) + 2
+        real += sum(lengths[i] + 2 for i in batch)
+        padded += longest * len(batch)
+    return 1 - real / padded if padded else 0.0
+
+def windowed_inference(ner_pipe, chunks, cache=None, batch_size=128, token_budget=16384,
+                       window=2048, bucketed=True):
+    """
+    Run NER over Chunk records.
+    Buffers `window` records at a time; cached chunks skip the model, the
+    rest are de-duplicated, grouped into length buckets and sent as
+    token-budgeted batches. bucketed=False sends them in input order in
+    fixed batches of `batch_size` instead.
+    Yields (chunk, entities) in input order, offsets relative to the chunk.
+    """
+    it = iter(chunks)
+    while True:
+        block = list(islice(it, window))
+        if not block:
+            break
+        texts = [chunk.text for chunk in block]
+        if cache is not None:
+            with METRICS.stage('cache'):
+                entity_lists = cache.get_many(texts)
+        else:
+            entity_lists = [None] * len(block)
+
+        pending = defaultdict(list)
+        miss_lengths = {}
+        for i, entities in enumerate(entity_lists):
+            if entities is None:
+                pending[texts[i]].append(i)
+                miss_lengths[texts[i]] = block[i].n_tokens
+        miss_texts = list(pending)
+        miss_results = [None] * len(miss_texts)
+        METRICS.sample_queue('inference_pending', len(miss_texts))
+
+        start = time.perf_counter()
+        lengths = [miss_lengths[t] for t in miss_texts]
+        if bucketed:
+            batches = length_buckets(lengths, token_budget, batch_size)
+        else:
+            batches = [list(range(i, min(i + batch_size, len(lengths))))
+                       for i in range(0, len(lengths), batch_size)]
+        for batch in batches:
+            batch_texts = [miss_texts[i] for i in batch]
+            with METRICS.stage('inference'):
+                batch_results = ner_pipe(batch_texts, batch_size=len(batch))
+            METRICS.count('model_batches')
+            METRICS.count('model_chunks', len(batch))
+            for i, result in zip(batch, batch_results):
+                miss_results[i] = extract_entities(result)
+        for text, entities in zip(miss_texts, miss_results):
+            for i in pending[text]:
+                entity_lists[i] = entities
+
+        if cache is not None:
+            if miss_texts:
+                cache.inference_seconds += time.perf_counter() - start
+            with METRICS.stage('cache'):
+                cache.put_many(miss_texts, miss_results)
+
+        for chunk, entities in zip(block, entity_lists):
+            yield chunk, entities
+
+def run_inference(loader, files, tokenizer, ner_pipe, indexer, batch_size=128,
+                  show_progress=True, chunk_log=None, cache=None, bucketed=True,
+                  max_tokens=500, overlap=64):
+    """
+    Stream `files` (None: everything the loader discovers) through the NER
+    pipeline into `indexer`.
+    If `chunk_log` is a dict, the entity list of every chunk is also appended
+    to chunk_log[file_path] so the manifest can retract it later; files
+    without chunks get an empty list.
+    With a NERCache, chunks seen in earlier runs skip the model.
+    bucketed=False keeps the original fixed-size, file-order batching.
+    """
+    chunks = data_generator(loader, files, tokenizer, max_tokens, overlap, chunk_log)
+    results = windowed_inference(ner_pipe, chunks, cache, batch_size=batch_size, bucketed=bucketed)
+    # Self time of the batching/de-duplication step, net of the stages it pulls from
+    results = METRICS.timed('batching', results)
+    progress = None
+    if show_progress:
+        # The number of chunks is only known once every file is tokenized,
+        # so the bar counts chunks and shows how far through the files it is
+        progress = tqdm(unit='chunk', desc="Streaming Inference")
+    n_files = len(files) if files is not None else None
+
+    for n, (chunk, entities) in enumerate(results, 1):
+        file_path = chunk.path
+        with METRICS.stage('index'):
+            chunk_entities = localize_entities(chunk, entities)
+            indexer.add_document(file_path, chunk_entities)
+            if chunk_log is not None:
+                chunk_log[file_path].append(chunk_entities)
+        METRICS.count('entities', len(chunk_entities))
+        if progress is not None:
+            progress.update()
+            if n % 256 == 0:
+                done = METRICS.counters['files']
+                progress.set_postfix(files=f"{done}/{n_files}" if n_files else done, refresh=False)
+    if progress is not None:
+        progress.close()
+
+    loader.report_errors()
+    if cache is not None:
+        cache.report()
+    return indexer
+
+# --- Sharded build ---
+# Each worker process loads its own CPU copy of the model, indexes one shard
+# of the files and sends back a partial IndexManager which the parent merges.
+# Inference and the dict/Counter work of add_document then no longer share
+# one GIL, so throughput scales with cores on CPU-only hosts.
+
+def partition_files(files, n_shards):
+    """Round-robin split; crawl directories are per site, so this mixes sites evenly."""
+    return [files[i::n_shards] for i in range(n_shards) if files[i::n_shards]]
+
+def _build_shard(loader, files, model_name, num_threads, batch_size, cache_path=None,
+                 backend='torch', inter_op=None, index_opts=None, ner_mode='model',
+                 gazetteer=None):
+    tokenizer, ner_pipe = load_model(model_name, device=-1, backend=backend,
+                                     intra_op=num_threads, inter_op=inter_op,
+                                     ner_mode=ner_mode, gazetteer=gazetteer)
+    chunk_log = defaultdict(list)
+    cache = NERCache(cache_path, backend_tag(model_name, backend, ner_mode)) if cache_path else None
     try:
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
-        ner_pipe = pipeline("ner", model=model_name, 
-                            aggregation_strategy="simple", 
-                            device=device)
-    except Exception as e:
-        print(f"Error loading pipeline: {e}")
-        return
+        indexer = run_inference(loader, files, tokenizer, ner_pipe,
+                                IndexManager(**(index_opts or {})),
+                                batch_size=batch_size, show_progress=False,
+                                chunk_log=chunk_log, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    return indexer, dict(chunk_log), METRICS.snapshot()
+
+def build_index_sharded(loader, files, model_name, workers, batch_size=32, chunk_log=None,
+                        cache_path=None, backend='torch', intra_op=None, inter_op=None,
+                        index_opts=None, ner_mode='model', gazetteer=None):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    shards = partition_files(files, workers)
+    num_threads = intra_op or max(1, (os.cpu_count() or 1) // len(shards))
+    print(f"Sharded build: {len(shards)} workers x {num_threads} threads")
+    if backend != 'torch' and ner_mode != 'fast':
+        # Export once up front instead of racing to do it in every worker
+        export_onnx(model_name, quantize=(backend == 'onnx-int8'))
+
+    indexer = IndexManager(**(index_opts or {}))
+    # torch is not fork-safe once initialised, so always spawn fresh workers
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=ctx) as executor:
+        futures = [executor.submit(_build_shard, loader, shard, model_name,
+                                   num_threads, batch_size, cache_path, backend, inter_op,
+                                   index_opts, ner_mode, gazetteer)
+                   for shard in shards]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Shards"):
+            partial, partial_log, partial_metrics = future.result()
+            METRICS.merge(partial_metrics)
+            indexer.merge(partial)
+            if chunk_log is not None:
+                chunk_log.update(partial_log)
+    return indexer
+
+def update_index(loader, files, indexer, manifest, workers=1, cache_path=None, model_opts=None):
+    """
+    Incremental run: only new or changed files go through NER. Old
+    contributions of changed and deleted files are retracted first.
+    files=None is a full build that streams articles straight from
+    discovery into inference, without listing the crawl first.
+    """
+    if files is None:
+        chunk_log = defaultdict(list)
+        index_files(loader, None, indexer, workers, chunk_log, cache_path, model_opts)
+        fingerprints = loader.fingerprints()
+        # Every discovered file is in chunk_log, including files that produced
+        # no chunks, so they are skipped next time
+        for path, chunks in chunk_log.items():
+            fingerprint = fingerprints[path] if fingerprints is not None else None
+            manifest.record(path, chunks, fingerprint)
+        return indexer
+
+    # Shard records are tracked by their own content, not by the original files
+    fingerprints = loader.fingerprints()
+    new, changed, deleted, unchanged = manifest.diff(files, fingerprints)
+    print(f"Manifest: {len(new)} new, {len(changed)} changed, "
+          f"{len(deleted)} deleted, {unchanged} unchanged.")
+
+    for path in changed + deleted:
+        indexer.remove_document(path, manifest.chunks(path))
+    for path in deleted:
+        manifest.remove(path)
+
+    todo = new + changed
+    chunk_log = defaultdict(list)
+    if todo:
+        index_files(loader, todo, indexer, workers, chunk_log, cache_path, model_opts)
+    for path in todo:
+        # Files that produced no chunks are recorded too, so they are skipped next time
+        fingerprint = fingerprints[path] if fingerprints is not None else None
+        manifest.record(path, chunk_log.get(path, []), fingerprint)
+    return indexer
+
+def index_files(loader, files, indexer, workers=1, chunk_log=None, cache_path=None, model_opts=None):
+    """
+    model_opts: optional dict with `backend` ('torch', 'onnx', 'onnx-int8'),
+    `intra_op` and `inter_op` thread counts, and `ner_mode` plus
+    `gazetteer` (see load_model).
+    """
+    model_opts = model_opts or {}
+    backend = model_opts.get('backend', 'torch')
+    ner_mode = model_opts.get('ner_mode', 'model')
+    if workers > 1:
+        print("Starting Sharded CPU NER...")
+        if files is None:
+            files = loader.get_files()
+        indexer.merge(build_index_sharded(loader, files, MODEL_NAME, workers,
+                                          chunk_log=chunk_log, cache_path=cache_path,
+                                          index_opts=indexer.options, **model_opts))
+        return indexer
+
+    print("Initializing Deep Learning Model (High Speed Mode)...")
+    tokenizer, ner_pipe = load_model(MODEL_NAME, **model_opts)
 
-    loader = DataLoader(root_dir)
-    files = loader.get_files()
-    print(f"Found {len(files)} files.")
-    
-    indexer = IndexManager()
-    
     print("Starting Streaming Deep Learning NER...")
     print("  - Strategy: Parallel IO Reading -> Generator -> Batched GPU Inference")
     print("  - Note: Progress bar shows *chunks processed*.")
-    
-    # Estimate total chunks for progress bar (avg ~2-3 chunks per file usually)
-    ESTIMATED_CHUNKS = len(files) * 2 
-    
-    # Pass the generator to the pipeline. Pipeline will consume it.
-    inference_iter = ner_pipe(data_generator(loader, files, tokenizer), batch_size=128)
-    
-    for result in tqdm(inference_iter, total=ESTIMATED_CHUNKS, desc="Streaming Inference"):
-        # Retrieve the file path for this chunk
+    cache = NERCache(cache_path, backend_tag(MODEL_NAME, backend, ner_mode)) if cache_path else None
+    try:
+        return run_inference(loader, files, tokenizer, ner_pipe, indexer,
+                             chunk_log=chunk_log, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+        if isinstance(ner_pipe, HybridNER):
+            ner_pipe.report()
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the entity index from the article crawl.")
+    parser.add_argument("--root", default=ROOT_DIR, help="crawl directory")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of CPU worker processes (sharded build when > 1)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only process files that are new or changed since the last run")
+    parser.add_argument("--cache", default=NER_CACHE_PATH,
+                        help="NER result cache file (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="always run the model")
+    parser.add_argument("--cooccurrence", choices=SCOPES, default=None,
+                        help="which entities of a chunk co-occur: all (default), same sentence, "
+                             "or nearby; --incremental keeps the setting of the existing index")
+    parser.add_argument("--window", type=int, default=None,
+                        help="character distance for --cooccurrence window (default 200)")
+    parser.add_argument("--max-pairs", type=int, default=None,
+                        help="prune the lightest co-occurrence pairs beyond this many")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch",
+                        help="inference backend; onnx-int8 is the fastest on CPU")
+    parser.add_argument("--intra-op", type=int, default=None,
+                        help="threads per operator (default: library default, or cores/workers)")
+    parser.add_argument("--inter-op", type=int, default=None,
+                        help="threads running independent operators in parallel")
+    parser.add_argument("--shards", default=None,
+                        help="read articles from shard files packed with --pack-shards")
+    parser.add_argument("--pack-shards", metavar="DIR", default=None,
+                        help="pack the crawl into large shard files in DIR and exit")
+    parser.add_argument("--exclude", metavar="FILE", default=None,
+                        help="skip the article paths listed in FILE, one per line (e.g. near-duplicates "
+                             "found by Linked_list/sparse_vector.py --dedup)")
+    parser.add_argument("--json", default="auto", choices=['auto', 'orjson', 'ujson', 'json'],
+                        help="JSON decoder for articles (auto: fastest installed)")
+    parser.add_argument("--ner-mode", choices=NER_MODES, default="model",
+                        help="fast: match entities already in the index; hybrid: fall back to "
+                             "the model for chunks with unknown names")
+    parser.add_argument("--gazetteer-min-freq", type=int, default=2,
+                        help="indexed entities seen fewer times are left out of the gazetteer")
+    parser.add_argument("--report", default="run_report.json",
+                        help="JSON run report with per-stage timings and counters (default: %(default)s)")
+    parser.add_argument("--profile", metavar="FILE", default=None,
+                        help="run indexing under cProfile and dump pstats to FILE "
+                             "(for sampling instead, attach py-spy to the printed PID)")
+    args = parser.parse_args()
+
+    exclude = read_path_list(args.exclude) if args.exclude else None
+    if exclude:
+        print(f"Skipping {len(exclude)} articles listed in {args.exclude}")
+    loader = DataLoader(args.root, shard_dir=args.shards, json_backend=args.json, exclude=exclude)
+    if args.pack_shards:
+        records, shards = pack_shards(loader.iter_files(), args.pack_shards)
+        print(f"Packed {records} articles into {shards} shards in {args.pack_shards}.")
+        return
+
+    gazetteer = None
+    if args.ner_mode != 'model':
+        if not os.path.exists(INDEX_PATH):
+            print(f"Error: --ner-mode {args.ner_mode} needs an existing {INDEX_PATH} to seed the gazetteer.")
+            return
+        seed = IndexManager().load(INDEX_PATH)
+        gazetteer = Gazetteer.from_index(seed, min_frequency=args.gazetteer_min_freq)
+        seed.close()
+        print(f"Gazetteer: {gazetteer.size} entities, {len(gazetteer.automaton)} automaton states")
+
+    indexer = IndexManager(cooccurrence_scope=args.cooccurrence, window=args.window,
+                           max_pairs=args.max_pairs)
+    manifest_file = manifest_path(INDEX_PATH)
+    if args.incremental and os.path.exists(INDEX_PATH) and os.path.exists(manifest_file):
         try:
-            file_path = chunk_file_map.popleft()
-        except IndexError:
-            # Should not happen if pipeline yields 1 result per 1 input
-            print("Error: Chunk map out of sync!")
-            break
-        
-        # Extract entities from this chunk
-        chunk_entities = []
-        for item in result:
-             entity_group = item['entity_group']
-             if entity_group in ['PERSON', 'LOCATION', 'ORGANIZATION']:
-                short_type = 'PER' if entity_group == 'PERSON' else \
-                             'LOC' if entity_group == 'LOCATION' else \
-                             'ORG'
-                chunk_entities.append((item['word'], short_type))
-        
-        indexer.add_document(file_path, chunk_entities)
-        
-    indexer.save('index.pkl')
+            indexer.load(INDEX_PATH)
+        except ValueError as e:
+            print(f"Error: {e}. Rebuild without --incremental to change it.")
+            return
+        # Deleted files can only be detected against the full listing
+        files = loader.get_files()
+        print(f"Found {len(files)} files.")
+    else:
+        if os.path.exists(manifest_file):
+            # Full rebuild: the old manifest describes an index we are replacing
+            os.remove(manifest_file)
+        files = None
+        print(f"Streaming articles from {args.shards or args.root} (JSON decoder: {loader.json_backend})")
+
+    manifest = Manifest(manifest_file)
+    METRICS.reset()
+    print(f"PID {os.getpid()}")
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        model_opts = {'backend': args.backend, 'intra_op': args.intra_op, 'inter_op': args.inter_op,
+                      'ner_mode': args.ner_mode, 'gazetteer': gazetteer}
+        update_index(loader, files, indexer, manifest, args.workers,
+                     cache_path=None if args.no_cache else args.cache,
+                     model_opts=model_opts)
+    except Exception as e:
+        print(f"Error during indexing: {e}")
+        manifest.close(commit=False)
+        return
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"cProfile stats written to {args.profile}")
+
+    # Index first, then manifest: the manifest must never describe
+    # contributions the saved index does not contain.
+    with METRICS.stage('save'):
+        indexer.save(INDEX_PATH)
+        manifest.close()
+
+    config = {k: v for k, v in vars(args).items() if k != 'profile'}
+    report = METRICS.write_report(args.report, config=config,
+                                  index_bytes=os.path.getsize(INDEX_PATH),
+                                  # with workers > 1, stage times are summed over the workers
+                                  workers=args.workers)
+    print(METRICS.summary(report))
+    print(f"Run report written to {args.report}")
     
     print("\n--- Top 20 Common Entities (High Accuracy) ---")
     for e, c in indexer.entity_frequency.most_common(20):
@@ -1,23 +1,33 @@
-from analyzer import IndexManager
+from analyzer import IndexManager, INDEX_PATH
+from query import QueryError
 import sys
 import os
 
+PAGE_SIZE = 10
+
 def main():
+    if '--serve' in sys.argv[1:]:
+        # Shared HTTP/JSON service instead of the interactive menu; see server.py
+        import server
+        sys.argv.remove('--serve')
+        server.main()
+        return
+
     print("Welcome to Vietnamese Article Named Entity Analysis")
     print("Loading index...")
     
-    if not os.path.exists('index.pkl'):
-        print("Error: index.pkl not found. Please run analyzer.py first to build the index.")
+    if not os.path.exists(INDEX_PATH):
+        print(f"Error: {INDEX_PATH} not found. Please run analyzer.py first to build the index.")
         sys.exit(1)
         
     manager = IndexManager()
-    manager.load('index.pkl')
+    manager.load(INDEX_PATH)
     
     print(f"Index loaded. {len(manager.inverted_index)} unique entities.")
     
     while True:
         print("\nOptions:")
-        print("1. Search articles by entity name")
+        print("1. Search articles by entity (AND / OR / NOT)")
         print("2. Show top frequent entities")
         print("3. Find related entities (co-occurrence)")
         print("4. Exit")
@@ -25,33 +35,29 @@ def main():
         choice = input("Enter choice (1-4): ").strip()
         
         if choice == '1':
-            keyword = input("Enter entity name to search: ").strip()
-            # Normalize? Our extractor keeps original case but maybe we search smartly
-            # For now exact match or partial match?
-            # Dictionary keys are exact.
-            
-            results = manager.search(keyword)
-            if results:
-                print(f"Found {len(results)} articles containing '{keyword}':")
-                for i, path in enumerate(list(results)[:10]):
+            print('Entity names, optionally combined: "Hà Nội" AND "Bộ Y tế" NOT "COVID"')
+            query = input("Enter search: ").strip()
+            page = 1
+            while True:
+                try:
+                    total, results = manager.boolean_search(query, page=page, per_page=PAGE_SIZE)
+                except QueryError as e:
+                    print(f"Invalid query: {e}")
+                    break
+                if not total:
+                    print(f"No articles found for '{query}'.")
+                    break
+                if page == 1:
+                    print(f"Found {total} articles matching '{query}':")
+                for path in results:
                     print(f" - {os.path.basename(path)}")
-                if len(results) > 10:
-                    print(f"... and {len(results)-10} more.")
-            else:
-                # Try case insensitive search
-                found = False
-                for key in manager.inverted_index:
-                    if key.lower() == keyword.lower():
-                        results = manager.inverted_index[key]
-                        print(f"Did you mean '{key}'? Found {len(results)} articles.")
-                        for i, path in enumerate(list(results)[:10]):
-                            print(f" - {os.path.basename(path)}")
-                        if len(results) > 10:
-                            print(f"... and {len(results)-10} more.")
-                        found = True
-                        break
-                if not found:
-                    print(f"No articles found for '{keyword}'.")
+                shown = (page - 1) * PAGE_SIZE + len(results)
+                if shown >= total:
+                    break
+                more = input(f"Shown {shown} of {total}. Next page? (y/N) ").strip().lower()
+                if more != 'y':
+                    break
+                page += 1
 
         elif choice == '2':
             try:
@@ -65,23 +71,18 @@ def main():
         elif choice == '3':
             keyword = input("Enter entity name: ").strip()
             related = manager.get_related_entities(keyword, 10)
+            if not related:
+                matches = manager.resolve(keyword)
+                if matches:
+                    key = matches[0]
+                    related = manager.get_related_entities(key, 10)
+                    print(f"Did you mean '{key}'?")
             if related:
                 print(f"Entities related to '{keyword}':")
                 for e, c in related:
                     print(f"{e} (co-occurred {c} times)")
             else:
-                 # Try case insensitive
-                found = False
-                for key in manager.co_occurrence:
-                    if key.lower() == keyword.lower():
-                        related = manager.get_related_entities(key, 10)
-                        print(f"Did you mean '{key}'? Related entities:")
-                        for e, c in related:
-                            print(f"{e} (co-occurred {c} times)")
-                        found = True
-                        break
-                if not found:
-                    print(f"No related info for '{keyword}'.")
+                print(f"No related info for '{keyword}'.")
 
         elif choice == '4':
             print("Goodbye.")
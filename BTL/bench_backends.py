@@ -0,0 +1,66 @@
+import time
+import random
+import argparse
+from analyzer import (DataLoader, ROOT_DIR, MODEL_NAME, load_model, data_generator,
+                      windowed_inference)
+from ner_backends import BACKENDS
+
+# Accuracy vs throughput of the inference backends on a held-out sample of
+# articles. The PyTorch pipeline is the reference: precision/recall/F1 count
+# an entity as matching when its text span and type agree with it.
+
+def run_backend(backend, records, batch_size, intra_op, inter_op):
+    _, ner_pipe = load_model(MODEL_NAME, device=-1, backend=backend,
+                             intra_op=intra_op, inter_op=inter_op)
+    # Warm-up so session creation and lazy initialisation are not timed
+    list(windowed_inference(ner_pipe, records[:8], batch_size=batch_size))
+
+    start = time.perf_counter()
+    results = [set((s, e, t) for _, t, s, e in ents)
+               for _, ents in windowed_inference(ner_pipe, records, batch_size=batch_size)]
+    return results, time.perf_counter() - start
+
+def score(reference, predicted):
+    tp = fp = fn = 0
+    for ref, pred in zip(reference, predicted):
+        tp += len(ref & pred)
+        fp += len(pred - ref)
+        fn += len(ref - pred)
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare NER inference backends on held-out articles.")
+    parser.add_argument("--root", default=ROOT_DIR)
+    parser.add_argument("--files", type=int, default=300, help="size of the held-out sample")
+    parser.add_argument("--seed", type=int, default=13, help="sampling seed, keeps the sample fixed")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--intra-op", type=int, default=None)
+    parser.add_argument("--inter-op", type=int, default=None)
+    args = parser.parse_args()
+
+    loader = DataLoader(args.root)
+    files = sorted(loader.get_files())
+    sample = random.Random(args.seed).sample(files, min(args.files, len(files)))
+
+    tokenizer, _ = load_model(MODEL_NAME, device=-1)
+    records = list(data_generator(loader, sample, tokenizer))
+    print(f"Held-out sample: {len(sample)} articles, {len(records)} chunks")
+
+    backends = ['torch'] + [b for b in args.backends if b != 'torch']
+    reference = None
+    print(f"{'backend':<11}{'seconds':>9}{'chunks/s':>10}{'speed-up':>10}"
+          f"{'precision':>11}{'recall':>8}{'F1':>8}")
+    for backend in backends:
+        results, seconds = run_backend(backend, records, args.batch_size, args.intra_op, args.inter_op)
+        if reference is None:
+            reference, reference_seconds = results, seconds
+        p, r, f1 = score(reference, results)
+        print(f"{backend:<11}{seconds:>9.2f}{len(records) / seconds:>10.1f}"
+              f"{reference_seconds / seconds:>9.2f}x{p:>11.3f}{r:>8.3f}{f1:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import time
+import argparse
+from itertools import islice
+from analyzer import (DataLoader, ROOT_DIR, MODEL_NAME, load_model, data_generator,
+                      windowed_inference, length_buckets, padding_ratio)
+
+# Compares the original fixed batching (file order, batch_size=128) with the
+# length-bucketed, token-budgeted batching on the same sample of chunks.
+# Reports chunks/sec, padding ratio and whether both produce the same entities.
+
+def fixed_batches(n, batch_size):
+    return [list(range(i, min(i + batch_size, n))) for i in range(0, n, batch_size)]
+
+def bucketed_batches(lengths, batch_size, token_budget, window):
+    batches = []
+    for start in range(0, len(lengths), window):
+        part = lengths[start:start + window]
+        batches.extend([[start + i for i in b] for b in length_buckets(part, token_budget, batch_size)])
+    return batches
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fixed vs length-bucketed NER batching.")
+    parser.add_argument("--root", default=ROOT_DIR)
+    parser.add_argument("--files", type=int, default=500, help="number of articles to sample")
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--token-budget", type=int, default=16384)
+    parser.add_argument("--window", type=int, default=2048)
+    args = parser.parse_args()
+
+    tokenizer, ner_pipe = load_model(MODEL_NAME)
+    loader = DataLoader(args.root)
+    files = list(islice(loader.get_files(), args.files))
+    records = list(data_generator(loader, files, tokenizer))
+    texts = [chunk.text for chunk in records]
+    lengths = [chunk.n_tokens for chunk in records]
+    print(f"Sample: {len(files)} files, {len(records)} chunks, {sum(lengths)} tokens")
+
+    # Warm-up so neither path pays for lazy initialisation
+    list(ner_pipe(texts[:8], batch_size=8))
+
+    start = time.perf_counter()
+    fixed = [ents for _, ents in windowed_inference(ner_pipe, records, batch_size=args.batch_size,
+                                                    window=args.window, bucketed=False)]
+    fixed_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bucketed = [ents for _, ents in windowed_inference(ner_pipe, records, batch_size=args.batch_size,
+                                                       token_budget=args.token_budget,
+                                                       window=args.window)]
+    bucketed_time = time.perf_counter() - start
+
+    fixed_pad = padding_ratio(lengths, fixed_batches(len(lengths), args.batch_size))
+    bucketed_pad = padding_ratio(lengths, bucketed_batches(lengths, args.batch_size,
+                                                           args.token_budget, args.window))
+    same = sum(1 for a, b in zip(fixed, bucketed) if a == b)
+
+    print(f"{'mode':<10}{'seconds':>10}{'chunks/s':>12}{'padding':>10}")
+    print(f"{'fixed':<10}{fixed_time:>10.2f}{len(texts) / fixed_time:>12.1f}{fixed_pad:>10.1%}")
+    print(f"{'bucketed':<10}{bucketed_time:>10.2f}{len(texts) / bucketed_time:>12.1f}{bucketed_pad:>10.1%}")
+    print(f"Speed-up: {fixed_time / bucketed_time:.2f}x, identical entity lists: {same}/{len(texts)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import time
+import random
+import argparse
+from analyzer import (DataLoader, IndexManager, ROOT_DIR, MODEL_NAME, INDEX_PATH, load_model,
+                      data_generator, windowed_inference)
+from bench_backends import score
+from gazetteer import Gazetteer, HybridNER
+
+# Gazetteer fast path vs the model on a held-out sample of articles.
+# The model's output is the reference; the gazetteer is seeded from an
+# existing index. Reports precision/recall, chunks/sec per mode, and the
+# share of chunks hybrid mode still sends to the model. The 'fast-anycase'
+# row matches without the first-letter capital check, to show how much
+# precision that check buys.
+
+def run(ner_pipe, records, batch_size):
+    start = time.perf_counter()
+    results = [set((s, e, t) for _, t, s, e in ents)
+               for _, ents in windowed_inference(ner_pipe, records, batch_size=batch_size)]
+    return results, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gazetteer, hybrid and model NER.")
+    parser.add_argument("--root", default=ROOT_DIR)
+    parser.add_argument("--index", default=INDEX_PATH, help="index that seeds the gazetteer")
+    parser.add_argument("--files", type=int, default=300, help="size of the held-out sample")
+    parser.add_argument("--seed", type=int, default=13, help="sampling seed, keeps the sample fixed")
+    parser.add_argument("--min-freq", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    seed_index = IndexManager().load(args.index)
+    start = time.perf_counter()
+    gazetteer = Gazetteer.from_index(seed_index, min_frequency=args.min_freq)
+    anycase = Gazetteer.from_index(seed_index, min_frequency=args.min_freq, require_capital=False)
+    seed_index.close()
+    print(f"Gazetteer: {gazetteer.size} entities, {len(gazetteer.automaton)} states, "
+          f"built in {time.perf_counter() - start:.2f}s")
+
+    loader = DataLoader(args.root)
+    files = sorted(loader.get_files())
+    sample = random.Random(args.seed).sample(files, min(args.files, len(files)))
+    tokenizer, model_pipe = load_model(MODEL_NAME, device=-1)
+    records = list(data_generator(loader, sample, tokenizer))
+    print(f"Held-out sample: {len(sample)} articles, {len(records)} chunks")
+    # Warm-up so lazy initialisation is not timed
+    list(windowed_inference(model_pipe, records[:8], batch_size=args.batch_size))
+
+    hybrid = HybridNER(gazetteer, model_pipe)
+    reference = None
+    print(f"{'mode':<14}{'seconds':>9}{'chunks/s':>11}{'speed-up':>10}"
+          f"{'precision':>11}{'recall':>8}{'F1':>8}")
+    modes = (('model', model_pipe), ('fast', gazetteer), ('fast-anycase', anycase), ('hybrid', hybrid))
+    for mode, ner_pipe in modes:
+        results, seconds = run(ner_pipe, records, args.batch_size)
+        if reference is None:
+            reference, reference_seconds = results, seconds
+        p, r, f1 = score(reference, results)
+        print(f"{mode:<14}{seconds:>9.2f}{len(records) / seconds:>11.1f}"
+              f"{reference_seconds / seconds:>9.2f}x{p:>11.3f}{r:>8.3f}{f1:>8.3f}")
+    hybrid.report()
+
+if __name__ == "__main__":
+    main()
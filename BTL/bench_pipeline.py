@@ -0,0 +1,324 @@
+import io
+import os
+import re
+import json
+import math
+import time
+import shutil
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from gazetteer import Gazetteer
+from metrics import peak_rss_mb
+from synthetic_corpus import write_corpus, entity_cast
+
+# Offline, reproducible benchmark of the whole indexing pipeline.
+#
+#   v1      analyzer_v1_slow: every chunk tokenized, decoded and held in
+#           memory, then fed to the model in fixed batches of 32
+#   stream  analyzer.run_inference: streaming chunks, length-bucketed
+#           batches of up to 128, binary index
+#   index   add_document + save alone, on precomputed entity lists
+#   export  export_data's entity table, top edges and GEXF alone
+#
+# Each is run on synthetic corpora of several sizes (synthetic_corpus.py),
+# with a stub tokenizer and a stub NER model in place of the real ones, so
+# nothing is downloaded and the numbers do not depend on the hardware the
+# model would run on. The stub finds the corpus's names with a gazetteer and
+# sleeps like a model would: a fixed cost per batch plus a cost per padded
+# token, so batching and padding matter as they do for the real model.
+#
+# Every (stage, size) runs in a fresh process, so its peak RSS is its own.
+# Results are printed as a table with a scaling exponent per stage (time ~
+# size^k) and written to JSON; with matplotlib installed, also as plots.
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+STAGES = ('v1', 'stream', 'index', 'export')
+
+class StubTokenizer:
+    """
+    Word-piece-free tokenizer: one token per word or punctuation mark.
+    Token ids remember whether a space came before the token, so decode()
+    gives back the text with its whitespace collapsed, as a real one would.
+    """
+    TOKEN = re.compile(r'\w+|[^\w\s]')
+
+    def __init__(self):
+        self.vocab = {}
+        self.pieces = []
+
+    def _id(self, piece):
+        i = self.vocab.get(piece)
+        if i is None:
+            i = self.vocab[piece] = len(self.pieces)
+            self.pieces.append(piece)
+        return i
+
+    def __call__(self, text, add_special_tokens=True, return_offsets_mapping=False):
+        ids = []
+        offsets = []
+        for m in self.TOKEN.finditer(text):
+            spaced = m.start() > 0 and text[m.start() - 1].isspace()
+            ids.append(self._id(('▁' if spaced else '') + m.group()))
+            offsets.append(m.span())
+        encoded = {'input_ids': ids}
+        if return_offsets_mapping:
+            encoded['offset_mapping'] = offsets
+        return encoded
+
+    def decode(self, ids):
+        return ''.join(self.pieces[i] for i in ids).replace('▁', ' ').strip()
+
+class StubNER:
+    """
+    Stands in for the transformers "ner" pipeline: same call signature and
+    output shape, entities found by a gazetteer of the corpus's names.
+    Each batch sleeps batch_ms plus token_us per padded token slot.
+    """
+    def __init__(self, gazetteer, tokenizer, batch_ms=5.0, token_us=2.0):
+        self.gazetteer = gazetteer
+        self.tokenizer = tokenizer
+        self.batch_ms = batch_ms
+        self.token_us = token_us
+
+    def __call__(self, texts, batch_size=8):
+        if isinstance(texts, str):
+            texts = [texts]
+        results = []
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            longest = max(len(self.tokenizer(t)['input_ids']) for t in batch) + 2
+            time.sleep(self.batch_ms / 1000 + len(batch) * longest * self.token_us / 1e6)
+            results.extend(self.gazetteer(batch))
+        return results
+
+def stub_model(opts):
+    tokenizer = StubTokenizer()
+    gazetteer = Gazetteer(entity_cast(seed=opts['seed']))
+    return tokenizer, StubNER(gazetteer, tokenizer, opts['batch_ms'], opts['token_us'])
+
+# --- stages; each returns (seconds, files, chunks, entities) ---
+
+def run_v1(corpus_dir, work_dir, opts):
+    # The body of analyzer_v1_slow.main(), with the stub model and paths
+    import analyzer_v1_slow as v1
+    tokenizer, ner_pipe = stub_model(opts)
+    start = time.perf_counter()
+    loader = v1.DataLoader(corpus_dir)
+    files = loader.get_files()
+    all_chunks = []
+    chunk_map = []
+    MAX_TOKENS = 500
+    for file_path in files:
+        text = loader.parse_file(file_path)
+        if not text:
+            continue
+        input_ids = tokenizer(text, add_special_tokens=False)['input_ids']
+        for i in range(0, len(input_ids), MAX_TOKENS):
+            chunk_ids = input_ids[i:i + MAX_TOKENS]
+            if not chunk_ids:
+                continue
+            all_chunks.append(tokenizer.decode(chunk_ids))
+            chunk_map.append(file_path)
+
+    indexer = v1.IndexManager()
+    entities = 0
+    for file_path, result in zip(chunk_map, ner_pipe(all_chunks, batch_size=32)):
+        chunk_entities = []
+        for item in result:
+            entity_group = item['entity_group']
+            if entity_group in ['PERSON', 'LOCATION', 'ORGANIZATION']:
+                short_type = 'PER' if entity_group == 'PERSON' else \
+                             'LOC' if entity_group == 'LOCATION' else \
+                             'ORG'
+                chunk_entities.append((item['word'], short_type))
+        entities += len(chunk_entities)
+        indexer.add_document(file_path, chunk_entities)
+    indexer.save(os.path.join(work_dir, 'index.pkl'))
+    return time.perf_counter() - start, len(files), len(all_chunks), entities
+
+def run_stream(corpus_dir, work_dir, opts):
+    from analyzer import DataLoader, IndexManager, run_inference
+    from metrics import METRICS
+    tokenizer, ner_pipe = stub_model(opts)
+    start = time.perf_counter()
+    loader = DataLoader(corpus_dir)
+    indexer = IndexManager()
+    run_inference(loader, None, tokenizer, ner_pipe, indexer, batch_size=128, show_progress=False)
+    indexer.save(os.path.join(work_dir, 'index.bin'))
+    counters = METRICS.counters
+    return time.perf_counter() - start, counters['files'], counters['chunks'], counters['entities']
+
+def chunk_entities(corpus_dir, opts):
+    """{path: [entity list per chunk]} as the streaming pipeline would index them, with no model delay."""
+    from analyzer import DataLoader, data_generator, windowed_inference, localize_entities
+    tokenizer, ner_pipe = stub_model(dict(opts, batch_ms=0.0, token_us=0.0))
+    chunk_log = defaultdict(list)
+    n_chunks = 0
+    chunks = data_generator(DataLoader(corpus_dir), None, tokenizer)
+    for chunk, entities in windowed_inference(ner_pipe, chunks):
+        chunk_log[chunk.path].append(localize_entities(chunk, entities))
+        n_chunks += 1
+    return chunk_log, n_chunks
+
+def build_index(chunk_log, path):
+    from analyzer import IndexManager
+    indexer = IndexManager()
+    for file_path, chunks in chunk_log.items():
+        for entities in chunks:
+            indexer.add_document(file_path, entities)
+    indexer.save(path)
+
+def run_index(corpus_dir, work_dir, opts, baseline):
+    chunk_log, n_chunks = chunk_entities(corpus_dir, opts)
+    baseline['rss_mb'] = peak_rss_mb()
+    start = time.perf_counter()
+    build_index(chunk_log, os.path.join(work_dir, 'index.bin'))
+    entities = sum(len(e) for chunks in chunk_log.values() for e in chunks)
+    return time.perf_counter() - start, len(chunk_log), n_chunks, entities
+
+def run_export(corpus_dir, work_dir, opts, baseline):
+    from analyzer import IndexManager
+    from export_data import export_entities, top_edges, export_edge_table, export_gexf
+    chunk_log, n_chunks = chunk_entities(corpus_dir, opts)
+    path = os.path.join(work_dir, 'index.bin')
+    build_index(chunk_log, path)
+    del chunk_log
+    baseline['rss_mb'] = peak_rss_mb()
+    start = time.perf_counter()
+    manager = IndexManager().load(path)
+    reader = manager.reader
+    export_entities(reader, work_dir, 'csv')
+    export_edge_table(reader, top_edges(reader, 10000), os.path.join(work_dir, 'top_edges.csv'), 'csv')
+    export_gexf(reader, os.path.join(work_dir, 'graph.gexf'), 1)
+    seconds = time.perf_counter() - start
+    entities = reader.n_entities
+    manager.close()
+    return seconds, reader.n_docs, n_chunks, entities
+
+def run_job(stage, corpus_dir, work_dir, opts):
+    """Runs in a fresh process: one stage on one corpus."""
+    os.makedirs(work_dir, exist_ok=True)
+    baseline = {'rss_mb': peak_rss_mb()}
+    with redirect_stdout(io.StringIO()):
+        if stage == 'v1':
+            result = run_v1(corpus_dir, work_dir, opts)
+        elif stage == 'stream':
+            result = run_stream(corpus_dir, work_dir, opts)
+        elif stage == 'index':
+            result = run_index(corpus_dir, work_dir, opts, baseline)
+        else:
+            result = run_export(corpus_dir, work_dir, opts, baseline)
+    seconds, files, chunks, entities = result
+    peak = peak_rss_mb()
+    return {'stage': stage, 'seconds': round(seconds, 4), 'files': files, 'chunks': chunks,
+            'entities': entities, 'files_per_s': round(files / seconds, 1) if seconds else 0.0,
+            'chunks_per_s': round(chunks / seconds, 1) if seconds else 0.0,
+            'peak_rss_mb': peak, 'stage_rss_mb': round(peak - baseline['rss_mb'], 1)}
+
+def scaling_exponent(sizes, seconds):
+    """Least-squares slope of log(time) over log(size): 1.0 is linear."""
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, seconds) if t > 0]
+    if len(points) < 2:
+        return None
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    var = sum((x - mx) ** 2 for x, _ in points)
+    return sum((x - mx) * (y - my) for x, y in points) / var if var else None
+
+def plot(results, sizes, path):
+    fig, (ax_time, ax_mem) = plt.subplots(1, 2, figsize=(11, 4))
+    for stage, rows in results.items():
+        ns = [n for n in sizes if n in rows]
+        ax_time.plot(ns, [rows[n]['seconds'] for n in ns], marker='o', label=stage)
+        ax_mem.plot(ns, [rows[n]['peak_rss_mb'] for n in ns], marker='o', label=stage)
+    for ax, label in ((ax_time, 'seconds'), (ax_mem, 'peak RSS (MB)')):
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_xlabel('articles')
+        ax.set_ylabel(label)
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the indexing pipelines on synthetic corpora, offline.")
+    parser.add_argument("--sizes", default="250,1000,4000", help="comma-separated corpus sizes (articles)")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"any of {', '.join(STAGES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-ms", type=float, default=5.0, help="stub model cost per batch")
+    parser.add_argument("--token-us", type=float, default=2.0, help="stub model cost per padded token")
+    parser.add_argument("--work-dir", default=None, help="corpora and outputs (default: a temp dir, removed)")
+    parser.add_argument("--out", default="bench_pipeline.json")
+    parser.add_argument("--plot", default="bench_pipeline.png", help="scaling plot (needs matplotlib)")
+    args = parser.parse_args()
+
+    sizes = sorted(int(n) for n in args.sizes.split(','))
+    stages = [s.strip() for s in args.stages.split(',')]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    opts = {'seed': args.seed, 'batch_ms': args.batch_ms, 'token_us': args.token_us}
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='bench_pipeline_')
+
+    results = {stage: {} for stage in stages}
+    try:
+        print(f"{'stage':<8}{'articles':>9}{'chunks':>8}{'seconds':>9}{'files/s':>9}"
+              f"{'chunks/s':>10}{'peak MB':>9}{'stage MB':>9}")
+        for n in sizes:
+            corpus_dir = os.path.join(work_dir, f'corpus_{n}_seed{args.seed}')
+            if not os.path.isdir(corpus_dir):
+                write_corpus(corpus_dir, n, seed=args.seed)
+            for stage in stages:
+                # A fresh process per run, so peak RSS is not inherited
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                    job = pool.submit(run_job, stage, corpus_dir,
+                                      os.path.join(work_dir, f'out_{stage}_{n}'), opts)
+                    try:
+                        row = job.result()
+                    except ImportError as e:
+                        # analyzer_v1_slow imports torch and transformers at the top
+                        print(f"{stage:<8}{n:>9}  skipped: {e}")
+                        continue
+                results[stage][n] = row
+                print(f"{stage:<8}{n:>9}{row['chunks']:>8}{row['seconds']:>9.2f}{row['files_per_s']:>9.1f}"
+                      f"{row['chunks_per_s']:>10.1f}{row['peak_rss_mb']:>9.0f}{row['stage_rss_mb']:>9.0f}")
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\nScaling (time ~ articles^k):")
+    scaling = {}
+    for stage, rows in results.items():
+        ns = sorted(rows)
+        k = scaling_exponent(ns, [rows[n]['seconds'] for n in ns])
+        scaling[stage] = k
+        if k is not None:
+            print(f"  {stage:<8}k = {k:.2f}")
+    if 'v1' in results and 'stream' in results:
+        for n in sizes:
+            if n in results['v1'] and n in results['stream']:
+                a, b = results['v1'][n], results['stream'][n]
+                print(f"  {n} articles: stream is {a['seconds'] / b['seconds']:.2f}x faster than v1, "
+                      f"peak RSS {b['peak_rss_mb']:.0f} vs {a['peak_rss_mb']:.0f} MB")
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump({'options': dict(opts, sizes=sizes), 'scaling': scaling,
+                   'results': {stage: [{**rows[n], 'articles': n} for n in sorted(rows)]
+                               for stage, rows in results.items()}}, f, indent=2)
+    print(f"Results saved to {args.out}")
+    if plt is not None and args.plot:
+        plot(results, sizes, args.plot)
+        print(f"Plot saved to {args.plot}")
+
+if __name__ == "__main__":
+    main()
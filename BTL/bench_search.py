@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from collections import defaultdict
+from analyzer import IndexManager, INDEX_PATH
+
+# Boolean search over compressed posting lists vs the old approach of
+# intersecting Python sets of paths, on the hottest entities of an index.
+# With --synthetic, an index with entities of 100k+ postings is generated
+# first, so the benchmark does not need a built crawl.
+
+SYNTHETIC_DENSITY = {'Hà Nội': 0.6, 'Việt Nam': 0.45, 'Bộ Y tế': 0.3, 'TP.HCM': 0.25,
+                     'COVID': 0.12, 'Quốc hội': 0.02, 'Đà Nẵng': 0.005}
+
+def build_synthetic(path, n_docs, seed):
+    rng = random.Random(seed)
+    manager = IndexManager()
+    postings = defaultdict(set)
+    for d in range(n_docs):
+        doc = f'/crawl/site{d % 7}.vn/2025-05-{1 + d % 28:02d}_site{d % 7}.vn_{d:08d}.txt'
+        for name, density in SYNTHETIC_DENSITY.items():
+            if rng.random() < density:
+                postings[name].add(doc)
+    manager.inverted_index.update(postings)
+    manager.entity_frequency.update({name: len(docs) for name, docs in postings.items()})
+    manager.save(path)
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark boolean search against set intersection.")
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--synthetic", type=int, metavar="DOCS", default=None,
+                        help="generate a synthetic index with this many documents instead")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs per query")
+    args = parser.parse_args()
+
+    path = args.index
+    if args.synthetic:
+        path = os.path.join(tempfile.mkdtemp(), 'bench_index.bin')
+        build_synthetic(path, args.synthetic, args.seed)
+    manager = IndexManager().load(path)
+    reader = manager.reader
+
+    by_size = sorted((i for i in range(reader.n_entities) if reader._post_n[i]),
+                     key=lambda i: -reader._post_n[i])
+    hot = by_size[:4]
+    names = [reader.entity(i) for i in hot]
+    # A selective query too: the hottest entity AND a rare one
+    rare = reader.entity(by_size[-1])
+    if len(names) < 3:
+        sys.exit("The index needs at least three entities with postings.")
+    print("Hot entities: " + ", ".join(f"{n} ({reader._post_n[i]})" for n, i in zip(names, hot)))
+    postings_bytes = sum(reader._sections[s][1] for s in
+                         ('post_off', 'post_n', 'blk_head', 'blk_pos', 'blk_wid', 'post_gap'))
+    n_postings = sum(reader._post_n)
+    print(f"Postings: {n_postings} in {postings_bytes / n_postings:.2f} bytes each "
+          f"(4.00 as raw u32)")
+
+    # The previous representation: one set of path strings per entity
+    start = time.perf_counter()
+    sets = {name: set(manager.inverted_index[name]) for name in names + [rare]}
+    print(f"Materialising the path sets took {time.perf_counter() - start:.2f}s "
+          f"({sum(sys.getsizeof(s) for s in sets.values()) >> 20} MB of set tables alone)")
+
+    a, b, c, d = (names + names[-1:])[:4]
+    queries = [
+        (f'"{a}" AND "{b}"', lambda: sets[a] & sets[b]),
+        (f'"{a}" AND "{rare}"', lambda: sets[a] & sets[rare]),
+        (f'"{a}" AND "{b}" AND "{c}"', lambda: sets[a] & sets[b] & sets[c]),
+        (f'"{a}" AND "{b}" NOT "{c}"', lambda: (sets[a] & sets[b]) - sets[c]),
+        (f'"{c}" OR "{d}"', lambda: sets[c] | sets[d]),
+    ]
+    print(f"{'query':<50}{'hits':>9}{'sets ms':>10}{'+sort ms':>10}{'index ms':>10}")
+    for query, set_fn in queries:
+        set_time, expected = timed(set_fn, args.repeat)
+        sort_time, _ = timed(lambda: sorted(set_fn())[:10], args.repeat)
+        index_time, (total, _) = timed(lambda: manager.boolean_search(query, page=1), args.repeat)
+        assert total == len(expected), (query, total, len(expected))
+        print(f"{query:<50}{total:>9}{set_time * 1000:>10.1f}{sort_time * 1000:>10.1f}"
+              f"{index_time * 1000:>10.1f}")
+    manager.close()
+
+if __name__ == "__main__":
+    main()
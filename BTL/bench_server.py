@@ -0,0 +1,104 @@
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+from urllib.parse import quote
+from server import DEFAULT_PORT
+
+# Load test for server.py: `concurrency` keep-alive connections send a mix of
+# search / top / related requests for `duration` seconds, then p50/p99
+# latency and queries/sec are reported per endpoint and overall.
+# Entity names for the queries come from the server's own /top answer.
+
+async def request(reader, writer, target):
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError(f"server closed the connection before answering {target}")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+def make_targets(names, rng):
+    """Endless stream of (endpoint, target) following a fixed mix."""
+    while True:
+        kind = rng.random()
+        a, b = rng.choice(names), rng.choice(names)
+        if kind < 0.5:
+            q = f'"{a}"' if rng.random() < 0.5 else f'"{a}" AND "{b}"'
+            yield '/search', f"/search?q={quote(q)}&page={rng.randint(1, 3)}"
+        elif kind < 0.8:
+            yield '/related', f"/related?entity={quote(a)}&k=10"
+        else:
+            yield '/top', f"/top?k={rng.choice((10, 20, 50))}"
+
+async def worker(host, port, targets, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            endpoint, target = next(targets)
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, target)
+            latencies[endpoint].append(time.perf_counter() - start)
+            if status != 200:
+                errors[endpoint] += 1
+    finally:
+        writer.close()
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+async def run(args):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, body = await request(reader, writer, f"/top?k={args.vocabulary}")
+    writer.close()
+    names = [e for e, _ in json.loads(body)['entities']]
+    if not names:
+        raise SystemExit("The server's index has no entities.")
+
+    targets = make_targets(names, random.Random(args.seed))
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(worker(args.host, args.port, targets, deadline, latencies, errors)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.concurrency} connections, {elapsed:.1f}s")
+    print(f"{'endpoint':<10}{'requests':>10}{'errors':>8}{'qps':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    everything = []
+    for endpoint in sorted(latencies):
+        values = sorted(latencies[endpoint])
+        everything.extend(values)
+        print(f"{endpoint:<10}{len(values):>10}{errors[endpoint]:>8}{len(values) / elapsed:>10.1f}"
+              f"{percentile(values, 0.5) * 1000:>9.2f}{percentile(values, 0.99) * 1000:>9.2f}")
+    everything.sort()
+    print(f"{'all':<10}{len(everything):>10}{sum(errors.values()):>8}{len(everything) / elapsed:>10.1f}"
+          f"{percentile(everything, 0.5) * 1000:>9.2f}{percentile(everything, 0.99) * 1000:>9.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the local query server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--vocabulary", type=int, default=200,
+                        help="query entities drawn from this many top entities")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
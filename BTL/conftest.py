@@ -0,0 +1,3 @@
+# test_transformers_ner.py is a manual check that downloads a model
+# (`python test_transformers_ner.py`), not part of the test suite.
+collect_ignore = ['test_transformers_ner.py']
@@ -0,0 +1,217 @@
+import heapq
+from operator import itemgetter
+from collections import Counter, defaultdict
+
+# Co-occurrence counting with bounded memory.
+#
+# Entities are interned to integer ids and every undirected pair is stored
+# once, as a single int key (low id << 32 | high id) in one flat dict, rather
+# than twice as strings in nested Counters.
+#
+# scope decides which entities of a chunk count as co-occurring:
+#   'chunk'     every pair of distinct entities in the chunk (original behaviour)
+#   'sentence'  only entities in the same sentence
+#   'window'    only entities whose start offsets are within `window` characters
+#
+# With max_pairs set, the table is pruned whenever it grows past that size:
+# exactly enough of the lightest pairs are dropped to get back to 3/4 of the
+# limit (ties are broken arbitrarily), and the prune floor is raised to the
+# heaviest weight dropped. Heavy pairs survive, so top-k related entities
+# stay accurate; any surviving pair may be undercounted by at most
+# `prune_floor` (the occurrences it had before it was last dropped).
+
+SCOPES = ('chunk', 'sentence', 'window')
+
+class CooccurrenceGraph:
+    def __init__(self, scope='chunk', window=200, max_pairs=None):
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown co-occurrence scope {scope!r}, expected one of {SCOPES}")
+        self.scope = scope
+        self.window = window
+        self.max_pairs = max_pairs
+        self.prune_floor = 0
+        self.ids = {}
+        self.names = []
+        self.pairs = {}
+        self._adjacency = None   # cached adjacency() for the mapping-style access
+
+    # --- ids ---
+    def _id(self, name):
+        i = self.ids.get(name)
+        if i is None:
+            i = len(self.names)
+            self.ids[name] = i
+            self.names.append(name)
+        return i
+
+    @staticmethod
+    def _key(a, b):
+        return (a << 32) | b if a < b else (b << 32) | a
+
+    # --- counting ---
+    def _chunk_pairs(self, entities, intern):
+        """Pair keys that one chunk contributes, each counted once per chunk."""
+        if self.scope == 'chunk':
+            groups = [entities]
+        elif self.scope == 'sentence':
+            by_sentence = defaultdict(list)
+            for e in entities:
+                by_sentence[e[4] if len(e) > 4 else 0].append(e)
+            groups = list(by_sentence.values())
+        else:
+            groups = None
+
+        keys = set()
+        if groups is not None:
+            for group in groups:
+                ids = sorted(set(intern(e[0]) for e in group) - {None})
+                for x in range(len(ids)):
+                    for y in range(x + 1, len(ids)):
+                        keys.add((ids[x] << 32) | ids[y])
+            return keys
+
+        # Window scope: sweep entities by start offset, pairing each with the
+        # ones that started less than `window` characters before it.
+        located = sorted((e[2], intern(e[0])) for e in entities if len(e) > 2 and e[2] >= 0)
+        lo = 0
+        for hi in range(len(located)):
+            start, b = located[hi]
+            while located[lo][0] < start - self.window:
+                lo += 1
+            for k in range(lo, hi):
+                a = located[k][1]
+                if a is not None and b is not None and a != b:
+                    keys.add(self._key(a, b))
+        return keys
+
+    def add(self, entities):
+        """Count the pairs of one chunk; entities are (text, type, start, end, sentence) tuples."""
+        pairs = self.pairs
+        self._adjacency = None
+        for key in self._chunk_pairs(entities, self._id):
+            pairs[key] = pairs.get(key, 0) + 1
+        if self.max_pairs and len(pairs) > self.max_pairs:
+            self.prune()
+
+    def remove(self, entities):
+        """Undo add(entities). Pairs already pruned are simply absent."""
+        pairs = self.pairs
+        self._adjacency = None
+        for key in self._chunk_pairs(entities, self.ids.get):
+            count = pairs.get(key)
+            if count is None:
+                continue
+            if count <= 1:
+                del pairs[key]
+            else:
+                pairs[key] = count - 1
+
+    def add_pair(self, a, b, weight):
+        if a == b or weight <= 0:
+            return
+        key = self._key(self._id(a), self._id(b))
+        self._adjacency = None
+        self.pairs[key] = self.pairs.get(key, 0) + weight
+
+    def prune(self, target=None):
+        """Drop the lightest pairs until at most `target` remain (default 3/4 of max_pairs)."""
+        if target is None:
+            target = (self.max_pairs * 3) // 4
+        excess = len(self.pairs) - target
+        if excess <= 0:
+            return 0
+        # Exactly `excess` keys: a cutoff weight would also take every pair tied
+        # with it, which empties a table of mostly weight-1 pairs
+        dropped = heapq.nsmallest(excess, self.pairs.items(), key=itemgetter(1))
+        for k, _ in dropped:
+            del self.pairs[k]
+        self._adjacency = None
+        self.prune_floor = max(self.prune_floor, dropped[-1][1])
+        return len(dropped)
+
+    def merge(self, other):
+        remap = [self._id(name) for name in other.names]
+        pairs = self.pairs
+        self._adjacency = None
+        for key, w in other.pairs.items():
+            nk = self._key(remap[key >> 32], remap[key & 0xFFFFFFFF])
+            pairs[nk] = pairs.get(nk, 0) + w
+        self.prune_floor = max(self.prune_floor, other.prune_floor)
+        if self.max_pairs and len(pairs) > self.max_pairs:
+            self.prune()
+        return self
+
+    # --- reading ---
+    def edges(self):
+        """Every undirected edge once, as (name, name, weight)."""
+        names = self.names
+        for key, w in self.pairs.items():
+            yield names[key >> 32], names[key & 0xFFFFFFFF], w
+
+    def weight(self, a, b):
+        ia, ib = self.ids.get(a), self.ids.get(b)
+        if ia is None or ib is None:
+            return 0
+        return self.pairs.get(self._key(ia, ib), 0)
+
+    def related(self, name, k=10):
+        """Top-k neighbours of `name`. Scans the pair table: meant for build-time use,
+        a saved index answers this from its weight-sorted adjacency instead."""
+        i = self.ids.get(name)
+        if i is None:
+            return []
+        names = self.names
+        mask = 0xFFFFFFFF
+        neighbours = ((names[key & mask] if key >> 32 == i else names[key >> 32], w)
+                      for key, w in self.pairs.items()
+                      if key >> 32 == i or key & mask == i)
+        return heapq.nlargest(k, neighbours, key=lambda item: item[1])
+
+    def adjacency(self):
+        """name -> Counter of neighbours, built in one pass over the pair table."""
+        adj = defaultdict(Counter)
+        for a, b, w in self.edges():
+            adj[a][b] = w
+            adj[b][a] = w
+        return adj
+
+    # Mapping-style access, so existing callers of IndexManager.co_occurrence keep working.
+    # The adjacency is built on first use and kept until the next change to the pair table.
+    def _mapping(self):
+        if self._adjacency is None:
+            self._adjacency = self.adjacency()
+        return self._adjacency
+
+    def __getitem__(self, name):
+        targets = self._mapping().get(name)
+        if targets is None:
+            raise KeyError(name)
+        return targets
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def items(self):
+        return self._mapping().items()
+
+    def __iter__(self):
+        return iter(self._mapping())
+
+    def __contains__(self, name):
+        return name in self._mapping()
+
+    def __len__(self):
+        return len(self._mapping())
+
+    @classmethod
+    def from_mapping(cls, co_occurrence, **options):
+        """Build from a legacy {entity: Counter} table (each edge stored twice)."""
+        graph = cls(**options)
+        for a, targets in co_occurrence.items():
+            for b, w in targets.items():
+                if a < b:
+                    graph.add_pair(a, b, w)
+        return graph
@@ -0,0 +1,96 @@
+import os
+import json
+import mmap
+import struct
+
+# Helpers for reading the crawl quickly.
+#
+# JSON decoding is pluggable: orjson and ujson are several times faster than
+# the stdlib on article-sized documents and are used when installed.
+#
+# The crawl is millions of small .txt files, so per-file open/stat/close
+# dominates ingestion. pack_shards() copies it into a handful of large shard
+# files of length-prefixed records:
+#
+#   record = path length (u32) | body length (u32) | path (utf-8) | raw file bytes
+#
+# which iter_shard_records() reads back through one mmap per shard.
+
+_RECORD = struct.Struct('<II')
+SHARD_SUFFIX = '.shard'
+UTF8_BOM = b'\xef\xbb\xbf'
+
+def json_decoder(name='auto'):
+    """Returns (name, loads) where loads accepts bytes. 'auto' picks the fastest installed."""
+    candidates = ('orjson', 'ujson', 'json') if name == 'auto' else (name,)
+    for candidate in candidates:
+        if candidate == 'json':
+            return 'json', json.loads
+        try:
+            module = __import__(candidate)
+        except ImportError:
+            if name != 'auto':
+                raise
+            continue
+        return candidate, module.loads
+    return 'json', json.loads
+
+def strip_bom(raw):
+    # The crawler writes utf-8-sig; JSON decoders reject the BOM
+    return raw[3:] if raw[:3] == UTF8_BOM else raw
+
+def read_path_list(path):
+    """
+    Normalised paths from a text file, one per line; anything after a tab is
+    ignored (e.g. the original in Linked_list/sparse_vector.py --dedup output).
+    """
+    with open(path, encoding='utf-8') as f:
+        return {os.path.normpath(line.split('\t', 1)[0].strip()) for line in f if line.strip()}
+
+def pack_shards(paths, out_dir, shard_bytes=256 << 20):
+    """Copy the files in `paths` into shard files of about `shard_bytes` each."""
+    os.makedirs(out_dir, exist_ok=True)
+    shard_no = 0
+    written = 0
+    out = None
+    records = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            body = f.read()
+        if out is None or written >= shard_bytes:
+            if out is not None:
+                out.close()
+            out = open(os.path.join(out_dir, f'crawl-{shard_no:05d}{SHARD_SUFFIX}'), 'wb')
+            shard_no += 1
+            written = 0
+        encoded = path.encode('utf-8')
+        out.write(_RECORD.pack(len(encoded), len(body)))
+        out.write(encoded)
+        out.write(body)
+        written += _RECORD.size + len(encoded) + len(body)
+        records += 1
+    if out is not None:
+        out.close()
+    return records, shard_no
+
+def shard_files(shard_dir):
+    return sorted(os.path.join(shard_dir, name) for name in os.listdir(shard_dir)
+                  if name.endswith(SHARD_SUFFIX))
+
+def iter_shard_records(shard_path):
+    """Yields (path, body bytes) for every record of one shard."""
+    with open(shard_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Sequential scan: let the kernel read ahead aggressively
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            pos, end = 0, len(mm)
+            while pos < end:
+                path_len, body_len = _RECORD.unpack_from(mm, pos)
+                pos += _RECORD.size
+                path = mm[pos:pos + path_len].decode('utf-8')
+                pos += path_len
+                yield path, mm[pos:pos + body_len]
+                pos += body_len
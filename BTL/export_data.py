@@ -1,49 +1,206 @@
-import pickle
-import pandas as pd
 import os
+import csv
+import heapq
+import argparse
+from xml.sax.saxutils import escape, quoteattr
+from analyzer import IndexManager, INDEX_PATH
+
+# Streaming exports of the entity index.
+#
+# Everything is read from the memory-mapped index and written out in batches,
+# so memory stays constant however many edges the graph has:
+#   - top-N edges use a bounded heap of N entries, and stop reading an
+#     entity's weight-sorted adjacency as soon as it cannot beat the heap
+#   - full edge lists, GEXF and GraphML are written as the edges are read
+#
+# Tables are written as Parquet or Arrow IPC when pyarrow is installed,
+# CSV otherwise (or when asked for).
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+BATCH_ROWS = 65536
+
+class TableWriter:
+    """Append-only table writer for csv / parquet / arrow, one batch at a time."""
+    def __init__(self, path, columns, fmt):
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.rows = 0
+        self._writer = None
+        if fmt == 'csv':
+            self._file = open(path, 'w', newline='', encoding='utf-8')
+            self._csv = csv.writer(self._file)
+            self._csv.writerow([name for name, _ in columns])
+        else:
+            if pa is None:
+                raise RuntimeError(f"{fmt} output needs pyarrow; use --format csv")
+            self._schema = pa.schema([(name, pa.string() if kind is str else pa.int64())
+                                      for name, kind in columns])
+            if fmt == 'parquet':
+                self._writer = pq.ParquetWriter(path, self._schema, compression='zstd')
+            else:
+                self._sink = pa.OSFile(path, 'wb')
+                self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+    def write(self, rows):
+        if not rows:
+            return
+        self.rows += len(rows)
+        if self.fmt == 'csv':
+            self._csv.writerows(rows)
+            return
+        arrays = [pa.array(list(col), type=field.type)
+                  for col, field in zip(zip(*rows), self._schema)]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        if self.fmt == 'csv':
+            self._file.close()
+        else:
+            self._writer.close()
+            if self.fmt == 'arrow':
+                self._sink.close()
+
+def batched(iterable, size=BATCH_ROWS):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def top_edges(reader, n):
+    """The n heaviest edges as (id, id, weight), heaviest first, in O(n) memory."""
+    if n <= 0:
+        return []
+    heap = []
+    co_off, co_nbr, co_wt = reader._co_off, reader._co_nbr, reader._co_wt
+    for i in range(reader.n_entities):
+        for k in range(co_off[i], co_off[i + 1]):
+            w = co_wt[k]
+            if len(heap) >= n and w <= heap[0][0]:
+                break  # the rest of this weight-sorted list is lighter still
+            j = co_nbr[k]
+            if j > i:
+                if len(heap) < n:
+                    heapq.heappush(heap, (w, i, j))
+                else:
+                    heapq.heapreplace(heap, (w, i, j))
+    return [(i, j, w) for w, i, j in sorted(heap, reverse=True)]
+
+def export_entities(reader, out_dir, fmt):
+    path = os.path.join(out_dir, f'entities_report.{fmt}')
+    writer = TableWriter(path, [('Rank', int), ('Entity', str), ('Frequency', int)], fmt)
+    ranked = ((rank, reader.entity(i), reader.frequency(i))
+              for rank, i in enumerate(reader.top_entities(reader.n_entities), 1)
+              if reader.frequency(i) > 0)
+    for batch in batched(ranked):
+        writer.write(batch)
+    writer.close()
+    print(f"Saved {writer.rows} entities to {path}")
+
+def export_edge_table(reader, edges, path, fmt):
+    writer = TableWriter(path, [('Source', str), ('Target', str), ('Weight', int)], fmt)
+    named = ((reader.entity(i), reader.entity(j), w) for i, j, w in edges)
+    for batch in batched(named):
+        writer.write(batch)
+    writer.close()
+    print(f"Saved {writer.rows} co-occurrence edges to {path}")
+
+def _graph_nodes(reader):
+    for i in range(reader.n_entities):
+        yield i, reader.entity(i), reader.frequency(i)
+
+def export_gexf(reader, path, min_weight):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<gexf xmlns="http://gexf.net/1.3" version="1.3">\n'
+                '<graph defaultedgetype="undirected">\n'
+                '<attributes class="node"><attribute id="0" title="frequency" type="long"/></attributes>\n'
+                '<nodes>\n')
+        for batch in batched(_graph_nodes(reader)):
+            f.write(''.join(f'<node id="{i}" label={quoteattr(name)}><attvalues>'
+                            f'<attvalue for="0" value="{freq}"/></attvalues></node>\n'
+                            for i, name, freq in batch))
+        f.write('</nodes>\n<edges>\n')
+        edges = 0
+        for batch in batched(reader.iter_edges(min_weight)):
+            f.write(''.join(f'<edge id="{edges + k}" source="{i}" target="{j}" weight="{w}"/>\n'
+                            for k, (i, j, w) in enumerate(batch)))
+            edges += len(batch)
+        f.write('</edges>\n</graph>\n</gexf>\n')
+    print(f"Saved {reader.n_entities} nodes and {edges} edges to {path}")
+
+def export_graphml(reader, path, min_weight):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                '<key id="label" for="node" attr.name="label" attr.type="string"/>\n'
+                '<key id="frequency" for="node" attr.name="frequency" attr.type="long"/>\n'
+                '<key id="weight" for="edge" attr.name="weight" attr.type="long"/>\n'
+                '<graph edgedefault="undirected">\n')
+        for batch in batched(_graph_nodes(reader)):
+            f.write(''.join(f'<node id="n{i}"><data key="label">{escape(name)}</data>'
+                            f'<data key="frequency">{freq}</data></node>\n'
+                            for i, name, freq in batch))
+        edges = 0
+        for batch in batched(reader.iter_edges(min_weight)):
+            f.write(''.join(f'<edge source="n{i}" target="n{j}"><data key="weight">{w}</data></edge>\n'
+                            for i, j, w in batch))
+            edges += len(batch)
+        f.write('</graph>\n</graphml>\n')
+    print(f"Saved {reader.n_entities} nodes and {edges} edges to {path}")
 
 def main():
-    index_path = 'index.pkl'
-    if not os.path.exists(index_path):
-        print(f"Error: {index_path} not found. Please wait for analyzer.py to finish.")
+    parser = argparse.ArgumentParser(description="Export the entity index for reporting and network analysis.")
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--mode", choices=['top', 'full', 'gexf', 'graphml'], default='top',
+                        help="top: N heaviest edges; full: every edge >= --min-weight; "
+                             "gexf/graphml: whole graph for Gephi and friends")
+    parser.add_argument("--top", type=int, default=5000, help="edges kept in top mode")
+    parser.add_argument("--min-weight", type=int, default=2,
+                        help="lightest edge written in full/gexf/graphml modes")
+    parser.add_argument("--format", choices=['parquet', 'arrow', 'csv'],
+                        default='parquet' if pa is not None else 'csv',
+                        help="table format for the entity report and edge lists")
+    parser.add_argument("--skip-entities", action="store_true", help="do not write entities_report")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.index):
+        print(f"Error: {args.index} not found. Please wait for analyzer.py to finish.")
+        return
+
+    print(f"Loading {args.index}...")
+    manager = IndexManager().load(args.index)
+    reader = manager.reader
+    if reader is None:
+        print("Error: streaming export needs a binary index; re-save it with analyzer.py.")
         return
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    if not args.skip_entities:
+        export_entities(reader, args.out_dir, args.format)
 
-    print(f"Loading {index_path}...")
-    with open(index_path, 'rb') as f:
-        data = pickle.load(f)
-    
-    # Export Frequency Report
-    print("Exporting entities_report.csv...")
-    freqs = data['entity_frequency']
-    df_freq = pd.DataFrame(freqs.most_common(), columns=['Entity', 'Frequency'])
-    # Add Rank (1-based)
-    df_freq.index = df_freq.index + 1
-    df_freq.to_csv('entities_report.csv', index_label='Rank')
-    print(f"Saved {len(df_freq)} entities to entities_report.csv")
-
-    # Export Co-occurrence (Edges) for Gephi/Network analysis
-    # Format: Source, Target, Weight
-    print("Exporting co_occurrence.csv (Top 1000 edges)...")
-    co_occurrence = data['co_occurrence']
-    edges = []
-    
-    # We only take significant edges to avoid massive file size
-    # Let's filter for edges with weight > 1 or just take top N
-    
-    # Flatten dict of dicts
-    for source, targets in co_occurrence.items():
-        for target, weight in targets.items():
-            if source < target: # Avoid duplicates for undirected graph
-                edges.append((source, target, weight))
-    
-    # Sort by weight
-    edges.sort(key=lambda x: x[2], reverse=True)
-    
-    # Take top 5000 edges
-    top_edges = edges[:5000]
-    df_edges = pd.DataFrame(top_edges, columns=['Source', 'Target', 'Weight'])
-    df_edges.to_csv('co_occurrence.csv', index=False)
-    print(f"Saved {len(df_edges)} co-occurrence edges to co_occurrence.csv")
+    if args.mode == 'top':
+        path = os.path.join(args.out_dir, f'co_occurrence.{args.format}')
+        print(f"Exporting top {args.top} edges...")
+        export_edge_table(reader, top_edges(reader, args.top), path, args.format)
+    elif args.mode == 'full':
+        path = os.path.join(args.out_dir, f'co_occurrence_full.{args.format}')
+        print(f"Exporting all edges with weight >= {args.min_weight}...")
+        export_edge_table(reader, reader.iter_edges(args.min_weight), path, args.format)
+    elif args.mode == 'gexf':
+        export_gexf(reader, os.path.join(args.out_dir, 'co_occurrence.gexf'), args.min_weight)
+    else:
+        export_graphml(reader, os.path.join(args.out_dir, 'co_occurrence.graphml'), args.min_weight)
 
 if __name__ == "__main__":
     main()
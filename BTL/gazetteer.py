@@ -0,0 +1,238 @@
+import re
+import unicodedata
+from collections import deque
+
+# Dictionary-based entity extraction for the cheap first pass.
+#
+# An Aho-Corasick automaton over every known surface form (seeded from the
+# entities a previous model run put in the index) finds all of them in one
+# left-to-right scan of the chunk, however many names there are.
+#
+# Matching is case-insensitive but diacritic-aware: 'hà nội' matches
+# 'Hà Nội', while 'Ha Noi' does not, since Vietnamese tone marks distinguish
+# different words. Text is normalised cluster by cluster (base letter plus
+# combining marks, composed to NFC), so NFD input matches too and every
+# match maps back to exact offsets in the original text.
+#
+# Case is still checked on the first letter: a match must start with a
+# capital in the original text, as proper names do, unless the known surface
+# form itself starts lowercase. Otherwise names that double as common
+# syllables ('An', 'Nam', 'Hà') would be tagged all through running text.
+#
+# Both Gazetteer and HybridNER take a list of texts and return results in
+# the shape of the transformers "ner" pipeline output, so they plug into
+# analyzer.windowed_inference in place of the model.
+
+PIPELINE_GROUPS = {'PER': 'PERSON', 'LOC': 'LOCATION', 'ORG': 'ORGANIZATION'}
+
+def normalize_with_offsets(text):
+    """
+    Casefolded NFC text plus, for each of its characters, the (start, end)
+    span of the original cluster it came from.
+    """
+    out = []
+    spans = []
+    i, n = 0, len(text)
+    while i < n:
+        j = i + 1
+        while j < n and unicodedata.combining(text[j]):
+            j += 1
+        folded = unicodedata.normalize('NFC', text[i:j]).lower()
+        out.append(folded)
+        spans.extend([(i, j)] * len(folded))
+        i = j
+    return ''.join(out), spans
+
+def normalize(text):
+    return normalize_with_offsets(text)[0]
+
+class AhoCorasick:
+    """Multi-pattern matcher: goto/fail/output tables over characters."""
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]   # (pattern length, payload) per state
+        self._built = False
+
+    def add(self, pattern, payload):
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append((len(pattern), payload))
+        self._built = False
+
+    def build(self):
+        # BFS: a state's failure link is the longest proper suffix that is
+        # also a path from the root; its outputs are inherited.
+        queue = deque(self.goto[0].values())
+        for s in queue:
+            self.fail[s] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+        self._built = True
+
+    def iter_matches(self, text):
+        """Yields (start, end, payload) for every occurrence, overlaps included."""
+        if not self._built:
+            self.build()
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, payload in output[state]:
+                yield i + 1 - length, i + 1, payload
+
+    def __len__(self):
+        return len(self.goto)
+
+class Gazetteer:
+    """
+    Known-entity matcher. Keeps whole-word, leftmost-longest, non-overlapping
+    matches, as the model would report them. require_capital=False drops
+    the first-letter case check (the original, fully case-insensitive matching).
+    """
+    def __init__(self, entries=(), require_capital=True):
+        self.automaton = AhoCorasick()
+        self.require_capital = require_capital
+        self.lowercase_keys = set()   # keys with a surface form that starts lowercase
+        self.size = 0
+        for surface, entity_type in entries:
+            self.add(surface, entity_type)
+
+    def add(self, surface, entity_type):
+        surface = surface.strip()
+        key = normalize(surface)
+        if key:
+            self.automaton.add(key, entity_type)
+            if surface[0].islower():
+                self.lowercase_keys.add(key)
+            self.size += 1
+
+    @classmethod
+    def from_index(cls, manager, min_frequency=2, min_length=2, **options):
+        """
+        Seed from an IndexManager: every typed entity seen at least
+        `min_frequency` times (rare ones are mostly model noise).
+        """
+        reader = manager.reader
+        if reader is not None:
+            typed = ((reader.entity(i), reader.frequency(i), reader.entity_type(i))
+                     for i in range(reader.n_entities))
+        else:
+            typed = ((name, freq, manager.entity_type(name))
+                     for name, freq in manager.entity_frequency.items())
+        return cls(((name, entity_type) for name, freq, entity_type in typed
+                    if entity_type and freq >= min_frequency and len(name.strip()) >= min_length),
+                   **options)
+
+    def find(self, text):
+        """[(start, end, type)] in original-text offsets."""
+        normalized, spans = normalize_with_offsets(text)
+        candidates = []
+        for start, end, entity_type in self.automaton.iter_matches(normalized):
+            # Whole words only: 'Nam' must not match inside 'Nampho'
+            if start > 0 and normalized[start - 1].isalnum():
+                continue
+            if end < len(normalized) and normalized[end].isalnum():
+                continue
+            # Proper names are capitalised: 'nam' in running text is not 'Nam'
+            if (self.require_capital and text[spans[start][0]].islower()
+                    and normalized[start:end] not in self.lowercase_keys):
+                continue
+            candidates.append((start, end, entity_type))
+        candidates.sort(key=lambda m: (m[0], m[0] - m[1]))
+        matches = []
+        last_end = 0
+        for start, end, entity_type in candidates:
+            if start >= last_end:
+                matches.append((spans[start][0], spans[end - 1][1], entity_type))
+                last_end = end
+        return matches
+
+    def __call__(self, texts, batch_size=None):
+        if isinstance(texts, str):
+            texts = [texts]
+        return [[{'entity_group': PIPELINE_GROUPS[t], 'word': text[s:e], 'start': s, 'end': e,
+                  'score': 1.0}
+                 for s, e, t in self.find(text)]
+                for text in texts]
+
+# The Np heuristic from debug_ner.py, without the POS tagger: capitalised
+# syllables are likely parts of proper nouns. A sentence's first word is
+# capitalised anyway and is skipped; a name starting a sentence still has
+# its later syllables checked.
+WORD = re.compile(r'\w+')
+SENTENCE_END = re.compile(r'[.!?…:\n]\s*$')
+
+def capitalized_words(text):
+    """(start, end) of the capitalised words that look like parts of names."""
+    words = []
+    first = True
+    prev_end = 0
+    for m in WORD.finditer(text):
+        if SENTENCE_END.search(text[prev_end:m.start()]):
+            first = True
+        if not first and m.group()[0].isupper():
+            words.append((m.start(), m.end()))
+        first = False
+        prev_end = m.end()
+    return words
+
+class HybridNER:
+    """
+    Gazetteer first; a chunk goes to the model only if it has a capitalised
+    word that no known entity covers. Counts how many chunks took each path.
+    """
+    def __init__(self, gazetteer, model_pipe):
+        self.gazetteer = gazetteer
+        self.model_pipe = model_pipe
+        self.fast_chunks = 0
+        self.model_chunks = 0
+
+    def needs_model(self, text, matches):
+        covered = [(s, e) for s, e, _ in matches]
+        return any(not any(s <= start and end <= e for s, e in covered)
+                   for start, end in capitalized_words(text))
+
+    def __call__(self, texts, batch_size=32):
+        if isinstance(texts, str):
+            texts = [texts]
+        results = []
+        unknown = []
+        for i, text in enumerate(texts):
+            matches = self.gazetteer.find(text)
+            if self.needs_model(text, matches):
+                unknown.append(i)
+                results.append(None)
+            else:
+                results.append([{'entity_group': PIPELINE_GROUPS[t], 'word': text[s:e],
+                                 'start': s, 'end': e, 'score': 1.0} for s, e, t in matches])
+        if unknown:
+            for i, result in zip(unknown, self.model_pipe([texts[i] for i in unknown],
+                                                           batch_size=batch_size)):
+                results[i] = result
+        self.fast_chunks += len(texts) - len(unknown)
+        self.model_chunks += len(unknown)
+        return results
+
+    def report(self):
+        total = self.fast_chunks + self.model_chunks
+        share = self.model_chunks / total if total else 0.0
+        print(f"Hybrid NER: {self.fast_chunks} chunks by gazetteer, "
+              f"{self.model_chunks} sent to the model ({share:.1%}).")
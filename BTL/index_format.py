@@ -0,0 +1,530 @@
+import os
+import mmap
+import struct
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from postings import PostingList, encode as encode_postings
+
+# On-disk layout of the entity index (little-endian, every section 8-byte aligned):
+#
+#   header   : MAGIC | version (u32) | section count (u32)
+#   toc      : one (name[8], offset u64, length u64) entry per section
+#   sections :
+#     ent_off / ent_str  string table of entity names, sorted, id = position
+#     doc_off / doc_str  string table of document paths, sorted, id = position
+#     freq               u64 per entity
+#     ent_type           u8 per entity: most frequent NER type (see ENTITY_TYPE_CODES)
+#     post_off / post_n  per entity: first block of its postings, number of docs
+#     blk_head / blk_pos skip table of the compressed posting blocks (see
+#     blk_wid            postings.py): first doc id, byte position, gap width
+#     post_gap           delta-encoded doc ids, narrowest byte width per block
+#     co_off / co_nbr /  CSR co-occurrence adjacency: neighbour ids and their
+#     co_wt              u32 weights per entity, heaviest edge first
+#     by_freq            u32 entity ids ordered by frequency, highest first
+#     fold_off/fold_str  sorted string table of folded names (see fold_name)
+#     fold_ent           u32 entity id for each folded name
+#     tl_off / tl_day /  CSR timeline: the u32 day ordinals an entity was
+#     tl_cum             mentioned on, ascending, and u64 running mention totals
+#     src_off / src_str  string table of article sources, sorted, id = position
+#     es_off / es_src /  CSR per-entity source counts: source ids and u64
+#     es_cnt             mentions, most mentions first
+#     meta               u64 values: entities with postings, last day, and the
+#                        co-occurrence scope (COOCCURRENCE_SCOPE_CODES, 0 if
+#                        unknown) and window the graph was counted with
+#
+# Entity and document ids are interned by sorted order, so a name can be
+# resolved with a binary search over the string table without ever building
+# a dict, and only the pages a lookup touches become resident. The by_freq
+# and weight-ordered adjacency sections make every top-k query O(k); the
+# running totals of the timeline make any date-range count O(log T).
+
+MAGIC = b'VNERIDX\x00'
+VERSION = 5
+
+# u8 codes of the ent_type section
+ENTITY_TYPE_CODES = {'PER': 1, 'LOC': 2, 'ORG': 3}
+ENTITY_TYPE_NAMES = {code: name for name, code in ENTITY_TYPE_CODES.items()}
+
+# codes of the co-occurrence scope in meta (see cooccurrence.SCOPES)
+COOCCURRENCE_SCOPE_CODES = {'chunk': 1, 'sentence': 2, 'window': 3}
+COOCCURRENCE_SCOPE_NAMES = {code: name for name, code in COOCCURRENCE_SCOPE_CODES.items()}
+
+_HEADER = struct.Struct('<8sII')
+_TOC_ENTRY = struct.Struct('<8sQQ')
+
+if array('I').itemsize != 4 or array('Q').itemsize != 8:
+    raise ImportError("index_format needs 4-byte 'I' and 8-byte 'Q' arrays")
+
+
+def fold_name(name):
+    """
+    Lookup key that ignores case and Vietnamese diacritics:
+    'Hà Nội', 'HÀ NỘI' and 'ha noi' all fold to 'ha noi'.
+    """
+    decomposed = unicodedata.normalize('NFD', name.casefold())
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.replace('đ', 'd').split())
+
+
+def _string_table(strings):
+    offsets = array('Q', [0])
+    blob = bytearray()
+    for s in strings:
+        blob += s.encode('utf-8')
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def write_index(path, inverted_index, entity_frequency, co_occurrence, entity_types=None,
+                timeline=None):
+    """
+    Serialise the IndexManager tables into the binary format.
+    The file is written next to `path` and renamed into place, so a reader
+    never sees a half-written index.
+    """
+    names = set(inverted_index)
+    names.update(entity_frequency)
+    if hasattr(co_occurrence, 'edges'):
+        for a, b, _ in co_occurrence.edges():
+            names.add(a)
+            names.add(b)
+    else:
+        names.update(co_occurrence)
+    entities = sorted(names)
+    entity_id = {e: i for i, e in enumerate(entities)}
+
+    docs = set()
+    for paths in inverted_index.values():
+        docs.update(paths)
+    docs = sorted(docs)
+    doc_id = {d: i for i, d in enumerate(docs)}
+
+    ent_off, ent_str = _string_table(entities)
+    doc_off, doc_str = _string_table(docs)
+
+    freq = array('Q', (entity_frequency.get(e, 0) for e in entities))
+    entity_types = entity_types or {}
+    ent_type = array('B', (ENTITY_TYPE_CODES.get(entity_types[e].most_common(1)[0][0], 0)
+                           if entity_types.get(e) else 0
+                           for e in entities))
+
+    post_off = array('Q', [0])
+    post_n = array('I')
+    blk_head = array('I')
+    blk_pos = array('Q')
+    blk_wid = array('B')
+    post_gap = bytearray()
+    for e in entities:
+        ids = sorted(doc_id[d] for d in inverted_index.get(e, ()))
+        encode_postings(ids, post_gap, blk_head, blk_pos, blk_wid)
+        post_off.append(len(blk_head))
+        post_n.append(len(ids))
+
+    # Adjacency from the undirected edge list (see cooccurrence.CooccurrenceGraph),
+    # or from a legacy {entity: Counter} table that holds every edge twice.
+    adjacency = [[] for _ in entities]
+    if hasattr(co_occurrence, 'edges'):
+        edges = co_occurrence.edges()
+    else:
+        edges = ((a, b, w) for a, targets in co_occurrence.items()
+                 for b, w in targets.items() if a < b)
+    for a, b, w in edges:
+        if w > 0:
+            ia, ib = entity_id[a], entity_id[b]
+            adjacency[ia].append((ib, w))
+            adjacency[ib].append((ia, w))
+
+    co_off = array('Q', [0])
+    co_nbr = array('I')
+    co_wt = array('I')
+    for neighbours in adjacency:
+        neighbours.sort(key=lambda edge: (-edge[1], edge[0]))
+        for nbr, w in neighbours:
+            co_nbr.append(nbr)
+            co_wt.append(w)
+        co_off.append(len(co_nbr))
+    del adjacency
+
+    by_freq = array('I', sorted(range(len(entities)), key=lambda i: (-freq[i], i)))
+
+    folded = sorted((fold_name(e), i) for i, e in enumerate(entities))
+    fold_off, fold_str = _string_table(key for key, _ in folded)
+    fold_ent = array('I', (i for _, i in folded))
+
+    tl_off = array('Q', [0])
+    tl_day = array('I')
+    tl_cum = array('Q')
+    es_off = array('Q', [0])
+    es_src = array('I')
+    es_cnt = array('Q')
+    days = timeline.days if timeline is not None else {}
+    source_counts = timeline.sources if timeline is not None else {}
+    sources = sorted({s for counts in source_counts.values() for s in counts})
+    source_id = {s: i for i, s in enumerate(sources)}
+    last_day = 0
+    for e in entities:
+        total = 0
+        for day, n in sorted(days.get(e, {}).items()):
+            total += n
+            tl_day.append(day)
+            tl_cum.append(total)
+            last_day = max(last_day, day)
+        tl_off.append(len(tl_day))
+        for source, n in sorted(source_counts.get(e, {}).items(), key=lambda item: -item[1]):
+            es_src.append(source_id[source])
+            es_cnt.append(n)
+        es_off.append(len(es_src))
+    src_off, src_str = _string_table(sources)
+
+    # Retracting a document later must count pairs the way they were added
+    meta = array('Q', [sum(1 for e in entities if inverted_index.get(e)), last_day,
+                       COOCCURRENCE_SCOPE_CODES.get(getattr(co_occurrence, 'scope', None), 0),
+                       getattr(co_occurrence, 'window', 0)])
+
+    sections = [
+        (b'meta', meta.tobytes()),
+        (b'ent_off', ent_off.tobytes()),
+        (b'ent_str', ent_str),
+        (b'doc_off', doc_off.tobytes()),
+        (b'doc_str', doc_str),
+        (b'freq', freq.tobytes()),
+        (b'ent_type', ent_type.tobytes()),
+        (b'post_off', post_off.tobytes()),
+        (b'post_n', post_n.tobytes()),
+        (b'blk_head', blk_head.tobytes()),
+        (b'blk_pos', blk_pos.tobytes()),
+        (b'blk_wid', blk_wid.tobytes()),
+        (b'post_gap', bytes(post_gap)),
+        (b'co_off', co_off.tobytes()),
+        (b'co_nbr', co_nbr.tobytes()),
+        (b'co_wt', co_wt.tobytes()),
+        (b'by_freq', by_freq.tobytes()),
+        (b'fold_off', fold_off.tobytes()),
+        (b'fold_str', fold_str),
+        (b'fold_ent', fold_ent.tobytes()),
+        (b'tl_off', tl_off.tobytes()),
+        (b'tl_day', tl_day.tobytes()),
+        (b'tl_cum', tl_cum.tobytes()),
+        (b'src_off', src_off.tobytes()),
+        (b'src_str', src_str),
+        (b'es_off', es_off.tobytes()),
+        (b'es_src', es_src.tobytes()),
+        (b'es_cnt', es_cnt.tobytes()),
+    ]
+    _write_sections(path, sections)
+    return len(entities), len(docs)
+
+
+def _write_sections(path, sections):
+    toc_size = _HEADER.size + _TOC_ENTRY.size * len(sections)
+    offset = (toc_size + 7) & ~7
+    toc = []
+    for name, data in sections:
+        if len(name) > 8:
+            raise ValueError(f"section name {name!r} is longer than 8 bytes")
+        toc.append((name, offset, len(data)))
+        offset = (offset + len(data) + 7) & ~7
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(sections)))
+        for name, off, length in toc:
+            f.write(_TOC_ENTRY.pack(name, off, length))
+        for (name, off, length), (_, data) in zip(toc, sections):
+            f.write(b'\x00' * (off - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+def is_binary_index(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class IndexReader:
+    """
+    Read-only, memory-mapped view of an index written by `write_index`.
+    Opening is O(number of sections); nothing is decoded until asked for.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+
+        magic, version, n_sections = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary entity index")
+        if version != VERSION:
+            raise ValueError(f"{path} has index version {version}, expected {VERSION}")
+        self.version = version
+
+        self._sections = {}
+        for i in range(n_sections):
+            name, off, length = _TOC_ENTRY.unpack_from(self._mm, _HEADER.size + i * _TOC_ENTRY.size)
+            self._sections[name.rstrip(b'\x00').decode('ascii')] = (off, length)
+
+        self._ent_off = self._array('ent_off', 'Q')
+        self._ent_str = self._bytes('ent_str')
+        self._doc_off = self._array('doc_off', 'Q')
+        self._doc_str = self._bytes('doc_str')
+        self._freq = self._array('freq', 'Q')
+        self._ent_type = self._array('ent_type', 'B')
+        self._post_off = self._array('post_off', 'Q')
+        self._post_n = self._array('post_n', 'I')
+        self._blk_head = self._array('blk_head', 'I')
+        self._blk_pos = self._array('blk_pos', 'Q')
+        self._blk_wid = self._array('blk_wid', 'B')
+        self._post_gap = self._bytes('post_gap')
+        self._co_off = self._array('co_off', 'Q')
+        self._co_nbr = self._array('co_nbr', 'I')
+        self._co_wt = self._array('co_wt', 'I')
+        self._by_freq = self._array('by_freq', 'I')
+        self._fold_off = self._array('fold_off', 'Q')
+        self._fold_str = self._bytes('fold_str')
+        self._fold_ent = self._array('fold_ent', 'I')
+        self._tl_off = self._array('tl_off', 'Q')
+        self._tl_day = self._array('tl_day', 'I')
+        self._tl_cum = self._array('tl_cum', 'Q')
+        self._src_off = self._array('src_off', 'Q')
+        self._src_str = self._bytes('src_str')
+        self._es_off = self._array('es_off', 'Q')
+        self._es_src = self._array('es_src', 'I')
+        self._es_cnt = self._array('es_cnt', 'Q')
+
+        meta = self._array('meta', 'Q')
+        self.n_indexed = meta[0]
+        self.last_day = meta[1] or None
+        # None for indexes written before the options were saved
+        self.cooccurrence_scope = COOCCURRENCE_SCOPE_NAMES.get(meta[2]) if len(meta) > 2 else None
+        self.cooccurrence_window = meta[3] if self.cooccurrence_scope else None
+        meta.release()
+
+        self.n_entities = len(self._ent_off) - 1
+        self.n_docs = len(self._doc_off) - 1
+
+    def _bytes(self, name):
+        off, length = self._sections[name]
+        return self._buf[off:off + length]
+
+    def _array(self, name, fmt):
+        return self._bytes(name).cast(fmt)
+
+    def close(self):
+        # Views must be released before the map can be closed.
+        for attr in ('_ent_off', '_ent_str', '_doc_off', '_doc_str', '_freq', '_ent_type',
+                     '_post_off', '_post_n', '_blk_head', '_blk_pos', '_blk_wid',
+                     '_post_gap', '_co_off', '_co_nbr', '_co_wt', '_by_freq',
+                     '_fold_off', '_fold_str', '_fold_ent', '_tl_off', '_tl_day', '_tl_cum',
+                     '_src_off', '_src_str', '_es_off', '_es_src', '_es_cnt', '_buf'):
+            getattr(self, attr).release()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- string tables ---
+    def entity(self, i):
+        return self._entity_bytes(i).decode('utf-8')
+
+    def _entity_bytes(self, i):
+        return bytes(self._ent_str[self._ent_off[i]:self._ent_off[i + 1]])
+
+    def doc(self, i):
+        return bytes(self._doc_str[self._doc_off[i]:self._doc_off[i + 1]]).decode('utf-8')
+
+    def _fold_bytes(self, i):
+        return bytes(self._fold_str[self._fold_off[i]:self._fold_off[i + 1]])
+
+    @staticmethod
+    def _lower_bound(key, n, key_at):
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, name):
+        """Binary search the sorted string table; returns the entity id or -1."""
+        key = name.encode('utf-8')
+        i = self._lower_bound(key, self.n_entities, self._entity_bytes)
+        if i < self.n_entities and self._entity_bytes(i) == key:
+            return i
+        return -1
+
+    def find_folded(self, name):
+        """Ids of every entity whose folded name equals fold_name(name)."""
+        key = fold_name(name).encode('utf-8')
+        n = len(self._fold_ent)
+        i = self._lower_bound(key, n, self._fold_bytes)
+        ids = []
+        while i < n and self._fold_bytes(i) == key:
+            ids.append(self._fold_ent[i])
+            i += 1
+        return ids
+
+    # --- per-entity data ---
+    def frequency(self, i):
+        return self._freq[i]
+
+    def entity_type(self, i):
+        """'PER', 'LOC', 'ORG' or None."""
+        return ENTITY_TYPE_NAMES.get(self._ent_type[i])
+
+    def posting_list(self, i):
+        """Compressed postings of entity i, for seeking and set operations."""
+        return PostingList(self, self._post_off[i], self._post_off[i + 1], self._post_n[i])
+
+    def postings(self, i):
+        """Sorted doc ids of entity i, decoded into an array('I')."""
+        return self.posting_list(i).decode()
+
+    def neighbors(self, i):
+        """(neighbour ids, weights) of entity i, heaviest edge first."""
+        start, end = self._co_off[i], self._co_off[i + 1]
+        return self._co_nbr[start:end], self._co_wt[start:end]
+
+    def degree(self, i):
+        return self._co_off[i + 1] - self._co_off[i]
+
+    def iter_edges(self, min_weight=1):
+        """
+        Every undirected edge once, as (id, id, weight) with the first id the
+        smaller. Adjacency is weight-sorted, so each list is only read down
+        to `min_weight`.
+        """
+        co_off, co_nbr, co_wt = self._co_off, self._co_nbr, self._co_wt
+        for i in range(self.n_entities):
+            for k in range(co_off[i], co_off[i + 1]):
+                w = co_wt[k]
+                if w < min_weight:
+                    break
+                j = co_nbr[k]
+                if j > i:
+                    yield i, j, w
+
+    def top_entities(self, k):
+        """First k ids of the frequency-ordered table."""
+        return self._by_freq[:k]
+
+    # --- timeline ---
+    def mentions_between(self, i, start, end):
+        """Mentions of entity i on days start..end (ordinals, inclusive): two binary searches."""
+        base, stop = self._tl_off[i], self._tl_off[i + 1]
+        days, cum = self._tl_day, self._tl_cum
+        lo = bisect_left(days, start, base, stop)
+        hi = bisect_right(days, end, lo, stop)
+        if hi == lo:
+            return 0
+        return cum[hi - 1] - (cum[lo - 1] if lo > base else 0)
+
+    def day_counts(self, i):
+        """[(day ordinal, mentions)] of entity i in day order."""
+        base, stop = self._tl_off[i], self._tl_off[i + 1]
+        days, cum = self._tl_day, self._tl_cum
+        return [(days[k], cum[k] - (cum[k - 1] if k > base else 0)) for k in range(base, stop)]
+
+    def source(self, s):
+        return bytes(self._src_str[self._src_off[s]:self._src_off[s + 1]]).decode('utf-8')
+
+    def source_counts(self, i):
+        """[(source, mentions)] of entity i, most mentions first."""
+        start, end = self._es_off[i], self._es_off[i + 1]
+        return [(self.source(self._es_src[k]), self._es_cnt[k]) for k in range(start, end)]
+
+
+# --- Mapping views, so a loaded IndexManager exposes the same attributes
+# (inverted_index, entity_frequency, co_occurrence) as a freshly built one.
+
+class _EntityView(Mapping):
+    def __init__(self, reader):
+        self._reader = reader
+
+    def __iter__(self):
+        for i in range(self._reader.n_entities):
+            if self._has(i):
+                yield self._reader.entity(i)
+
+    def __len__(self):
+        return sum(1 for i in range(self._reader.n_entities) if self._has(i))
+
+    def __contains__(self, name):
+        i = self._reader.find(name) if isinstance(name, str) else -1
+        return i >= 0 and self._has(i)
+
+    def __getitem__(self, name):
+        i = self._reader.find(name) if isinstance(name, str) else -1
+        if i < 0 or not self._has(i):
+            raise KeyError(name)
+        return self._value(i)
+
+
+class PostingsView(_EntityView):
+    """entity -> frozenset of document paths"""
+    def _has(self, i):
+        return self._reader._post_n[i] > 0
+
+    def __len__(self):
+        return self._reader.n_indexed
+
+    def _value(self, i):
+        doc = self._reader.doc
+        return frozenset(doc(d) for d in self._reader.postings(i))
+
+
+class FrequencyView(_EntityView):
+    """entity -> frequency, with the Counter.most_common interface"""
+    def _has(self, i):
+        return self._reader._freq[i] > 0
+
+    def _value(self, i):
+        return self._reader._freq[i]
+
+    def get(self, name, default=0):
+        i = self._reader.find(name) if isinstance(name, str) else -1
+        return self._reader._freq[i] if i >= 0 else default
+
+    def most_common(self, n=None):
+        reader = self._reader
+        freq = reader._freq
+        order = reader.top_entities(reader.n_entities if n is None else n)
+        return [(reader.entity(i), freq[i]) for i in order if freq[i] > 0]
+
+
+class DocList(Sequence):
+    """
+    Document paths of one posting list. Paths are decoded only when indexed,
+    so len() and the first page of results cost nothing for hot entities.
+    """
+    def __init__(self, reader, doc_ids):
+        self._reader = reader
+        self._doc_ids = doc_ids
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._reader.doc(d) for d in self._doc_ids[i]]
+        return self._reader.doc(self._doc_ids[i])
+
+
+class CooccurrenceView(_EntityView):
+    """entity -> Counter of co-occurring entities"""
+    def _has(self, i):
+        return self._reader.degree(i) > 0
+
+    def _value(self, i):
+        nbrs, wts = self._reader.neighbors(i)
+        entity = self._reader.entity
+        return Counter({entity(j): w for j, w in zip(nbrs, wts)})
@@ -1,15 +1,20 @@
-import pickle
-from collections import Counter
+from datetime import date
+from analyzer import IndexManager, INDEX_PATH
 
 def inspect():
     try:
-        with open('index.pkl', 'rb') as f:
-            data = pickle.load(f)
-            freq = data.get('entity_frequency', Counter())
-            print(f"Total unique entities: {len(freq)}")
-            print("Top 20:")
-            for e, c in freq.most_common(20):
-                print(f"{e}: {c}")
+        manager = IndexManager().load(INDEX_PATH)
+        freq = manager.entity_frequency
+        print(f"Total unique entities: {len(freq)}")
+        print("Top 20:")
+        for e, c in freq.most_common(20):
+            print(f"{e}: {c}")
+        last = manager.last_day()
+        if last is not None:
+            print(f"Trending in the week to {date.fromordinal(last)}:")
+            for e, current, previous in manager.get_trending_entities(days=7, k=10):
+                print(f"{e}: {previous} -> {current}")
+        manager.close()
     except Exception as e:
         print(f"Error: {e}")
 
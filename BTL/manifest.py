@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import sqlite3
+
+# The manifest lives next to the index and remembers, for every article that
+# went into it, the file's mtime/size/content hash and the entities each of
+# its chunks contributed. That is enough to skip unchanged files on the next
+# run and to retract exactly what a modified or deleted file added.
+#
+# Articles read from packed shards (corpus.pack_shards) are tracked by the
+# record that was indexed, not the original file, which may no longer exist:
+# `source` is the shard's file name, mtime the shard's mtime, size and hash
+# those of the record body. Plain files have an empty source.
+
+def manifest_path(index_path):
+    return index_path + '.manifest'
+
+def content_hash(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def bytes_hash(raw):
+    """Same digest as content_hash, for bytes already in memory (e.g. a shard record)."""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+class Manifest:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path   TEXT PRIMARY KEY,
+                mtime  REAL NOT NULL,
+                size   INTEGER NOT NULL,
+                hash   TEXT NOT NULL,
+                chunks TEXT NOT NULL,
+                source TEXT NOT NULL DEFAULT ''
+            )""")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+        if 'source' not in columns:
+            # Manifest written before shard records were tracked
+            self.conn.execute("ALTER TABLE files ADD COLUMN source TEXT NOT NULL DEFAULT ''")
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def chunks(self, path):
+        """Entity lists recorded for each chunk of `path` (JSON round-trips tuples as lists)."""
+        row = self.conn.execute("SELECT chunks FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return []
+        return [[tuple(e) for e in chunk] for chunk in json.loads(row[0])]
+
+    def diff(self, files, fingerprints=None):
+        """
+        Compare the files on disk with the manifest.
+        Returns (new, changed, deleted, unchanged_count). A file whose
+        mtime/size moved but whose content hash did not is treated as
+        unchanged and its stat is refreshed. With `fingerprints`
+        (path -> (source, mtime, size, hash), see DataLoader.fingerprints)
+        the files are shard records and are compared by their hash.
+        """
+        known = {path: (mtime, size, digest) for path, mtime, size, digest
+                 in self.conn.execute("SELECT path, mtime, size, hash FROM files")}
+        new, changed = [], []
+        unchanged = 0
+        for path in files:
+            old = known.pop(path, None)
+            if old is None:
+                new.append(path)
+                continue
+            if fingerprints is not None:
+                source, mtime, size, digest = fingerprints[path]
+                if digest == old[2]:
+                    self.conn.execute("UPDATE files SET mtime = ?, size = ?, source = ? WHERE path = ?",
+                                      (mtime, size, source, path))
+                    unchanged += 1
+                else:
+                    changed.append(path)
+                continue
+            st = os.stat(path)
+            if (st.st_mtime, st.st_size) == old[:2]:
+                unchanged += 1
+            elif content_hash(path) == old[2]:
+                self.conn.execute("UPDATE files SET mtime = ?, size = ? WHERE path = ?",
+                                  (st.st_mtime, st.st_size, path))
+                unchanged += 1
+            else:
+                changed.append(path)
+        deleted = list(known)
+        return new, changed, deleted, unchanged
+
+    def record(self, path, chunks, fingerprint=None):
+        """`fingerprint` is (source, mtime, size, hash) of the shard record the chunks came from."""
+        if fingerprint is None:
+            st = os.stat(path)
+            fingerprint = ('', st.st_mtime, st.st_size, content_hash(path))
+        source, mtime, size, digest = fingerprint
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime, size, hash, chunks, source) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, mtime, size, digest, json.dumps(chunks, ensure_ascii=False), source))
+
+    def remove(self, path):
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self, commit=True):
+        if commit:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.conn.close()
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import time
+import platform
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# Run metrics for the indexing pipeline.
+#
+# The pipeline is a chain of generators (read -> tokenize -> infer -> index)
+# all pulled by one loop on the main thread, so each stage's time is taken
+# as *self* time: whatever a stage spends waiting on the stage below it is
+# charged to that stage, not to both. File reads on the I/O threads are
+# timed separately ('io'), next to the main thread's time waiting for them
+# ('read').
+#
+#   stages    wall and CPU seconds and call count per stage
+#   counters  files, chunks, tokens, entities, model batches, ...
+#   queues    depth samples between stages (mean / max)
+#
+# METRICS is process-wide; a sharded build merges each worker's snapshot.
+# report() returns everything as a dict, write_report() as a JSON file.
+
+class _Stage:
+    __slots__ = ('wall', 'cpu', 'calls')
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.calls = 0
+
+class RunMetrics:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.stages = {}
+        self.counters = Counter()
+        self.queues = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- timers ---
+    @contextmanager
+    def stage(self, name):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [0.0, 0.0]   # wall / cpu spent in nested stages
+        stack.append(frame)
+        wall0, cpu0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.thread_time() - cpu0
+            stack.pop()
+            if stack:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+            self._add(name, wall - frame[0], cpu - frame[1])
+
+    def _add(self, name, wall, cpu, calls=1):
+        with self._lock:
+            s = self.stages.get(name)
+            if s is None:
+                s = self.stages[name] = _Stage()
+            s.wall += wall
+            s.cpu += cpu
+            s.calls += calls
+
+    def timed(self, name, iterable):
+        """Wrap an iterator so the time spent producing each item counts to `name`."""
+        it = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    # --- counters and queue depths ---
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def sample_queue(self, name, depth):
+        q = self.queues.get(name)
+        if q is None:
+            q = self.queues[name] = [0, 0, 0]   # samples, sum, max
+        q[0] += 1
+        q[1] += depth
+        q[2] = max(q[2], depth)
+
+    # --- reporting ---
+    def snapshot(self):
+        """Picklable state, for merging a worker process's metrics."""
+        return {'stages': {n: (s.wall, s.cpu, s.calls) for n, s in self.stages.items()},
+                'counters': dict(self.counters),
+                'queues': {n: list(q) for n, q in self.queues.items()},
+                'peak_rss_mb': peak_rss_mb()}
+
+    def merge(self, snapshot):
+        for name, (wall, cpu, calls) in snapshot['stages'].items():
+            self._add(name, wall, cpu, calls)
+        self.counters.update(snapshot['counters'])
+        for name, (samples, total, peak) in snapshot['queues'].items():
+            q = self.queues.setdefault(name, [0, 0, 0])
+            q[0] += samples
+            q[1] += total
+            q[2] = max(q[2], peak)
+        self.counters['worker_peak_rss_mb'] = max(self.counters['worker_peak_rss_mb'],
+                                                  snapshot['peak_rss_mb'])
+
+    def report(self, **extra):
+        wall = time.perf_counter() - self._t0
+        stages = {}
+        for name, s in sorted(self.stages.items(), key=lambda item: -item[1].wall):
+            stages[name] = {'wall_s': round(s.wall, 4), 'cpu_s': round(s.cpu, 4), 'calls': s.calls,
+                            'share': round(s.wall / wall, 4) if wall else 0.0}
+        main_stages = {n: s for n, s in self.stages.items() if n != 'io'}
+        rates = {f'{name}_per_s': round(self.counters[name] / wall, 2) if wall else 0.0
+                 for name in ('files', 'chunks', 'tokens', 'entities') if name in self.counters}
+        queues = {name: {'samples': n, 'mean': round(total / n, 2) if n else 0.0, 'max': peak}
+                  for name, (n, total, peak) in self.queues.items()}
+        report = {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'wall_s': round(wall, 3),
+            'cpu_s': round(time.process_time(), 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'bottleneck': max(main_stages, key=lambda n: main_stages[n].wall) if main_stages else None,
+            'stages': stages,
+            'counters': dict(self.counters),
+            'rates': rates,
+            'queues': queues,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pid': os.getpid(),
+        }
+        report.update(extra)
+        return report
+
+    def write_report(self, path, **extra):
+        report = self.report(**extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return report
+
+    def summary(self, report=None):
+        report = report or self.report()
+        lines = [f"Run: {report['wall_s']:.1f}s wall, {report['cpu_s']:.1f}s CPU, "
+                 f"peak RSS {report['peak_rss_mb']:.0f} MB, bottleneck: {report['bottleneck']}"]
+        for name, s in report['stages'].items():
+            lines.append(f"  {name:<10}{s['wall_s']:>10.2f}s wall{s['cpu_s']:>10.2f}s CPU"
+                         f"{s['share']:>8.1%}{s['calls']:>10} calls")
+        if report['rates']:
+            lines.append("  " + ", ".join(f"{k.replace('_per_s', '')}/s: {v}" for k, v in report['rates'].items()))
+        for name, q in report['queues'].items():
+            lines.append(f"  queue {name}: mean {q['mean']}, max {q['max']}")
+        return '\n'.join(lines)
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:   # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes on Linux
+    return round(peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024, 1)
+
+METRICS = RunMetrics()
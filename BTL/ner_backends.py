@@ -0,0 +1,97 @@
+import os
+
+# Inference backends for the NER step.
+#
+#   torch      the transformers pipeline in PyTorch eager mode (original path)
+#   onnx       the same model exported to ONNX, run by ONNX Runtime on CPU
+#   onnx-int8  the ONNX export with dynamic int8 quantization of the weights
+#
+# Every backend returns a regular transformers "ner" pipeline, so chunking,
+# batching, caching and indexing do not care which one is in use.
+# The ONNX exports are written once under ONNX_DIR and reused afterwards.
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+ONNX_DIR = 'onnx_models'
+
+def backend_tag(model_name, backend, ner_mode='model'):
+    """Identifies the model+backend pair (and gazetteer mode), e.g. for NER cache keys."""
+    tag = model_name if backend == 'torch' else f"{model_name}@{backend}"
+    return tag if ner_mode == 'model' else f"{tag}+{ner_mode}"
+
+def _export_dir(model_name, quantize):
+    name = model_name.replace('/', '__')
+    return os.path.join(ONNX_DIR, name + ('-int8' if quantize else ''))
+
+def export_onnx(model_name, quantize=False):
+    """Export (and optionally quantize) the model; returns (directory, onnx file name)."""
+    from optimum.onnxruntime import ORTModelForTokenClassification
+
+    fp32_dir = _export_dir(model_name, False)
+    if not os.path.exists(os.path.join(fp32_dir, 'model.onnx')):
+        print(f"Exporting {model_name} to ONNX in {fp32_dir}...")
+        model = ORTModelForTokenClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(fp32_dir)
+    if not quantize:
+        return fp32_dir, 'model.onnx'
+
+    int8_dir = _export_dir(model_name, True)
+    if not os.path.exists(os.path.join(int8_dir, 'model_quantized.onnx')):
+        import platform
+        from optimum.onnxruntime import ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        print(f"Quantizing to int8 in {int8_dir}...")
+        # Dynamic quantization: weights are int8 offline, activations are
+        # quantized on the fly, so no calibration data is needed.
+        if platform.machine().lower() in ('arm64', 'aarch64'):
+            qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantizer = ORTQuantizer.from_pretrained(fp32_dir, file_name='model.onnx')
+        quantizer.quantize(save_dir=int8_dir, quantization_config=qconfig)
+    return int8_dir, 'model_quantized.onnx'
+
+def load_pipeline(model_name, backend='torch', device=-1, intra_op=None, inter_op=None):
+    """
+    Build the "ner" pipeline for `backend`.
+    intra_op / inter_op set the thread pools (per operator / across
+    operators); None leaves the library default, usually all cores.
+    Returns (tokenizer, ner_pipe).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    from transformers import pipeline, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if backend == 'torch':
+        import torch
+        if intra_op:
+            torch.set_num_threads(intra_op)
+        if inter_op:
+            try:
+                torch.set_num_interop_threads(inter_op)
+            except RuntimeError:
+                # Can only be set once per process, before any parallel work
+                print("Warning: inter-op threads already fixed for this process.")
+        ner_pipe = pipeline("ner", model=model_name, tokenizer=tokenizer,
+                            aggregation_strategy="simple", device=device)
+        return tokenizer, ner_pipe
+
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForTokenClassification
+
+    model_dir, file_name = export_onnx(model_name, quantize=(backend == 'onnx-int8'))
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if intra_op:
+        options.intra_op_num_threads = intra_op
+    if inter_op:
+        options.inter_op_num_threads = inter_op
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+    model = ORTModelForTokenClassification.from_pretrained(
+        model_dir, file_name=file_name, session_options=options,
+        provider="CPUExecutionProvider")
+    ner_pipe = pipeline("ner", model=model, tokenizer=tokenizer,
+                        aggregation_strategy="simple")
+    return tokenizer, ner_pipe
@@ -0,0 +1,126 @@
+import json
+import time
+import hashlib
+import sqlite3
+
+# Persistent cache of NER results. Syndicated articles and boilerplate
+# paragraphs repeat across sites, so many chunks of a rebuild have been seen
+# before; for those the pipeline is skipped entirely.
+#
+# key   = blake2b(format version + model name + chunk text), so switching
+#         models or entity layouts never serves stale results
+# value = the filtered entity list, as JSON, offsets relative to the chunk
+#
+# The cache is bounded by entry count. When it grows past `max_entries` the
+# least recently used tenth is evicted in one statement.
+
+# Bump when the cached entity tuples change shape
+KEY_VERSION = 2
+
+class NERCache:
+    def __init__(self, path, model_name, max_entries=2_000_000):
+        self.path = path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.inference_seconds = 0.0  # time spent on the misses, to estimate savings
+
+        # Sharded workers share one cache file, hence WAL and a generous timeout
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ner_cache (
+                key       BLOB PRIMARY KEY,
+                entities  TEXT NOT NULL,
+                last_used INTEGER NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ner_cache_lru ON ner_cache(last_used)")
+        self._size = self.conn.execute("SELECT COUNT(*) FROM ner_cache").fetchone()[0]
+
+    def key(self, text):
+        h = hashlib.blake2b(f"{KEY_VERSION}:{self.model_name}".encode('utf-8'), digest_size=16)
+        h.update(b'\x00')
+        h.update(text.encode('utf-8'))
+        return h.digest()
+
+    def get_many(self, texts):
+        """Cached entity lists for `texts`, None where the chunk is not cached."""
+        keys = [self.key(t) for t in texts]
+        found = {}
+        unique = list(set(keys))
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(unique), 500):
+            part = unique[i:i + 500]
+            marks = ','.join('?' * len(part))
+            for key, entities in self.conn.execute(
+                    f"SELECT key, entities FROM ner_cache WHERE key IN ({marks})", part):
+                found[key] = entities
+        if found:
+            now = int(time.time())
+            self.conn.executemany("UPDATE ner_cache SET last_used = ? WHERE key = ?",
+                                  [(now, k) for k in found])
+
+        results = []
+        for key in keys:
+            entities = found.get(key)
+            if entities is None:
+                self.misses += 1
+                results.append(None)
+            else:
+                self.hits += 1
+                results.append([tuple(e) for e in json.loads(entities)])
+        return results
+
+    def put_many(self, texts, entity_lists):
+        now = int(time.time())
+        rows = [(self.key(t), json.dumps(ents, ensure_ascii=False), now)
+                for t, ents in zip(texts, entity_lists)]
+        cur = self.conn.executemany(
+            "INSERT OR IGNORE INTO ner_cache (key, entities, last_used) VALUES (?, ?, ?)", rows)
+        self._size += max(cur.rowcount, 0)
+        self.conn.commit()
+        if self._size > self.max_entries:
+            self._evict()
+
+    def _evict(self):
+        target = int(self.max_entries * 0.9)
+        # Another process may have filled the cache too, so recount first
+        self._size = self.conn.execute("SELECT COUNT(*) FROM ner_cache").fetchone()[0]
+        excess = self._size - target
+        if excess <= 0:
+            return
+        self.conn.execute("""
+            DELETE FROM ner_cache WHERE key IN (
+                SELECT key FROM ner_cache ORDER BY last_used LIMIT ?)""", (excess,))
+        self.conn.commit()
+        self.evictions += excess
+        self._size -= excess
+
+    def __len__(self):
+        return self._size
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        per_chunk = self.inference_seconds / self.misses if self.misses else 0.0
+        return {
+            'entries': self._size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'inference_seconds': self.inference_seconds,
+            'estimated_seconds_saved': self.hits * per_chunk,
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"NER cache: {s['hits']} hits / {s['misses']} misses "
+              f"({s['hit_rate']:.1%} hit rate), {s['entries']} entries, "
+              f"{s['evictions']} evicted, ~{s['estimated_seconds_saved']:.0f}s of inference saved.")
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
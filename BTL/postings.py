@@ -0,0 +1,214 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+# Compressed posting lists and the set operations over them.
+#
+# A posting list is a sorted run of u32 doc ids, cut into blocks of
+# BLOCK_SIZE. Each block keeps its first id uncompressed in a skip table,
+# and the gaps to the following ids packed at the narrowest byte width that
+# holds the block's largest gap (1, 2 or 4 bytes). Gaps between the docs of
+# hot entities are small, so most blocks pack at one byte per posting, and a
+# block decodes with one memoryview.cast and itertools.accumulate, both in C.
+#
+# The skip table (first id and byte position per block) lets a cursor jump
+# straight to the blocks that can hold a range of ids: intersections gallop
+# over block heads and decode only the blocks they land in.
+
+BLOCK_SIZE = 256
+# A run of ids is filtered by decoding every block it spans only when that is
+# at most one block per DENSE_RATIO ids. Otherwise each id is probed in its
+# own block, so a rare list ANDed with a hot one decodes only the blocks its
+# ids fall in, not nearly the whole hot list.
+DENSE_RATIO = 8
+_WIDTH_FORMAT = {1: 'B', 2: 'H', 4: 'I'}
+
+def _width(largest_gap):
+    return 1 if largest_gap < 0x100 else 2 if largest_gap < 0x10000 else 4
+
+def encode(doc_ids, blob, blk_head, blk_pos, blk_wid):
+    """
+    Append the sorted list `doc_ids` as blocks: gaps go to `blob`
+    (bytearray), the skip table to the three arrays.
+    """
+    for b in range(0, len(doc_ids), BLOCK_SIZE):
+        block = doc_ids[b:b + BLOCK_SIZE]
+        gaps = [block[k] - block[k - 1] for k in range(1, len(block))]
+        width = _width(max(gaps, default=0))
+        # Keep every block aligned to its own width
+        blob += b'\x00' * (-len(blob) % width)
+        blk_head.append(block[0])
+        blk_pos.append(len(blob))
+        blk_wid.append(width)
+        blob += array(_WIDTH_FORMAT[width], gaps).tobytes()
+
+class PostingList:
+    """
+    One entity's compressed postings: blocks first..stop of the reader's
+    skip table. Iterating decodes block by block; `cursor()` reads ranges.
+    """
+    __slots__ = ('_reader', 'first', 'stop', 'n')
+
+    def __init__(self, reader, first, stop, n):
+        self._reader = reader
+        self.first = first
+        self.stop = stop
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def block(self, b):
+        """Doc ids of block b (absolute block number), as a list."""
+        reader = self._reader
+        width = reader._blk_wid[b]
+        start = reader._blk_pos[b]
+        # Every block but the last holds BLOCK_SIZE ids
+        end = start + width * (min(BLOCK_SIZE, self.n - (b - self.first) * BLOCK_SIZE) - 1)
+        gaps = reader._post_gap[start:end].cast(_WIDTH_FORMAT[width])
+        return list(accumulate(gaps, initial=reader._blk_head[b]))
+
+    def __iter__(self):
+        for b in range(self.first, self.stop):
+            yield from self.block(b)
+
+    def decode(self):
+        ids = array('I')
+        for b in range(self.first, self.stop):
+            ids.extend(self.block(b))
+        return ids
+
+    def cursor(self):
+        return Cursor(self)
+
+class Cursor:
+    """Forward-only filtering of sorted id runs against a PostingList, guided by the skip table."""
+    __slots__ = ('plist', 'heads', 'b', 'cached', 'ids')
+
+    def __init__(self, plist):
+        self.plist = plist
+        self.heads = plist._reader._blk_head
+        self.b = plist.first
+        self.cached = -1
+        self.ids = None
+
+    def _block(self, b):
+        if b != self.cached:
+            self.cached = b
+            self.ids = self.plist.block(b)
+        return self.ids
+
+    def _seek_block(self, target):
+        """Last block whose head is <= target, galloping forward from the current one."""
+        heads, stop = self.heads, self.plist.stop
+        b = self.b
+        step = 1
+        nxt = b + 1
+        while nxt < stop and heads[nxt] <= target:
+            b = nxt
+            nxt = b + step
+            step *= 2
+        self.b = b = max(bisect_right(heads, target, b, min(nxt, stop)) - 1, self.b)
+        return b
+
+    def filter(self, ids, keep=True):
+        """
+        The members of the sorted run `ids` that are (keep=True) or are not
+        (keep=False) in the list. Runs must not move backwards between calls.
+        """
+        plist, heads = self.plist, self.heads
+        if not plist.n or self.b >= plist.stop:
+            return [] if keep else ids
+        lo, hi = ids[0], ids[-1]
+        b = self._seek_block(lo)
+        last = bisect_right(heads, hi, b, plist.stop)
+        if last - b <= len(ids) // DENSE_RATIO:
+            # Dense: decode the covering blocks and filter with set operations
+            window = set()
+            for k in range(b, last):
+                window.update(self._block(k))
+            return [d for d in ids if (d in window) == keep]
+        # Sparse run against a long list: probe each id in its own block, so
+        # at most len(ids) blocks are decoded however long the list is
+        out = []
+        for d in ids:
+            ids_b = self._block(self._seek_block(d))
+            k = bisect_left(ids_b, d)
+            if (k < len(ids_b) and ids_b[k] == d) == keep:
+                out.append(d)
+        return out
+
+class _SequenceCursor:
+    """The same filtering over an already decoded sorted sequence."""
+    __slots__ = ('ids', 'k')
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.k = 0
+
+    def filter(self, ids, keep=True):
+        seq = self.ids
+        self.k = k = bisect_left(seq, ids[0], self.k)
+        end = bisect_right(seq, ids[-1], k)
+        if end - k <= len(ids) * BLOCK_SIZE // DENSE_RATIO:
+            window = set(seq[k:end])
+            return [d for d in ids if (d in window) == keep]
+        out = []
+        for d in ids:
+            k = bisect_left(seq, d, k, end)
+            if (k < end and seq[k] == d) == keep:
+                out.append(d)
+        return out
+
+# --- set operations on sorted doc id sequences; results are sorted lists.
+# Work is done one block of the driving list at a time: the skip tables
+# locate the matching range of every other list. Where that range is short
+# (see DENSE_RATIO), it is decoded whole and the block filtered with a set;
+# where it is longer, each id is looked up in its own block.
+
+CHUNK = 1024
+
+def _cursor(ids):
+    return ids.cursor() if isinstance(ids, PostingList) else _SequenceCursor(ids)
+
+def _chunks(ids):
+    if isinstance(ids, PostingList):
+        for b in range(ids.first, ids.stop):
+            yield ids.block(b)
+    else:
+        for k in range(0, len(ids), CHUNK):
+            yield ids[k:k + CHUNK]
+
+def intersect(lists):
+    """AND of PostingLists (or plain sorted sequences); the shortest list drives."""
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    cursors = [_cursor(ids) for ids in lists[1:]]
+    out = []
+    for chunk in _chunks(lists[0]):
+        for cursor in cursors:
+            if not chunk:
+                break
+            chunk = cursor.filter(chunk)
+        out.extend(chunk)
+    return out
+
+def difference(ids, excluded):
+    """ids AND NOT any of `excluded`."""
+    cursors = [_cursor(other) for other in excluded]
+    out = []
+    for chunk in _chunks(ids):
+        for cursor in cursors:
+            if not chunk:
+                break
+            chunk = cursor.filter(chunk, keep=False)
+        out.extend(chunk)
+    return out
+
+def union(lists):
+    """OR of PostingLists (or plain sorted sequences)."""
+    merged = set()
+    for ids in lists:
+        merged.update(ids.decode() if isinstance(ids, PostingList) else ids)
+    return sorted(merged)
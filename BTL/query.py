@@ -0,0 +1,127 @@
+import re
+from postings import intersect, union, difference
+
+# Boolean entity queries:
+#
+#   "Hà Nội" AND "Bộ Y tế" NOT "COVID"
+#   (Hà Nội OR TP.HCM) AND Bộ Y tế
+#
+# AND, OR and NOT are operators only in capitals. Unquoted words run
+# together into one entity name until the next operator, parenthesis or
+# quote; adjacent terms without an operator are ANDed, and "x NOT y" means
+# "x AND NOT y". Precedence: NOT, then AND, then OR.
+#
+# parse() returns a tree of tuples:
+#   ('term', name) | ('not', node) | ('and', [nodes]) | ('or', [nodes])
+
+TOKEN = re.compile(r'\s*(?:"([^"]*)"|(\()|(\))|([^\s()"]+))')
+OPERATORS = ('AND', 'OR', 'NOT')
+
+class QueryError(ValueError):
+    pass
+
+def tokenize(text):
+    tokens = []
+    words = []
+
+    def flush():
+        if words:
+            tokens.append(('term', ' '.join(words)))
+            words.clear()
+
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = TOKEN.match(text, pos)
+        pos = m.end()
+        quoted, lparen, rparen, word = m.groups()
+        if word is not None and word not in OPERATORS:
+            words.append(word)
+            continue
+        flush()
+        if quoted is not None:
+            tokens.append(('term', quoted.strip()))
+        elif lparen:
+            tokens.append(('(', None))
+        elif rparen:
+            tokens.append((')', None))
+        else:
+            tokens.append((word, None))
+    flush()
+    return tokens
+
+def parse(text):
+    tokens = tokenize(text)
+    if not tokens:
+        raise QueryError("empty query")
+    node, pos = _parse_or(tokens, 0)
+    if pos != len(tokens):
+        raise QueryError(f"unexpected {tokens[pos][0]!r}")
+    return node
+
+def _parse_or(tokens, pos):
+    children = []
+    while True:
+        node, pos = _parse_and(tokens, pos)
+        children.append(node)
+        if pos < len(tokens) and tokens[pos][0] == 'OR':
+            pos += 1
+        else:
+            return (children[0] if len(children) == 1 else ('or', children)), pos
+
+def _parse_and(tokens, pos):
+    children = []
+    while pos < len(tokens) and tokens[pos][0] not in ('OR', ')'):
+        if tokens[pos][0] == 'AND':
+            pos += 1
+        node, pos = _parse_unary(tokens, pos)
+        children.append(node)
+    if not children:
+        raise QueryError("missing term")
+    return (children[0] if len(children) == 1 else ('and', children)), pos
+
+def _parse_unary(tokens, pos):
+    if pos >= len(tokens):
+        raise QueryError("query ends after an operator")
+    kind, value = tokens[pos]
+    if kind == 'NOT':
+        node, pos = _parse_unary(tokens, pos + 1)
+        return ('not', node), pos
+    if kind == '(':
+        node, pos = _parse_or(tokens, pos + 1)
+        if pos >= len(tokens) or tokens[pos][0] != ')':
+            raise QueryError("missing ')'")
+        return node, pos + 1
+    if kind == 'term':
+        return ('term', value), pos + 1
+    raise QueryError(f"unexpected {kind!r}")
+
+def evaluate(node, lookup, universe):
+    """
+    Sorted doc ids matching `node`. lookup(name) returns the posting lists
+    the name resolves to; universe() the sorted ids of all documents, only
+    needed for a query with no positive term at all.
+    """
+    result = _evaluate(node, lookup, universe)
+    return result if isinstance(result, list) else list(result)
+
+def _evaluate(node, lookup, universe):
+    kind = node[0]
+    if kind == 'term':
+        lists = lookup(node[1])
+        if len(lists) == 1:
+            return lists[0]   # left compressed, so AND can seek into it
+        return union(lists)
+    if kind == 'or':
+        return union([_evaluate(child, lookup, universe) for child in node[1]])
+    if kind == 'not':
+        return difference(universe(), [_evaluate(node[1], lookup, universe)])
+    positive = [child for child in node[1] if child[0] != 'not']
+    negative = [child[1] for child in node[1] if child[0] == 'not']
+    if positive:
+        ids = intersect([_evaluate(child, lookup, universe) for child in positive])
+    else:
+        ids = universe()
+    if negative:
+        ids = difference(ids, [_evaluate(child, lookup, universe) for child in negative])
+    return ids
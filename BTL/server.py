@@ -0,0 +1,260 @@
+import json
+import time
+import asyncio
+import argparse
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from analyzer import IndexManager, INDEX_PATH
+from query import QueryError
+
+# Local HTTP/JSON query service over one shared, memory-mapped index.
+#
+#   GET /search?q=<boolean query>&page=1&per_page=10
+#   GET /top?k=20
+#   GET /related?entity=<name>&k=10
+#   GET /metrics                       cache stats and per-endpoint latency histograms
+#
+# A plain asyncio server speaking just enough HTTP/1.1 (GET, keep-alive):
+# one process loads the index once and serves every client. Answers are
+# kept in an LRU cache with a TTL, so hot queries skip the index entirely;
+# misses run on a small thread pool so one slow query does not hold up the
+# connections waiting behind it.
+
+DEFAULT_PORT = 8765
+# Latency histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+class TTLCache:
+    """LRU cache whose entries also expire `ttl` seconds after being stored."""
+    def __init__(self, maxsize=4096, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires = entry
+            if expires > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def record(self, ms):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile."""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return BUCKETS_MS[-1]
+
+    def to_dict(self):
+        return {'count': self.total,
+                'mean_ms': self.sum_ms / self.total if self.total else 0.0,
+                'p50_ms': self.quantile(0.5), 'p99_ms': self.quantile(0.99),
+                'buckets': {('inf' if b == float('inf') else str(b)): c
+                            for b, c in zip(BUCKETS_MS, self.counts)}}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+def _param(params, name, default=None, kind=str):
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise HTTPError(400, f"missing parameter '{name}'")
+        return default
+    try:
+        return kind(values[0])
+    except ValueError:
+        raise HTTPError(400, f"parameter '{name}' must be {kind.__name__}")
+
+class QueryServer:
+    def __init__(self, manager, cache_size=4096, cache_ttl=300.0, max_k=1000):
+        self.manager = manager
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self.max_k = max_k
+        self.histograms = {}
+        self.endpoints = {'/search': self.search, '/top': self.top, '/related': self.related}
+
+    # --- endpoints: (params) -> JSON-serialisable result; run off the event loop ---
+    def search(self, params):
+        query = _param(params, 'q')
+        page = max(1, _param(params, 'page', 1, int))
+        per_page = min(self.max_k, max(1, _param(params, 'per_page', 10, int)))
+        try:
+            total, paths = self.manager.boolean_search(query, page=page, per_page=per_page)
+        except QueryError as e:
+            raise HTTPError(400, f"invalid query: {e}")
+        return {'query': query, 'total': total, 'page': page, 'results': list(paths)}
+
+    def top(self, params):
+        k = min(self.max_k, max(1, _param(params, 'k', 20, int)))
+        return {'k': k, 'entities': [[e, c] for e, c in self.manager.get_top_entities(k)]}
+
+    def related(self, params):
+        entity = _param(params, 'entity')
+        k = min(self.max_k, max(1, _param(params, 'k', 10, int)))
+        related = self.manager.get_related_entities(entity, k)
+        resolved = entity
+        if not related:
+            matches = self.manager.resolve(entity)
+            if matches:
+                resolved = matches[0]
+                related = self.manager.get_related_entities(resolved, k)
+        return {'entity': resolved, 'related': [[e, w] for e, w in related]}
+
+    def metrics(self):
+        return {'cache': self.cache.stats(),
+                'endpoints': {path: h.to_dict() for path, h in sorted(self.histograms.items())}}
+
+    # --- HTTP ---
+    async def dispatch(self, target):
+        url = urlsplit(target)
+        if url.path == '/metrics':
+            return 200, self.metrics()
+        handler = self.endpoints.get(url.path)
+        if handler is None:
+            return 404, {'error': f"unknown endpoint {url.path}"}
+        params = parse_qs(url.query)
+        key = (url.path, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+        body = self.cache.get(key)
+        if body is None:
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(None, handler, params)
+            except HTTPError as e:
+                return e.status, {'error': str(e)}
+            body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+            self.cache.put(key, body)
+        return 200, body
+
+    @staticmethod
+    async def respond(writer, status, body, keep_alive):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                     .encode('latin-1') + body)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length:
+                        await reader.readexactly(length)
+                except (ValueError, asyncio.LimitOverrunError) as e:
+                    # A line over the stream limit (readline raises ValueError), or a bad
+                    # Content-Length: the rest of the stream cannot be framed, so close
+                    await self.respond(writer, 400, {'error': f"malformed request: {e}"}, False)
+                    break
+
+                start = time.perf_counter()
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    status, body = 400, {'error': 'malformed request line'}
+                    target = ''
+                else:
+                    method, target, _ = parts
+                    if method != 'GET':
+                        status, body = 405, {'error': 'only GET is supported'}
+                    else:
+                        try:
+                            status, body = await self.dispatch(target)
+                        except Exception as e:
+                            status, body = 500, {'error': f"{type(e).__name__}: {e}"}
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self.respond(writer, status, body, keep_alive)
+
+                path = urlsplit(target).path
+                if path in self.endpoints:
+                    self.histograms.setdefault(path, LatencyHistogram()).record(
+                        (time.perf_counter() - start) * 1000)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(manager, host='127.0.0.1', port=DEFAULT_PORT, threads=4, **options):
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=threads))
+    app = QueryServer(manager, **options)
+    server = await asyncio.start_server(app.handle, host, port)
+    print(f"Serving on http://{host}:{port} (endpoints: /search /top /related /metrics)")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve entity queries over HTTP/JSON.")
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-size", type=int, default=4096, help="cached answers (LRU)")
+    parser.add_argument("--cache-ttl", type=float, default=300.0, help="seconds an answer stays cached")
+    parser.add_argument("--threads", type=int, default=4, help="threads answering cache misses")
+    args = parser.parse_args()
+
+    manager = IndexManager().load(args.index)
+    try:
+        asyncio.run(serve(manager, args.host, args.port, args.threads,
+                          cache_size=args.cache_size, cache_ttl=args.cache_ttl))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import json
+import random
+import argparse
+from datetime import date, timedelta
+
+# Synthetic Vietnamese-like crawl, for benchmarks that must run offline.
+#
+# Files follow the crawler's layout: one directory per site, files named
+# '<date>_<site>_<time>.txt', each a utf-8-sig JSON object with Subject,
+# Summary and Content. Text is built from Vietnamese syllables (with tone
+# marks) and a fixed cast of person / location / organisation names drawn
+# with a Zipf-like skew, so a few entities are very hot and most are rare,
+# as in the real crawl. The same seed always writes the same corpus.
+
+SITES = ('vnexpress.net', 'dantri.com.vn', 'tuoitre.vn', 'thanhnien.vn', 'afamily.vn', 'vietnamnet.vn')
+
+ONSETS = ('', 'b', 'c', 'ch', 'd', 'đ', 'g', 'gi', 'h', 'k', 'kh', 'l', 'm', 'n', 'ng', 'nh',
+          'ph', 'qu', 'r', 's', 't', 'th', 'tr', 'v', 'x')
+VOWELS = ('a', 'á', 'à', 'ả', 'ã', 'ạ', 'ă', 'ắ', 'ằ', 'â', 'ấ', 'ầ', 'ậ', 'e', 'é', 'è', 'ê',
+          'ế', 'ề', 'ệ', 'i', 'í', 'ì', 'o', 'ó', 'ò', 'ô', 'ố', 'ồ', 'ộ', 'ơ', 'ớ', 'ờ', 'ợ',
+          'u', 'ú', 'ù', 'ư', 'ứ', 'ừ', 'ự', 'y', 'ươ', 'ướ', 'ườ', 'iê', 'iế', 'uô', 'uố')
+CODAS = ('', '', '', 'c', 'ch', 'm', 'n', 'ng', 'nh', 'p', 't', 'i', 'o', 'u')
+
+SURNAMES = ('Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Huỳnh', 'Phan', 'Vũ', 'Võ', 'Đặng',
+            'Bùi', 'Đỗ', 'Hồ', 'Ngô', 'Dương', 'Lý')
+MIDDLE = ('Văn', 'Thị', 'Hữu', 'Đức', 'Minh', 'Ngọc', 'Thanh', 'Quốc', 'Xuân', 'Hoài')
+GIVEN = ('An', 'Bình', 'Cường', 'Dũng', 'Giang', 'Hà', 'Hải', 'Hùng', 'Hương', 'Khánh', 'Lan',
+         'Linh', 'Long', 'Mai', 'Nam', 'Phong', 'Phúc', 'Quân', 'Sơn', 'Tâm', 'Thảo', 'Trang',
+         'Trung', 'Tuấn', 'Việt', 'Yến')
+LOCATIONS = ('Hà Nội', 'TP.HCM', 'Đà Nẵng', 'Hải Phòng', 'Cần Thơ', 'Huế', 'Nha Trang',
+             'Quảng Ninh', 'Nghệ An', 'Thanh Hóa', 'Bình Dương', 'Đồng Nai', 'Lâm Đồng',
+             'Khánh Hòa', 'Quảng Nam', 'Bắc Ninh', 'Việt Nam', 'Nhật Bản', 'Hàn Quốc', 'Mỹ')
+ORGANIZATIONS = ('Bộ Y tế', 'Bộ Giáo dục và Đào tạo', 'Quốc hội', 'Chính phủ', 'Bộ Công an',
+                 'Ngân hàng Nhà nước', 'Tập đoàn Điện lực Việt Nam', 'Bộ Tài chính',
+                 'Liên Hợp Quốc', 'Đại học Quốc gia Hà Nội', 'Sở Y tế', 'UBND TP.HCM')
+
+def entity_cast(n_people=400, seed=0):
+    """The fixed set of names the corpus mentions: [(name, 'PER'|'LOC'|'ORG')]."""
+    rng = random.Random(seed)
+    people = set()
+    while len(people) < n_people:
+        people.add(f"{rng.choice(SURNAMES)} {rng.choice(MIDDLE)} {rng.choice(GIVEN)}")
+    cast = [(name, 'LOC') for name in LOCATIONS] + [(name, 'ORG') for name in ORGANIZATIONS]
+    cast += [(name, 'PER') for name in sorted(people)]
+    rng.shuffle(cast)
+    return cast
+
+class CorpusGenerator:
+    def __init__(self, seed=0, n_people=400):
+        self.rng = random.Random(seed)
+        self.cast = entity_cast(n_people, seed)
+        # Zipf-like popularity: weight 1/rank
+        self.weights = [1.0 / rank for rank in range(1, len(self.cast) + 1)]
+
+    def syllable(self):
+        rng = self.rng
+        return rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS)
+
+    def sentence(self):
+        rng = self.rng
+        words = [self.syllable() for _ in range(rng.randint(8, 22))]
+        for _ in range(rng.choice((0, 1, 1, 2, 3))):
+            name, _ = rng.choices(self.cast, self.weights)[0]
+            words.insert(rng.randrange(1, len(words)), name)
+        words[0] = words[0].capitalize()
+        return ' '.join(words) + rng.choice(('.', '.', '.', '!', '?'))
+
+    def paragraph(self, n_sentences):
+        return ' '.join(self.sentence() for _ in range(n_sentences))
+
+    def article(self, mean_sentences=25):
+        n = max(3, int(self.rng.expovariate(1 / mean_sentences)))
+        return {'Subject': self.sentence().rstrip('.!?'),
+                'Summary': self.paragraph(2),
+                'Content': '\n'.join(self.paragraph(self.rng.randint(3, 6))
+                                     for _ in range(max(1, n // 4)))}
+
+def write_corpus(out_dir, n_articles, seed=0, mean_sentences=25, start=date(2025, 5, 1), days=28):
+    """Write `n_articles` files under out_dir/<site>/; returns their paths."""
+    gen = CorpusGenerator(seed)
+    paths = []
+    for i in range(n_articles):
+        site = SITES[i % len(SITES)]
+        day = start + timedelta(days=gen.rng.randrange(days))
+        stamp = f"{gen.rng.randrange(24):02d}-{gen.rng.randrange(60):02d}-{gen.rng.randrange(60):02d}"
+        site_dir = os.path.join(out_dir, site)
+        os.makedirs(site_dir, exist_ok=True)
+        path = os.path.join(site_dir, f"{day.isoformat()}_{site}_{stamp}_{i:07d}.txt")
+        with open(path, 'w', encoding='utf-8-sig') as f:
+            json.dump(gen.article(mean_sentences), f, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Vietnamese-like article crawl.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mean-sentences", type=int, default=25)
+    args = parser.parse_args()
+    paths = write_corpus(args.out_dir, args.articles, args.seed, args.mean_sentences)
+    print(f"Wrote {len(paths)} articles to {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+from cooccurrence import CooccurrenceGraph
+
+
+def test_prune_with_tied_weights_drops_only_the_excess():
+    graph = CooccurrenceGraph(max_pairs=1000)
+    for i in range(1001):
+        graph.add_pair(f"a{i}", f"b{i}", 1)
+    assert graph.prune() == 251
+    assert len(graph.pairs) == 750
+    assert graph.prune_floor == 1
+
+
+def test_prune_keeps_heavy_pairs():
+    graph = CooccurrenceGraph(max_pairs=8)
+    graph.add_pair("x", "y", 5)
+    for i in range(10):
+        graph.add_pair(f"a{i}", f"b{i}", 1)
+    graph.prune()
+    assert len(graph.pairs) == 6
+    assert graph.weight("x", "y") == 5
+
+
+def test_add_over_max_pairs_keeps_three_quarters():
+    graph = CooccurrenceGraph(max_pairs=100)
+    for i in range(101):
+        graph.add([(f"e{i}", "PER", 0, 1), (f"f{i}", "PER", 5, 6)])
+    assert len(graph.pairs) == 75
+
+
+def test_mapping_access_follows_updates():
+    graph = CooccurrenceGraph()
+    graph.add([("A", "PER", 0, 1), ("B", "ORG", 5, 6)])
+    assert graph["A"]["B"] == 1
+    assert "C" not in graph
+    graph.add([("A", "PER", 0, 1), ("C", "LOC", 5, 6)])
+    assert graph["A"] == {"B": 1, "C": 1}
+    assert len(graph) == 3
+    graph.remove([("A", "PER", 0, 1), ("B", "ORG", 5, 6)])
+    assert "B" not in graph["A"]
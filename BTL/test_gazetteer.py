@@ -0,0 +1,21 @@
+from gazetteer import Gazetteer
+
+
+def _found(gazetteer, text):
+    return [text[s:e] for s, e, _ in gazetteer.find(text)]
+
+
+def test_common_syllables_are_not_tagged_in_running_text():
+    gazetteer = Gazetteer([('An', 'PER'), ('Nam', 'LOC'), ('Hà Nội', 'LOC')])
+    text = "Người dân an tâm về miền nam, còn An ở Hà Nội."
+    assert _found(gazetteer, text) == ['An', 'Hà Nội']
+
+
+def test_lowercase_surface_forms_still_match():
+    gazetteer = Gazetteer([('iPhone', 'ORG')])
+    assert _found(gazetteer, "Ra mắt iPhone mới") == ['iPhone']
+
+
+def test_matching_stays_diacritic_aware_and_whole_word():
+    gazetteer = Gazetteer([('Nam', 'LOC')])
+    assert _found(gazetteer, "Nám Nampho Nam") == ['Nam']
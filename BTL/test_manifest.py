@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from corpus import pack_shards, iter_shard_records, shard_files
+from manifest import Manifest, bytes_hash, content_hash
+
+
+def _article(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"Subject": "%s", "Summary": "", "Content": ""}' % text)
+
+
+def _shard_fingerprints(shard_dir):
+    prints = {}
+    for shard in shard_files(shard_dir):
+        name, mtime = os.path.basename(shard), os.stat(shard).st_mtime
+        for path, raw in iter_shard_records(shard):
+            prints[path] = (name, mtime, len(raw), bytes_hash(raw))
+    return prints
+
+
+def test_bytes_hash_matches_content_hash(tmp_path):
+    path = tmp_path / 'a.txt'
+    _article(path, 'Hà Nội')
+    assert bytes_hash(path.read_bytes()) == content_hash(str(path))
+
+
+def test_shard_records_are_tracked_without_the_original_files(tmp_path):
+    originals = [str(tmp_path / f'{i}.txt') for i in range(3)]
+    for i, path in enumerate(originals):
+        _article(path, f'article {i}')
+    shard_dir = str(tmp_path / 'shards')
+    pack_shards(originals, shard_dir)
+    for path in originals:
+        os.remove(path)
+
+    manifest = Manifest(str(tmp_path / 'index.manifest'))
+    prints = _shard_fingerprints(shard_dir)
+    for path in originals:
+        manifest.record(path, [[('Hà Nội', 'LOC', 0, 6)]], prints[path])
+    assert len(manifest) == 3
+    assert manifest.diff(originals, prints) == ([], [], [], 3)
+
+    # Repacking with one article edited: only that record counts as changed
+    for i, path in enumerate(originals):
+        _article(path, 'edited' if i == 1 else f'article {i}')
+    repacked = str(tmp_path / 'repacked')
+    pack_shards(originals[:2], repacked)
+    prints = _shard_fingerprints(repacked)
+    assert manifest.diff(originals[:2], prints) == ([], [originals[1]], [originals[2]], 1)
+    manifest.close()
+
+
+def test_incremental_run_over_shards_does_not_reindex(tmp_path):
+    analyzer = pytest.importorskip('analyzer')
+    originals = [str(tmp_path / f'{i}.txt') for i in range(3)]
+    for i, path in enumerate(originals):
+        _article(path, f'article {i}')
+    shard_dir = str(tmp_path / 'shards')
+    pack_shards(originals, shard_dir)
+    for path in originals:
+        os.remove(path)
+
+    loader = analyzer.DataLoader(str(tmp_path), shard_dir=shard_dir)
+    manifest = Manifest(str(tmp_path / 'index.manifest'))
+    prints = loader.fingerprints()
+    for path in loader.get_files():
+        manifest.record(path, [], prints[path])
+    assert manifest.diff(loader.get_files(), loader.fingerprints()) == ([], [], [], 3)
+    manifest.close()
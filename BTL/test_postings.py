@@ -0,0 +1,49 @@
+import random
+from array import array
+from types import SimpleNamespace
+
+from postings import BLOCK_SIZE, PostingList, encode, intersect, difference, union
+
+
+def _posting_list(doc_ids):
+    blob, heads, pos, wid = bytearray(), array('I'), array('Q'), array('B')
+    encode(doc_ids, blob, heads, pos, wid)
+    reader = SimpleNamespace(_blk_head=heads, _blk_pos=pos, _blk_wid=wid,
+                             _post_gap=memoryview(bytes(blob)))
+    return PostingList(reader, 0, len(heads), len(doc_ids))
+
+
+class _CountingList(PostingList):
+    __slots__ = ('decoded',)
+
+    def block(self, b):
+        self.decoded.add(b)
+        return super().block(b)
+
+
+def test_set_operations_match_python_sets():
+    rng = random.Random(3)
+    a = sorted(rng.sample(range(200000), 40000))
+    b = sorted(rng.sample(range(200000), 3000))
+    c = sorted(rng.sample(range(200000), 90000))
+    la, lb, lc = _posting_list(a), _posting_list(b), _posting_list(c)
+    assert list(la) == a
+    assert intersect([la, lb, lc]) == sorted(set(a) & set(b) & set(c))
+    assert intersect([la, c]) == sorted(set(a) & set(c))
+    assert difference(la, [lb, c]) == sorted(set(a) - set(b) - set(c))
+    assert union([la, lb]) == sorted(set(a) | set(b))
+
+
+def test_rare_and_hot_decodes_only_the_blocks_it_needs():
+    rng = random.Random(5)
+    hot_ids = sorted(rng.sample(range(500000), 300000))
+    rare_ids = sorted(rng.sample(range(500000), 600))
+    plain = _posting_list(hot_ids)
+    hot = _CountingList(plain._reader, plain.first, plain.stop, plain.n)
+    hot.decoded = set()
+
+    assert intersect([hot, rare_ids]) == sorted(set(hot_ids) & set(rare_ids))
+    n_blocks = len(hot_ids) // BLOCK_SIZE + 1
+    # 600 scattered ids touch at most 600 of the ~1170 blocks, far fewer in practice
+    assert len(hot.decoded) <= len(rare_ids)
+    assert len(hot.decoded) < n_blocks // 2
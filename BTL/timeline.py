@@ -0,0 +1,135 @@
+import os
+import re
+from datetime import date
+from collections import Counter, defaultdict
+
+# Per-day and per-source mention counts.
+#
+# Crawl files are named '<publish date>_<site>_<time>.txt', e.g.
+# '2025-05-19_afamily.vn_11-52-13.txt', inside one directory per site. Every
+# mention is counted under its article's day (as a date ordinal) and source.
+#
+# While building, counts live in Counters. The index stores, per entity, its
+# mention days in order together with the running total up to each of them
+# (see index_format), so mentions between two dates are two binary searches
+# over that entity's days: O(log T) whatever the range.
+
+FILENAME = re.compile(r'(\d{4})-(\d{2})-(\d{2})_([^_]+)_')
+
+def doc_day(path):
+    """Publish date of a crawl file as a date ordinal, or None if the name has none."""
+    m = FILENAME.match(os.path.basename(path))
+    if m is None:
+        return None
+    try:
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3))).toordinal()
+    except ValueError:
+        return None
+
+def doc_source(path):
+    """Site of a crawl file: the site field of its name, else its directory."""
+    m = FILENAME.match(os.path.basename(path))
+    if m is not None:
+        return m.group(4)
+    return os.path.basename(os.path.dirname(path)) or None
+
+def to_ordinal(day):
+    """date, datetime, 'YYYY-MM-DD' or ordinal -> ordinal."""
+    if day is None or isinstance(day, int):
+        return day
+    if isinstance(day, str):
+        return date.fromisoformat(day).toordinal()
+    return day.toordinal()
+
+def day_range(start, end):
+    return [date.fromordinal(d) for d in range(start, end + 1)]
+
+class Timeline:
+    def __init__(self):
+        self.days = defaultdict(Counter)      # entity -> {day ordinal: mentions}
+        self.sources = defaultdict(Counter)   # entity -> {source: mentions}
+
+    def add(self, file_path, entities, sign=1):
+        day, source = doc_day(file_path), doc_source(file_path)
+        for e in entities:
+            if day is not None:
+                self._bump(self.days, e[0], day, sign)
+            if source is not None:
+                self._bump(self.sources, e[0], source, sign)
+
+    def remove(self, file_path, entities):
+        self.add(file_path, entities, sign=-1)
+
+    @staticmethod
+    def _bump(table, entity, key, sign):
+        counts = table[entity]
+        counts[key] += sign
+        if counts[key] <= 0:
+            del counts[key]
+            if not counts:
+                del table[entity]
+
+    def merge(self, other):
+        for entity, counts in other.days.items():
+            self.days[entity].update(counts)
+        for entity, counts in other.sources.items():
+            self.sources[entity].update(counts)
+        return self
+
+    # --- queries (build-time; a saved index answers these from its sections) ---
+    def count(self, entity, start, end):
+        counts = self.days.get(entity)
+        if not counts:
+            return 0
+        return sum(c for d, c in counts.items() if start <= d <= end)
+
+    def series(self, entity):
+        """[(day ordinal, mentions)] in day order."""
+        return sorted(self.days.get(entity, {}).items())
+
+    def source_counts(self, entity):
+        return self.sources.get(entity, Counter()).most_common()
+
+def top_between(ranked, count, start, end, k):
+    """
+    Top-k of count(entity, start, end). `ranked` yields (entity, total
+    mentions) most frequent first; a range count never exceeds the total, so
+    the scan stops once the totals fall to the k-th best range count.
+    """
+    best = []
+    for entity, total in ranked:
+        if len(best) >= k and total <= best[-1][1]:
+            break
+        c = count(entity, start, end)
+        if c > 0 and (len(best) < k or c > best[-1][1]):
+            best.append((entity, c))
+            best.sort(key=lambda item: -item[1])
+            del best[k:]
+    return best
+
+def trending(ranked, count, end, days, k):
+    """
+    Entities whose mentions grew most from the `days` before the last
+    `days` (ending at `end`, inclusive) to the last `days`, as
+    (entity, current, previous). Growth is bounded by the total, so the same
+    early stop as top_between applies.
+    """
+    cur_start = end - days + 1
+    prev_start, prev_end = cur_start - days, cur_start - 1
+    best = []
+    for entity, total in ranked:
+        if len(best) >= k and total <= best[-1][1] - best[-1][2]:
+            break
+        current = count(entity, cur_start, end)
+        if current == 0:
+            continue
+        previous = count(entity, prev_start, prev_end)
+        if current > previous and (len(best) < k or current - previous > best[-1][1] - best[-1][2]):
+            best.append((entity, current, previous))
+            best.sort(key=lambda item: item[2] - item[1])
+            del best[k:]
+    return best
+
+def last_day(days):
+    """Most recent day ordinal in a {entity: {day: n}} table, or None."""
+    return max((max(counts) for counts in days.values() if counts), default=None)
@@ -0,0 +1,136 @@
+import os
+import time
+import random
+import argparse
+import resource
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from xml_tree import parse_xml_to_tree, parse_xml_stream, iter_subtrees, find_path
+
+# So sánh parser của notebook (parse_xml_to_tree) với chế độ luồng trên một
+# tệp XML giả lập vài trăm MB. Mỗi cách chạy trong một tiến trình riêng để đo
+# đỉnh bộ nhớ (ru_maxrss). Tệp không có thuộc tính / chú thích vì parser của
+# notebook không xử lý được chúng. ElementTree.iterparse của thư viện chuẩn
+# được chạy để tham chiếu.
+
+WORDS = ("cau truc du lieu giai thuat cay tong quat danh sach lien ket ngan xep "
+         "hang doi do thi bang bam sap xep tim kiem quy hoach dong").split()
+
+def write_xml(path, target_mb, seed=0):
+    """Cửa hàng -> kệ -> sách (tên, tác giả, giá, đánh giá...) cho tới khi đủ `target_mb`."""
+    rng = random.Random(seed)
+    target = target_mb << 20
+    size = 0
+    book_id = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<catalog>\n')
+        while size < target:
+            lines = ['  <store>\n', f'    <name>Cua hang {book_id}</name>\n']
+            for _ in range(rng.randint(20, 60)):
+                book_id += 1
+                reviews = ''.join(
+                    f'        <review><user>u{rng.randint(1, 99999)}</user>'
+                    f'<text>{" ".join(rng.choices(WORDS, k=rng.randint(5, 30)))}</text></review>\n'
+                    for _ in range(rng.randint(0, 3)))
+                lines.append(
+                    f'    <book>\n      <id>{book_id}</id>\n'
+                    f'      <title>{" ".join(rng.choices(WORDS, k=rng.randint(2, 6)))}</title>\n'
+                    f'      <author>Tac gia {rng.randint(1, 5000)}</author>\n'
+                    f'      <price>{rng.randint(10, 500)}000</price>\n'
+                    f'      <reviews>\n{reviews}      </reviews>\n    </book>\n')
+            lines.append('  </store>\n')
+            chunk = ''.join(lines)
+            f.write(chunk)
+            size += len(chunk)
+        f.write('</catalog>\n')
+    return book_id
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_job(method, path, query):
+    """Chạy trong tiến trình mới: một cách phân tích trên một tệp."""
+    start = time.perf_counter()
+    result = {'method': method}
+    if method == 'notebook':
+        with open(path, encoding='utf-8') as f:
+            root = parse_xml_to_tree(f.read())
+        result['parse_s'] = time.perf_counter() - start
+        result['nodes'] = sum(1 for _ in root.iter())
+        start = time.perf_counter()
+        result['matches'] = len(find_path(root, query))
+        result['scan_ms'] = (time.perf_counter() - start) * 1e3
+    elif method == 'stream+index':
+        root, index = parse_xml_stream(path)
+        result['parse_s'] = time.perf_counter() - start
+        result['nodes'] = len(index)
+        start = time.perf_counter()
+        result['matches'] = len(index.find(query))
+        result['index_ms'] = (time.perf_counter() - start) * 1e3
+        start = time.perf_counter()
+        assert len(find_path(root, query)) == result['matches']
+        result['scan_ms'] = (time.perf_counter() - start) * 1e3
+    elif method == 'subtrees':
+        # Chỉ giữ một cuốn sách tại một thời điểm
+        parent_path = query.rsplit('/', 1)[0]
+        leaf = query.rsplit('/', 1)[1]
+        result['matches'] = sum(1 for book in iter_subtrees(path, parent_path)
+                                for child in book.children if child.tag_name == leaf)
+        result['parse_s'] = time.perf_counter() - start
+    elif method == 'etree':
+        import xml.etree.ElementTree as ET
+        matches = 0
+        leaf = query.rsplit('/', 1)[1]
+        for _, elem in ET.iterparse(path):
+            if elem.tag == leaf:
+                matches += 1
+            if elem.tag == 'book':
+                elem.clear()
+        result['matches'] = matches
+        result['parse_s'] = time.perf_counter() - start
+    result['rss_mb'] = peak_rss_mb()
+    return result
+
+def _ms(result, key):
+    value = result.get(key)
+    return f"{'-':>10}" if value is None else f"{value:>10.2f}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming XML parser against the notebook parser.")
+    parser.add_argument("--mb", type=int, nargs='+', default=[50, 200, 400], help="XML file sizes")
+    parser.add_argument("--methods", nargs='+', default=['notebook', 'stream+index', 'subtrees', 'etree'])
+    parser.add_argument("--query", default="store/book/title")
+    parser.add_argument("--dir", default=None, help="where to write the XML files (default: temp dir)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    work_dir = args.dir or tempfile.mkdtemp()
+    print(f"{'MB':>5}  {'method':<14}{'parse s':>9}{'MB/s':>8}{'peak MB':>9}{'nodes':>11}"
+          f"{'matches':>9}{'index ms':>10}{'scan ms':>10}")
+    for mb in args.mb:
+        path = os.path.join(work_dir, f'catalog_{mb}mb.xml')
+        if not os.path.exists(path):
+            write_xml(path, mb, args.seed)
+        size_mb = os.path.getsize(path) / (1 << 20)
+        expected = None
+        for method in args.methods:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                try:
+                    r = pool.submit(run_job, method, path, args.query).result()
+                except Exception as e:   # thường là hết bộ nhớ với parser của notebook
+                    print(f"{mb:>5}  {method:<14}failed: {type(e).__name__}: {e}")
+                    continue
+            if expected is None:
+                expected = r['matches']
+            assert r['matches'] == expected, (method, r['matches'], expected)
+            print(f"{mb:>5}  {method:<14}{r['parse_s']:>9.2f}{size_mb / r['parse_s']:>8.1f}{r['rss_mb']:>9.0f}"
+                  f"{r.get('nodes', '-'):>11}{r['matches']:>9}{_ms(r, 'index_ms')}{_ms(r, 'scan_ms')}")
+        if not args.dir:
+            os.remove(path)
+    if not args.dir:
+        os.rmdir(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+import re
+import sys
+from html import unescape
+
+# Phân tích XML thành cây tổng quát (bản module của xml.ipynb).
+#
+# parse_xml_to_tree giữ nguyên thuật toán của notebook: nạp cả chuỗi, tách
+# token bằng split() rồi dựng cây bằng stack. Với tệp vài trăm MB, chuỗi gốc,
+# hai bản replace() và danh sách token cùng nằm trong bộ nhớ một lúc.
+# Chế độ luồng (iterparse_xml) đọc tệp theo từng khối, sinh sự kiện
+# ('start' | 'end', node) khi gặp thẻ mở / đóng, và cho phép vứt bỏ cây con
+# ngay khi xử lý xong (iter_subtrees). TagIndex ánh xạ tên thẻ -> các nút nên
+# truy vấn đường dẫn như 'store/book/title' không phải duyệt cả cây.
+#
+# Thuộc tính của thẻ (<book id="1">) bị bỏ qua như trong notebook; chú thích,
+# <?...?> và <!DOCTYPE ...> được bỏ qua, CDATA được coi là văn bản.
+
+# ==========================================
+# PHẦN 1: ĐỊNH NGHĨA CẤU TRÚC CÂY TỔNG QUÁT
+# ==========================================
+class GeneralTreeNode:
+    """
+    Đại diện cho một nút trong cây tổng quát.
+    Mỗi nút đại diện cho một thẻ (tag) trong XML.
+    """
+    __slots__ = ('tag_name', 'text_content', 'children', 'parent')
+
+    def __init__(self, tag_name, parent=None):
+        self.tag_name = tag_name        # Tên thẻ (VD: store, book)
+        self.text_content = ""          # Nội dung văn bản bên trong thẻ
+        self.children = ()              # Các nút con; nút lá dùng chung tuple rỗng thay vì mỗi nút một list
+        self.parent = parent            # Nút cha (None với gốc), dùng cho truy vấn đường dẫn
+
+    def add_child(self, child_node):
+        """Thêm một nút con vào danh sách quản lý"""
+        if self.children:
+            self.children.append(child_node)
+        else:
+            self.children = [child_node]
+        child_node.parent = self
+
+    def discard(self):
+        """Gỡ nút (đã đóng) khỏi cha để cả cây con được giải phóng."""
+        parent = self.parent
+        if parent is not None:
+            # Khi thẻ vừa đóng, nút luôn là con cuối của cha: pop O(1)
+            if parent.children[-1] is self:
+                parent.children.pop()
+            else:
+                parent.children.remove(self)
+            self.parent = None
+
+    def path(self):
+        """Đường dẫn từ gốc, VD: 'store/book/title'."""
+        tags = []
+        node = self
+        while node is not None:
+            tags.append(node.tag_name)
+            node = node.parent
+        return '/'.join(reversed(tags))
+
+    def __repr__(self):
+        """Hiển thị debug đơn giản"""
+        return f"<Node: {self.tag_name}>"
+
+    def iter(self):
+        """Duyệt cây theo thứ tự trước (pre-order) bằng stack, không đệ quy."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.children:
+                stack.extend(reversed(node.children))
+
+    def display_tree(self, level=0, file=None):
+        """
+        In toàn bộ cây ra màn hình (Visualization), thụt đầu dòng 2 dấu cách
+        mỗi cấp. Dùng stack thay cho đệ quy nên cây sâu không chạm giới hạn
+        đệ quy của Python.
+        """
+        file = file or sys.stdout
+        stack = [(self, level)]
+        while stack:
+            node, depth = stack.pop()
+            content = node.text_content.strip()
+            content_display = f": {content}" if content else ""
+            print(f"{'  ' * depth}- <{node.tag_name}>{content_display}", file=file)
+            if node.children:
+                stack.extend((child, depth + 1) for child in reversed(node.children))
+
+
+# ==========================================
+# PHẦN 2: THUẬT TOÁN PARSER (DÙNG STACK)
+# ==========================================
+def parse_xml_to_tree(xml_string):
+    """
+    Chuyển đổi chuỗi XML thành Cây tổng quát (thuật toán của notebook).
+    Input: Chuỗi String XML
+    Output: Nút Gốc (Root) của cây
+    """
+    # BƯỚC 1: TOKENIZATION - thêm khoảng trắng quanh < và > rồi split()
+    formatted_xml = xml_string.replace("<", " <").replace(">", "> ")
+    tokens = formatted_xml.split()
+
+    root = None
+    stack = [] # Stack lưu trữ các Node đang xử lý (chưa gặp thẻ đóng)
+
+    # BƯỚC 2: DUYỆT QUA TỪNG TOKEN
+    for token in tokens:
+        if token.startswith("</"):
+            # Thẻ đóng: nhánh này đã xong, pop khỏi stack
+            if stack:
+                stack.pop()
+        elif token.startswith("<"):
+            # Thẻ mở: tạo nút mới, nối vào cha ở đỉnh stack
+            new_node = GeneralTreeNode(token[1:-1])
+            if root is None:
+                root = new_node
+            if stack:
+                stack[-1].add_child(new_node)
+            stack.append(new_node)
+        else:
+            # Nội dung văn bản thuộc về nút đang mở (đỉnh Stack)
+            if stack:
+                stack[-1].text_content += token + " "
+
+    return root
+
+
+def _open_source(source):
+    if hasattr(source, 'read'):
+        return source, False
+    return open(source, encoding='utf-8'), True
+
+def _split_path(path):
+    anchored = path.startswith('/')
+    return [part for part in path.split('/') if part], anchored
+
+def _matches(node, parts, anchored):
+    """Nút có nằm ở cuối đường dẫn `parts` không (đi ngược lên qua parent)."""
+    for tag in reversed(parts):
+        if node is None or (tag != '*' and node.tag_name != tag):
+            return False
+        node = node.parent
+    return node is None or not anchored
+
+# Văn bản đứng trước + một thẻ thường: (text, '/', name, '/' nếu tự đóng).
+# Chú thích, CDATA, <?...?>, <!DOCTYPE> và thẻ bị cắt ở cuối khối không khớp
+# mẫu này và được xử lý riêng bằng find().
+_TAG = re.compile(r'([^<]*)<(/?)([^\s/>!?]+)[^>]*?(/?)>')
+
+def iterparse_xml(source, chunk_size=1 << 20):
+    """
+    Phân tích luồng: đọc `source` (đường dẫn tệp hoặc file object văn bản)
+    theo từng khối `chunk_size` ký tự và sinh ('start', node) khi gặp thẻ mở,
+    ('end', node) khi thẻ đóng. Ở sự kiện 'end' nút đã có đủ văn bản và các
+    con; gọi node.discard() để bỏ cây con đó khỏi bộ nhớ.
+    """
+    f, owned = _open_source(source)
+    stack = []
+    texts = []   # các đoạn văn bản của nút ở đỉnh stack
+    buf = ''
+    eof = False
+    match = _TAG.match
+    try:
+        while not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf += chunk
+            pos = 0
+            while True:
+                m = match(buf, pos)
+                if m is None:
+                    lt = buf.find('<', pos)
+                    if lt < 0:
+                        # văn bản kéo dài qua ranh giới khối: giữ nguyên cả khoảng trắng
+                        if stack:
+                            texts.append(buf[pos:])
+                        pos = len(buf)
+                        break
+                    if lt > pos and stack:
+                        text = buf[pos:lt]
+                        if texts or not text.isspace():
+                            texts.append(text)
+                    pos = lt
+                    if buf.startswith('<!--', lt):
+                        gt = buf.find('-->', lt + 4)
+                        if gt < 0:
+                            break
+                        pos = gt + 3
+                        continue
+                    if buf.startswith('<![CDATA[', lt):
+                        gt = buf.find(']]>', lt + 9)
+                        if gt < 0:
+                            break
+                        if stack:
+                            texts.append(buf[lt + 9:gt])
+                        pos = gt + 3
+                        continue
+                    gt = buf.find('>', lt + 1)
+                    if gt < 0:
+                        break   # thẻ bị cắt ở cuối khối
+                    if buf[lt + 1] not in '?!':
+                        raise ValueError(f"XML không hợp lệ: {buf[lt:gt + 1]!r}")
+                    pos = gt + 1
+                    continue
+                text, closing, name, self_closing = m.groups()
+                pos = m.end()
+                # khoảng trắng giữa các thẻ bị bỏ, trừ khi nối tiếp văn bản đang chờ
+                if text and stack and (texts or not text.isspace()):
+                    texts.append(text)
+                if closing:
+                    # --- THẺ ĐÓNG ---
+                    if stack:
+                        node = stack.pop()
+                        if texts:
+                            _add_text(node, texts)
+                            texts = []
+                        yield 'end', node
+                    continue
+                # --- THẺ MỞ (hoặc tự đóng <tag/>) ---
+                if texts:
+                    # văn bản trước thẻ con thuộc về cha (nội dung hỗn hợp)
+                    _add_text(stack[-1], texts)
+                    texts = []
+                node = GeneralTreeNode(name)
+                if stack:
+                    stack[-1].add_child(node)
+                yield 'start', node
+                if self_closing:
+                    yield 'end', node
+                else:
+                    stack.append(node)
+            # phần chưa trọn (thẻ / văn bản bị cắt ở cuối khối) giữ lại cho khối sau
+            buf = buf[pos:]
+        if buf:
+            raise ValueError(f"XML không hợp lệ: thẻ chưa đóng ở cuối tệp: {buf[:40]!r}")
+    finally:
+        if owned:
+            f.close()
+
+def _add_text(node, pieces):
+    text = ' '.join(''.join(pieces).split())
+    if '&' in text:
+        text = unescape(text)
+    if not text:
+        return
+    # nội dung hỗn hợp (văn bản trước và sau thẻ con) được cộng dồn như notebook
+    node.text_content = f"{node.text_content} {text}" if node.text_content else text
+
+
+class TagIndex:
+    """Ánh xạ tên thẻ -> danh sách nút, theo thứ tự xuất hiện trong tài liệu."""
+    def __init__(self):
+        self.by_tag = {}
+
+    def add(self, node):
+        nodes = self.by_tag.get(node.tag_name)
+        if nodes is None:
+            self.by_tag[node.tag_name] = [node]
+        else:
+            nodes.append(node)
+
+    def __len__(self):
+        return sum(len(nodes) for nodes in self.by_tag.values())
+
+    def count(self, tag_name):
+        return len(self.by_tag.get(tag_name, ()))
+
+    def find(self, path):
+        """
+        Các nút khớp đường dẫn, VD 'store/book/title' (mọi title có cha book
+        và ông store) hoặc '/store/book/title' (tính từ gốc). '*' khớp mọi
+        tên thẻ, trừ ở phần tử cuối. Chỉ xét các nút mang tên thẻ cuối.
+        """
+        parts, anchored = _split_path(path)
+        return [node for node in self.by_tag.get(parts[-1], ())
+                if _matches(node, parts, anchored)]
+
+def find_path(root, path):
+    """Cùng kết quả với TagIndex.find nhưng duyệt cả cây (không cần chỉ mục)."""
+    parts, anchored = _split_path(path)
+    return [node for node in root.iter() if _matches(node, parts, anchored)]
+
+def parse_xml_stream(source, index=True, chunk_size=1 << 20):
+    """
+    Dựng cả cây bằng chế độ luồng. Trả về (root, TagIndex hoặc None).
+    """
+    root = None
+    tag_index = TagIndex() if index else None
+    for event, node in iterparse_xml(source, chunk_size):
+        if event == 'start':
+            if root is None:
+                root = node
+            if tag_index is not None:
+                tag_index.add(node)
+    return root, tag_index
+
+def iter_subtrees(source, path, chunk_size=1 << 20):
+    """
+    Sinh từng cây con khớp `path` (VD 'store/book') ngay khi thẻ của nó đóng,
+    rồi bỏ nó đi; các nút không nằm trong cây con khớp nào cũng bị bỏ khi
+    đóng. Bộ nhớ chỉ phụ thuộc kích thước một cây con, không phụ thuộc tệp.
+    Cây con còn nối với các tổ tiên (parent) trong lúc được xử lý.
+    """
+    parts, anchored = _split_path(path)
+    inside = 0   # số cây con khớp đang mở (lồng nhau)
+    matched = set()
+    for event, node in iterparse_xml(source, chunk_size):
+        if event == 'start':
+            if _matches(node, parts, anchored):
+                inside += 1
+                matched.add(id(node))
+        elif id(node) in matched:
+            matched.discard(id(node))
+            inside -= 1
+            yield node
+            if inside == 0:
+                node.discard()
+        elif inside == 0:
+            node.discard()
+
+
+# ==========================================
+# PHẦN 3: DRIVER CODE (CHẠY THỬ)
+# ==========================================
+if __name__ == "__main__":
+    import io
+
+    # 1. Dữ liệu giả lập (Một đoạn XML phức tạp nhiều tầng)
+    raw_xml_data = """
+    <thuvien>
+        <khoa_hoc>
+            <sach>
+                <ten>Cau Truc Du Lieu</ten>
+                <tac_gia>Nguyen Van A</tac_gia>
+            </sach>
+            <sach>
+                <ten>Giai Thuat</ten>
+                <gia>100k</gia>
+            </sach>
+        </khoa_hoc>
+        <tieu_thuyet>
+            <truyen>
+                <ten>De Men Phieu Luu Ky</ten>
+            </truyen>
+        </tieu_thuyet>
+    </thuvien>
+    """
+
+    print("--- BẮT ĐẦU PHÂN TÍCH XML ---")
+    tree_root = parse_xml_to_tree(raw_xml_data)
+    if tree_root:
+        print(f"\n[Thành công] Đã xây dựng xong cây. Gốc là: {tree_root.tag_name}\n")
+        print("--- CẤU TRÚC CÂY HIỂN THỊ ---")
+        tree_root.display_tree()
+    else:
+        print("[Lỗi] Không thể dựng cây (XML rỗng hoặc lỗi).")
+
+    print("\n--- CHẾ ĐỘ LUỒNG + CHỈ MỤC THẺ ---")
+    stream_root, tag_index = parse_xml_stream(io.StringIO(raw_xml_data))
+    stream_root.display_tree()
+    for path in ("sach/ten", "/thuvien/*/truyen/ten", "ten"):
+        print(f"{path}: {[node.text_content for node in tag_index.find(path)]}")
+
+    print("\n--- TỪNG CÂY CON 'sach' (xử lý xong là bỏ) ---")
+    for book in iter_subtrees(io.StringIO(raw_xml_data), "khoa_hoc/sach"):
+        print(book.path(), [(child.tag_name, child.text_content) for child in book.children])
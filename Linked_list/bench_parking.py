@@ -0,0 +1,184 @@
+import os
+import time
+import random
+import argparse
+import datetime
+import tempfile
+from parking_lot import ParkingLot, ParkingError, EventLog
+
+# Bộ sinh tải nhiều cổng cho ParkingLot. Các cổng vào / ra cùng đẩy sự kiện
+# vào một bãi (một luồng ghi), đồng hồ mỗi cổng lệch nhau vài giây nên giờ
+# vào đến hơi lộn xộn. Một phần yêu cầu lấy xe cố tình sai (sai biển số, thẻ
+# không tồn tại). Đo số lượt vào / ra mỗi giây, thời gian truy vấn quá hạn,
+# tính phí cả bãi và phục hồi từ ảnh chụp + nhật ký.
+
+BASE_TIME = datetime.datetime(2024, 1, 1, 6, 0, 0)
+
+class NotebookParkingLot:
+    """Bản gốc của notebook (danh sách liên kết đơn, tìm thẻ O(n)), bỏ phần in."""
+    class Node:
+        __slots__ = ('card_id', 'license_plate', 'time_in', 'next')
+
+        def __init__(self, card_id, license_plate, time_in):
+            self.card_id = card_id
+            self.license_plate = license_plate
+            self.time_in = time_in
+            self.next = None
+
+    def __init__(self, hourly_rate=5000):
+        self.head = None
+        self.hourly_rate = hourly_rate
+        self.lot = ParkingLot(hourly_rate)
+
+    def find_vehicle_by_card(self, card_id):
+        previous, current = None, self.head
+        while current is not None:
+            if current.card_id == card_id:
+                return previous, current
+            previous, current = current, current.next
+        return None, None
+
+    def park_vehicle(self, card_id, license_plate, time_in):
+        if self.find_vehicle_by_card(card_id)[1] is not None:
+            raise ParkingError(card_id)
+        node = self.Node(card_id, license_plate, time_in)
+        node.next = self.head
+        self.head = node
+
+    def exit_vehicle(self, card_id, license_plate, time_out):
+        previous, node = self.find_vehicle_by_card(card_id)
+        if node is None or node.license_plate != license_plate:
+            raise ParkingError(card_id)
+        fee = self.lot.calculate_fee(node.time_in, time_out)
+        if previous is None:
+            self.head = node.next
+        else:
+            previous.next = node.next
+        return fee
+
+def make_workload(ops, occupancy, gates, seed, error_rate=0.02, skew=3.0, gap=0.5):
+    """
+    Trả về (fill, events): fill đưa bãi lên `occupancy` xe, events là `ops`
+    sự kiện ('in' | 'out', gate, card, plate, time) quanh mức đó.
+    """
+    rng = random.Random(seed)
+    parked = []
+    counter = 0
+    clock = 0.0
+    offsets = [rng.uniform(-skew, skew) for _ in range(gates)]
+
+    def stamp(gate):
+        return BASE_TIME + datetime.timedelta(seconds=max(clock + offsets[gate], 0.0))
+
+    def entry():
+        nonlocal counter
+        counter += 1
+        gate = rng.randrange(gates)
+        vehicle = (f"C{counter:07d}", f"{rng.randint(10, 99)}-{rng.choice('ABCDEFGHK')}{rng.randint(1, 9)}-{counter:06d}")
+        parked.append(vehicle)
+        return ('in', gate) + vehicle + (stamp(gate),)
+
+    fill = []
+    for _ in range(occupancy):
+        clock += gap / 10
+        fill.append(entry())
+    events = []
+    for _ in range(ops):
+        clock += rng.expovariate(1 / gap)
+        if not parked or rng.random() < occupancy / (occupancy + len(parked)):
+            events.append(entry())
+            continue
+        gate = rng.randrange(gates)
+        i = rng.randrange(len(parked))
+        card, plate = parked[i]
+        if rng.random() < error_rate:
+            # yêu cầu sai: xe vẫn ở trong bãi
+            if rng.random() < 0.5:
+                plate = plate[:-1] + ('0' if plate[-1] != '0' else '1')
+            else:
+                card = 'X' + card[1:]
+        else:
+            parked[i] = parked[-1]
+            parked.pop()
+        events.append(('out', gate, card, plate, stamp(gate)))
+    return fill, events
+
+def replay(lot, events):
+    entries = exits = rejected = 0
+    park, leave = lot.park_vehicle, lot.exit_vehicle
+    start = time.perf_counter()
+    for kind, _, card, plate, when in events:
+        try:
+            if kind == 'in':
+                park(card, plate, when)
+                entries += 1
+            else:
+                leave(card, plate, when)
+                exits += 1
+        except ParkingError:
+            rejected += 1
+    return time.perf_counter() - start, entries, exits, rejected
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-gate load generator for the parking lot engine.")
+    parser.add_argument("--ops", type=int, default=200000, help="events after the lot is filled")
+    parser.add_argument("--occupancy", type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument("--gates", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--log", action="store_true", help="also run with the event log on disk")
+    parser.add_argument("--sync-every", type=int, default=64, help="flush the log every N events")
+    parser.add_argument("--baseline-ops", type=int, default=5000,
+                        help="events for the notebook linked list (it is O(n) per operation)")
+    args = parser.parse_args()
+
+    print(f"{'lot':<10}{'occupancy':>10}{'events':>9}{'in/s':>11}{'out/s':>11}{'rejected':>9}"
+          f"{'overstay ms':>12}{'fees ms':>9}")
+    for occupancy in args.occupancy:
+        fill, events = make_workload(args.ops, occupancy, args.gates, args.seed)
+        now = events[-1][-1]
+        runs = [('indexed', lambda: ParkingLot(), events)]
+        log_dir = tempfile.mkdtemp()
+        log_path = os.path.join(log_dir, 'events.jsonl')
+        if args.log:
+            runs.append(('+log', lambda: ParkingLot(log=EventLog(log_path, args.sync_every)), events))
+        if args.baseline_ops:
+            runs.append(('notebook', NotebookParkingLot, events[:args.baseline_ops]))
+        for name, make, batch in runs:
+            lot = make()
+            replay(lot, fill)
+            seconds, entries, exits, rejected = replay(lot, batch)
+            overstay = fees = float('nan')
+            if isinstance(lot, ParkingLot):
+                start = time.perf_counter()
+                late = list(lot.overstays(now, datetime.timedelta(hours=2)))
+                overstay = (time.perf_counter() - start) * 1e3
+                start = time.perf_counter()
+                lot.calculate_fees(now)
+                fees = (time.perf_counter() - start) * 1e3
+                assert len(lot) == len(lot.by_plate) == sum(1 for _ in lot.vehicles())
+                assert all(v.time_in >= BASE_TIME for v in late)
+            print(f"{name:<10}{occupancy:>10}{len(batch):>9}{entries / seconds:>11.0f}"
+                  f"{exits / seconds:>11.0f}{rejected:>9}{overstay:>12.2f}{fees:>9.2f}")
+            if name == '+log':
+                lot.snapshot(os.path.join(log_dir, 'snapshot.json'))
+                lot.log.close()
+                start = time.perf_counter()
+                recovered = ParkingLot.recover(log_path)
+                replayed = time.perf_counter() - start
+                recovered.log.close()
+                start = time.perf_counter()
+                restored = ParkingLot.recover(log_path, os.path.join(log_dir, 'snapshot.json'))
+                restored_time = time.perf_counter() - start
+                restored.log.close()
+                same = ([(v.card_id, v.time_in) for v in recovered.vehicles()] ==
+                        [(v.card_id, v.time_in) for v in lot.vehicles()] ==
+                        [(v.card_id, v.time_in) for v in restored.vehicles()])
+                print(f"{'':<10}recover: full replay {replayed:.2f}s, snapshot {restored_time:.2f}s, "
+                      f"state {'matches' if same else 'DIFFERS'}")
+        for name in os.listdir(log_dir):
+            os.remove(os.path.join(log_dir, name))
+        os.rmdir(log_dir)
+
+
+if __name__ == "__main__":
+    main()
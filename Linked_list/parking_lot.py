@@ -0,0 +1,393 @@
+import os
+import json
+import math
+import datetime
+from collections import namedtuple
+
+# Bãi gửi xe (bản module của parking-management.ipynb) cho mô phỏng nhiều cổng.
+#
+# Notebook giữ các xe trong một danh sách liên kết đơn nên tìm theo thẻ và
+# lấy xe đều phải duyệt O(n). Ở đây:
+#   - by_card, by_plate: bảng băm thẻ -> xe và biển số -> xe, tra cứu O(1)
+#   - các xe vẫn nằm trong một danh sách liên kết, nhưng là liên kết đôi và
+#     sắp theo time_in: xe vào luôn nối vào cuối (O(1) khi giờ vào tăng dần,
+#     lùi vài bước nếu một cổng báo trễ), xe ra gỡ khỏi danh sách O(1) vì
+#     đã có node từ bảng băm. Đầu danh sách là xe gửi lâu nhất, nên truy vấn
+#     gửi lâu nhất / quá hạn chỉ đọc đúng số xe cần trả về.
+#   - nhật ký sự kiện chỉ ghi thêm (JSON lines) và ảnh chụp trạng thái:
+#     recover() nạp ảnh chụp rồi phát lại các sự kiện sau nó.
+
+## --------------------------------------------------
+## BƯỚC 1: ĐỊNH NGHĨA CÁC CLASS
+## --------------------------------------------------
+
+class ParkingError(Exception):
+    """Yêu cầu gửi / lấy xe bị từ chối."""
+
+class DuplicateCard(ParkingError):
+    pass
+
+class DuplicatePlate(ParkingError):
+    pass
+
+class UnknownCard(ParkingError):
+    pass
+
+class PlateMismatch(ParkingError):
+    pass
+
+# Hóa đơn khi lấy xe
+Receipt = namedtuple('Receipt', 'card_id license_plate time_in time_out fee')
+
+class VehicleNode:
+    """Một xe đang gửi; prev / next nối các xe theo thứ tự time_in."""
+    __slots__ = ('card_id', 'license_plate', 'time_in', 'photo_in', 'prev', 'next')
+
+    def __init__(self, card_id, license_plate, time_in, photo_in=None):
+        self.card_id = card_id
+        self.license_plate = license_plate
+        self.time_in = time_in
+        self.photo_in = photo_in
+        self.prev = None
+        self.next = None
+
+    def __repr__(self):
+        """Hàm hỗ trợ in thông tin Node cho dễ nhìn"""
+        return f"[Card: {self.card_id}, Plate: {self.license_plate}, Time: {self.time_in}]"
+
+class EventLog:
+    """
+    Nhật ký chỉ ghi thêm, mỗi dòng một sự kiện JSON:
+    {"seq", "type": "in" | "out", "card", "plate", "time", "photo"?, "fee"?}.
+    Chỉ các thao tác thành công được ghi.
+    """
+    def __init__(self, path, sync_every=1):
+        self.path = path
+        self.sync_every = sync_every
+        # Bỏ dòng ghi dở (nếu có) trước khi ghi tiếp, để sự kiện mới không bị
+        # nối vào sau nó và trở thành một dòng hỏng
+        self._truncate_torn_tail(path)
+        self.seq = self._last_seq(path)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._pending = 0
+
+    @staticmethod
+    def _truncate_torn_tail(path, chunk=1 << 16):
+        """Cắt tệp về ngay sau ký tự xuống dòng cuối cùng."""
+        if not os.path.exists(path):
+            return
+        with open(path, 'r+b') as f:
+            end = size = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(end - chunk, 0)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end < size:
+                f.truncate(end)
+
+    @staticmethod
+    def _last_seq(path, chunk=1 << 16):
+        # Chỉ đọc phần cuối tệp thay vì phân tích lại cả nhật ký
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            end = f.seek(0, os.SEEK_END)
+            while True:
+                start = max(end - chunk, 0)
+                f.seek(start)
+                lines = f.read(end - start).splitlines()
+                for line in reversed(lines[1:] if start else lines):
+                    try:
+                        return json.loads(line)['seq']
+                    except ValueError:
+                        continue
+                if start == 0:
+                    return 0
+                chunk *= 2
+
+    def tell(self):
+        """Vị trí (byte) cuối nhật ký, dùng để phát lại từ ảnh chụp."""
+        self.flush()
+        return self._file.tell()
+
+    @staticmethod
+    def read(path, after=0, offset=0):
+        """Các sự kiện có seq > after (bắt đầu đọc từ byte `offset`), theo thứ tự ghi."""
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            if offset and offset <= os.path.getsize(path):
+                f.seek(offset)
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue   # dòng ghi dở khi tiến trình dừng đột ngột
+                if event['seq'] > after:
+                    yield event
+
+    def append(self, kind, card_id, plate, time, **fields):
+        self.seq += 1
+        event = {'seq': self.seq, 'type': kind, 'card': card_id, 'plate': plate,
+                 'time': time.isoformat()}
+        event.update(fields)
+        self._file.write(json.dumps(event, ensure_ascii=False) + '\n')
+        self._pending += 1
+        if self._pending >= self.sync_every:
+            self.flush()
+        return self.seq
+
+    def flush(self):
+        self._file.flush()
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+class ParkingLot:
+    """
+    Đại diện cho "Bãi đỗ xe": bảng băm theo thẻ và biển số, danh sách
+    liên kết đôi theo giờ vào.
+    """
+    def __init__(self, hourly_rate=5000, log=None):
+        self.hourly_rate = hourly_rate
+        self.by_card = {}
+        self.by_plate = {}
+        self.head = None   # xe vào sớm nhất
+        self.tail = None   # xe vào muộn nhất
+        self.log = log
+
+    @property
+    def count(self):
+        return len(self.by_card)
+
+    def __len__(self):
+        return len(self.by_card)
+
+    def calculate_fee(self, time_in, time_out):
+        """Tính phí gửi xe: mỗi giờ bắt đầu tính một giờ, ít nhất 1 giờ."""
+        hours = math.ceil((time_out - time_in).total_seconds() / 3600)
+        return max(hours, 1) * self.hourly_rate
+
+    def calculate_fees(self, time_out, vehicles=None):
+        """
+        Phí của nhiều xe nếu lấy ra lúc `time_out` (mặc định: mọi xe trong
+        bãi, theo giờ vào), dạng [(card_id, fee)].
+        """
+        rate = self.hourly_rate
+        ceil = math.ceil
+        if vehicles is None:
+            vehicles = self.vehicles()
+        return [(v.card_id, max(ceil((time_out - v.time_in).total_seconds() / 3600), 1) * rate)
+                for v in vehicles]
+
+    def find_vehicle_by_card(self, card_id):
+        return self.by_card.get(card_id)
+
+    def find_vehicle_by_plate(self, license_plate):
+        return self.by_plate.get(license_plate)
+
+    # --- danh sách theo giờ vào ---
+    def _link(self, node):
+        # Nối vào cuối; lùi lại nếu xe này báo giờ vào sớm hơn xe cuối
+        after = self.tail
+        while after is not None and after.time_in > node.time_in:
+            after = after.prev
+        node.prev = after
+        node.next = self.head if after is None else after.next
+        if node.next is None:
+            self.tail = node
+        else:
+            node.next.prev = node
+        if after is None:
+            self.head = node
+        else:
+            after.next = node
+
+    def _unlink(self, node):
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        node.prev = node.next = None
+
+    def vehicles(self):
+        """Các xe trong bãi, xe vào sớm nhất trước."""
+        node = self.head
+        while node is not None:
+            yield node
+            node = node.next
+
+    def longest_stays(self, k=10):
+        """k xe gửi lâu nhất."""
+        result = []
+        node = self.head
+        while node is not None and len(result) < k:
+            result.append(node)
+            node = node.next
+        return result
+
+    def overstays(self, now, max_duration):
+        """Các xe đã gửi quá `max_duration` (timedelta) tính đến `now`, lâu nhất trước."""
+        cutoff = now - max_duration
+        node = self.head
+        while node is not None and node.time_in < cutoff:
+            yield node
+            node = node.next
+
+    ## --------------------------------------------------
+    ## LOGIC 1: GỬI XE (PARK VEHICLE)
+    ## --------------------------------------------------
+    def park_vehicle(self, card_id, license_plate, time_in, photo_in=None):
+        """Thêm một xe vào bãi. Trả về VehicleNode; thẻ hoặc biển số đang dùng -> ParkingError."""
+        if card_id in self.by_card:
+            raise DuplicateCard(f"Mã thẻ '{card_id}' đã được sử dụng.")
+        if license_plate in self.by_plate:
+            raise DuplicatePlate(f"Xe {license_plate} đã ở trong bãi.")
+        node = VehicleNode(card_id, license_plate, time_in, photo_in)
+        self.by_card[card_id] = node
+        self.by_plate[license_plate] = node
+        self._link(node)
+        if self.log is not None:
+            fields = {'photo': photo_in} if photo_in is not None else {}
+            self.log.append('in', card_id, license_plate, time_in, **fields)
+        return node
+
+    ## --------------------------------------------------
+    ## LOGIC 2: LẤY XE (EXIT VEHICLE)
+    ## --------------------------------------------------
+    def exit_vehicle(self, card_id_exit, license_plate_exit, time_out, photo_out=None):
+        """Xác thực thẻ + biển số, tính phí và xóa xe khỏi bãi. Trả về Receipt."""
+        node = self.by_card.get(card_id_exit)
+        if node is None:
+            raise UnknownCard(f"Không tìm thấy xe nào có mã thẻ '{card_id_exit}'.")
+        # (Bỏ qua so sánh ảnh vì phức tạp, chỉ so sánh biển số)
+        if node.license_plate != license_plate_exit:
+            raise PlateMismatch(f"Biển số '{license_plate_exit}' không khớp với "
+                                f"'{node.license_plate}' của thẻ.")
+        fee = self.calculate_fee(node.time_in, time_out)
+        del self.by_card[card_id_exit]
+        del self.by_plate[node.license_plate]
+        self._unlink(node)
+        if self.log is not None:
+            self.log.append('out', card_id_exit, license_plate_exit, time_out, fee=fee)
+        return Receipt(card_id_exit, node.license_plate, node.time_in, time_out, fee)
+
+    def exit_vehicles(self, requests):
+        """Lấy nhiều xe: requests là (card_id, license_plate, time_out); trả về Receipt hoặc ParkingError cho từng yêu cầu."""
+        results = []
+        for card_id, plate, time_out in requests:
+            try:
+                results.append(self.exit_vehicle(card_id, plate, time_out))
+            except ParkingError as e:
+                results.append(e)
+        return results
+
+    def display_vehicles(self):
+        """In tất cả các xe đang có trong bãi."""
+        print(f"\n--- DANH SÁCH XE TRONG BÃI (Tổng: {self.count}) ---")
+        if self.head is None:
+            print("Bãi xe rỗng.")
+            return
+        for i, vehicle in enumerate(self.vehicles(), 1):
+            print(f"{i}. {vehicle}")
+        print("------------------------------------------")
+
+    ## --------------------------------------------------
+    ## ẢNH CHỤP VÀ PHÁT LẠI
+    ## --------------------------------------------------
+    def snapshot(self, path):
+        """Ghi trạng thái hiện tại cùng seq của sự kiện cuối đã áp dụng."""
+        state = {'format': 'parking-snapshot', 'version': 1,
+                 'seq': self.log.seq if self.log is not None else 0,
+                 'offset': self.log.tell() if self.log is not None else 0,
+                 'hourly_rate': self.hourly_rate,
+                 'vehicles': [[v.card_id, v.license_plate, v.time_in.isoformat(), v.photo_in]
+                              for v in self.vehicles()]}
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, path)   # không bao giờ để lại ảnh chụp ghi dở
+
+    def _apply(self, event):
+        time = datetime.datetime.fromisoformat(event['time'])
+        if event['type'] == 'in':
+            self.park_vehicle(event['card'], event['plate'], time, event.get('photo'))
+        else:
+            self.exit_vehicle(event['card'], event['plate'], time)
+
+    @classmethod
+    def recover(cls, log_path, snapshot_path=None, hourly_rate=5000, sync_every=1):
+        """
+        Dựng lại bãi từ ảnh chụp (nếu có) và các sự kiện ghi sau nó, rồi
+        tiếp tục ghi vào cùng nhật ký.
+        """
+        lot = cls(hourly_rate)
+        after = offset = 0
+        if snapshot_path is not None and os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding='utf-8') as f:
+                state = json.load(f)
+            lot.hourly_rate = state['hourly_rate']
+            after, offset = state['seq'], state['offset']
+            for card_id, plate, time_in, photo_in in state['vehicles']:
+                lot.park_vehicle(card_id, plate, datetime.datetime.fromisoformat(time_in), photo_in)
+        for event in EventLog.read(log_path, after, offset):
+            lot._apply(event)
+        lot.log = EventLog(log_path, sync_every)
+        return lot
+
+## --------------------------------------------------
+## BƯỚC 3: CHẠY THỬ MÔ PHỎNG
+## --------------------------------------------------
+
+def print_receipt(receipt):
+    print("--- HÓA ĐƠN ---")
+    print(f"Biển số xe: {receipt.license_plate}")
+    print(f"Giờ vào:     {receipt.time_in}")
+    print(f"Giờ ra:       {receipt.time_out}")
+    print(f"Tổng thời gian: {receipt.time_out - receipt.time_in}")
+    print(f"PHÍ PHẢI TRẢ: {receipt.fee} VND")
+    print("------------------")
+
+def demo():
+    # Khởi tạo bãi xe
+    my_parking = ParkingLot(hourly_rate=3000) # 3000/giờ
+    now = datetime.datetime.now()
+
+    my_parking.park_vehicle("T001", "29-H1-12345", now - datetime.timedelta(hours=4, minutes=30))
+    my_parking.park_vehicle("T002", "30-K1-55555", now - datetime.timedelta(hours=1, minutes=10))
+    my_parking.park_vehicle("T003", "99-B1-98765", now - datetime.timedelta(minutes=20))
+    my_parking.display_vehicles()
+
+    print("\nGửi quá 1 giờ:", list(my_parking.overstays(now, datetime.timedelta(hours=1))))
+    print("Phí nếu lấy cả bãi bây giờ:", my_parking.calculate_fees(now))
+
+    scenarios = [
+        ("Kịch bản 1: Lấy xe T002 thành công", "T002", "30-K1-55555"),
+        ("Kịch bản 2: Lấy xe T001 sai biển số", "T001", "29-H1-00000"),
+        ("Kịch bản 3: Mã thẻ không tồn tại", "T999", "12-A1-11111"),
+        ("Kịch bản 4: Lấy xe T001 thành công", "T001", "29-H1-12345"),
+    ]
+    for title, card_id, plate in scenarios:
+        print(f"\n=== {title} ===")
+        try:
+            print_receipt(my_parking.exit_vehicle(card_id, plate, now))
+        except ParkingError as e:
+            print(f"LỖI: {e}")
+
+    # In danh sách xe cuối cùng (chỉ còn lại T003)
+    my_parking.display_vehicles()
+
+if __name__ == "__main__":
+    demo()
@@ -0,0 +1,445 @@
+import os
+import re
+import json
+import zlib
+import random
+import argparse
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+# Vector thưa nhị phân (bản module của sparse_vector.ipynb), lưu bằng mảng.
+#
+# Notebook lưu các chỉ số đã sắp xếp thành danh sách liên kết các Node; mỗi
+# phép gộp / giao đi từng con trỏ một. Ở đây các chỉ số nằm liền nhau trong
+# một array('I') đã sắp xếp (4 byte mỗi từ thay vì một đối tượng Node), và
+# các phép toán chạy trên cả mảng một lần: bằng NumPy nếu đã cài, nếu không
+# thì bằng set của Python (cũng chạy trong C).
+#
+#   pairwise_intersections / pairwise_hamming   so sánh cả một tập văn bản
+#   MinHash + MinHashLSH                         tìm gần trùng lặp, không so từng cặp
+#   find_near_duplicates, --dedup                loại bài đăng lại trong kho crawl BTL
+#                                                trước khi chạy NER (analyzer.py --exclude)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Mã kiểu của mảng số nguyên không dấu 32 bit
+TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+## --------------------------------------------------
+## BƯỚC 1: CẤU TRÚC DỮ LIỆU CƠ BẢN
+## --------------------------------------------------
+
+class SparseVector:
+    """
+    Một văn bản: các chỉ số từ (phần tử khác 0) trong một mảng đã sắp xếp
+    tăng dần, không trùng lặp.
+    """
+    __slots__ = ('indexes',)
+
+    def __init__(self, indexes=()):
+        self.indexes = array(TYPECODE, sorted(set(indexes)))
+
+    @classmethod
+    def _from_array(cls, indexes):
+        # Mảng đã sắp xếp và không trùng lặp: dùng luôn, không kiểm tra lại
+        vector = cls.__new__(cls)
+        vector.indexes = indexes
+        return vector
+
+    @classmethod
+    def _from_numpy(cls, values):
+        indexes = array(TYPECODE)
+        indexes.frombytes(values.astype(np.uint32).tobytes())
+        return cls._from_array(indexes)
+
+    def _numpy(self):
+        if not self.indexes:
+            return np.empty(0, dtype=np.uint32)
+        return np.frombuffer(self.indexes, dtype=np.uint32)
+
+    def get_length(self):
+        """Trả về số lượng từ (phần tử khác 0) trong vector."""
+        return len(self.indexes)
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __iter__(self):
+        return iter(self.indexes)
+
+    def __contains__(self, index):
+        i = bisect_left(self.indexes, index)
+        return i < len(self.indexes) and self.indexes[i] == index
+
+    def __eq__(self, other):
+        return isinstance(other, SparseVector) and self.indexes == other.indexes
+
+    def __repr__(self):
+        return f"SparseVector({list(self.indexes)})"
+
+    def insert(self, index):
+        """
+        Chèn một 'index' vào vector, đảm bảo duy trì thứ tự sắp xếp.
+        Nếu index đã tồn tại, bỏ qua.
+        """
+        i = bisect_left(self.indexes, index)
+        if i < len(self.indexes) and self.indexes[i] == index:
+            return
+        self.indexes.insert(i, index)
+
+    def print_vector(self):
+        """Hàm tiện ích để in vector ra màn hình."""
+        print(" -> ".join(map(str, self.indexes)) + " -> None")
+
+    def __or__(self, other):
+        return merge_vectors(self, other)
+
+    def __and__(self, other):
+        return intersect_vectors(self, other)
+
+## --------------------------------------------------
+## BƯỚC 2: PHÉP TOÁN GỘP VĂN BẢN (MERGE/UNION)
+## --------------------------------------------------
+
+def merge_vectors(vec1, vec2):
+    """Gộp (HỢP/UNION) hai vector thưa thành một vector mới."""
+    if np is not None:
+        return SparseVector._from_numpy(np.union1d(vec1._numpy(), vec2._numpy()))
+    merged = set(vec1.indexes)
+    merged.update(vec2.indexes)
+    return SparseVector._from_array(array(TYPECODE, sorted(merged)))
+
+## --------------------------------------------------
+## BƯỚC 3: PHÉP TOÁN SO SÁNH (GIAO & HAMMING)
+## --------------------------------------------------
+
+def intersect_vectors(vec1, vec2):
+    """GIAO của hai vector thưa: các từ có trong cả hai văn bản."""
+    if np is not None:
+        return SparseVector._from_numpy(np.intersect1d(vec1._numpy(), vec2._numpy(), assume_unique=True))
+    small, large = sorted((vec1, vec2), key=len)
+    return SparseVector._from_array(array(TYPECODE, sorted(set(small.indexes).intersection(large.indexes))))
+
+def _get_intersection_size(vec1, vec2):
+    """Đếm số lượng phần tử GIAO giữa hai vector."""
+    if np is not None:
+        return int(np.intersect1d(vec1._numpy(), vec2._numpy(), assume_unique=True).size)
+    small, large = sorted((vec1, vec2), key=len)
+    return len(set(small.indexes).intersection(large.indexes))
+
+def calculate_hamming_distance(vec1, vec2):
+    """
+    Tính khoảng cách Hamming giữa hai vector thưa.
+    Công thức: |vec1| + |vec2| - 2 * |Giao(vec1, vec2)|
+    """
+    return len(vec1) + len(vec2) - 2 * _get_intersection_size(vec1, vec2)
+
+def jaccard_similarity(vec1, vec2):
+    """|Giao| / |Hợp|; hai vector rỗng được coi là giống hệt nhau."""
+    common = _get_intersection_size(vec1, vec2)
+    union = len(vec1) + len(vec2) - common
+    return common / union if union else 1.0
+
+## --------------------------------------------------
+## BƯỚC 4: SO SÁNH CẢ TẬP VĂN BẢN
+## --------------------------------------------------
+# Thay vì n^2 / 2 lần giao từng cặp, dựng chỉ mục ngược (từ -> các văn bản
+# chứa nó) rồi với mỗi văn bản, đếm xem mỗi văn bản khác xuất hiện bao nhiêu
+# lần trong danh sách của các từ của nó. Chi phí là tổng df^2 trên các từ,
+# thay vì n^2 * độ dài văn bản. Kết quả là ma trận n x n nên chỉ dùng cho
+# tập vừa phải; với tập lớn, dùng MinHashLSH bên dưới.
+
+def pairwise_intersections(vectors):
+    """Ma trận n x n: ô [i][j] là số từ chung của văn bản i và j."""
+    n = len(vectors)
+    if np is not None:
+        return _pairwise_intersections_numpy(vectors)
+    postings = defaultdict(list)
+    for doc, vector in enumerate(vectors):
+        for index in vector.indexes:
+            postings[index].append(doc)
+    matrix = []
+    for vector in vectors:
+        row = [0] * n
+        for index in vector.indexes:
+            for doc in postings[index]:
+                row[doc] += 1
+        matrix.append(row)
+    return matrix
+
+def _pairwise_intersections_numpy(vectors):
+    n = len(vectors)
+    matrix = np.zeros((n, n), dtype=np.int32)
+    lengths = np.array([len(v) for v in vectors], dtype=np.int64)
+    if not lengths.sum():
+        return matrix
+    terms = np.concatenate([v._numpy() for v in vectors])
+    docs = np.repeat(np.arange(n), lengths)
+    # Chỉ mục ngược dạng CSR: văn bản chứa từ t là post_docs[start[t]:start[t + 1]]
+    term_ids = np.unique(terms, return_inverse=True)[1].ravel()
+    order = np.argsort(term_ids, kind='stable')
+    post_docs = docs[order]
+    df = np.bincount(term_ids)
+    start = np.concatenate(([0], np.cumsum(df)))
+    bounds = np.concatenate(([0], np.cumsum(lengths)))
+    for i in range(n):
+        tids = term_ids[bounds[i]:bounds[i + 1]]
+        if not tids.size:
+            continue
+        counts = df[tids]
+        # Nối các đoạn post_docs[start[t]:start[t] + df[t]] mà không lặp Python
+        offsets = np.repeat(start[tids] - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+        matrix[i] = np.bincount(post_docs[offsets + np.arange(counts.sum())], minlength=n)
+    return matrix
+
+def pairwise_hamming(vectors):
+    """Ma trận n x n khoảng cách Hamming: |i| + |j| - 2 * |giao(i, j)|."""
+    common = pairwise_intersections(vectors)
+    lengths = [len(v) for v in vectors]
+    if np is not None:
+        sizes = np.array(lengths, dtype=np.int32)
+        return sizes[:, None] + sizes[None, :] - 2 * common
+    return [[lengths[i] + lengths[j] - 2 * row[j] for j in range(len(vectors))]
+            for i, row in enumerate(common)]
+
+## --------------------------------------------------
+## BƯỚC 5: MINHASH + LSH (GẦN TRÙNG LẶP)
+## --------------------------------------------------
+# Văn bản -> tập shingle (cụm k từ liên tiếp, băm CRC32) -> chữ ký MinHash
+# num_perm số. Xác suất hai chữ ký trùng ở một vị trí xấp xỉ độ tương đồng
+# Jaccard của hai tập. LSH chia chữ ký thành `bands` dải `rows` số; hai văn
+# bản thành ứng viên nếu trùng trọn một dải, nên chỉ các cặp có Jaccard gần
+# ngưỡng trở lên mới được so sánh kỹ.
+
+MERSENNE = (1 << 31) - 1
+WORD = re.compile(r'\w+')
+
+def shingle_vector(text, k=5):
+    """SparseVector các shingle k từ của văn bản (không phân biệt hoa thường)."""
+    words = WORD.findall(text.lower())
+    if len(words) <= k:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = [' '.join(words[i:i + k]) for i in range(len(words) - k + 1)]
+    return SparseVector(zlib.crc32(s.encode('utf-8')) for s in shingles)
+
+class MinHash:
+    """
+    MinHash một hoán vị (one permutation hashing): mỗi phần tử chỉ băm một
+    lần, h(x) = (a*x + b) mod (2^31 - 1); h mod num_perm chọn ô, phần còn
+    lại là giá trị, mỗi ô giữ giá trị nhỏ nhất. Ô rỗng mượn giá trị của ô
+    khác rỗng kế tiếp bên phải (vòng tròn), cộng thêm khoảng cách nhân
+    SPREAD để không trùng ngẫu nhiên với ô gốc. Chi phí O(|tập|) thay vì
+    O(num_perm * |tập|) như dùng num_perm hàm băm.
+    """
+    def __init__(self, num_perm=128, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = rng.randrange(1, MERSENNE)
+        self.b = rng.randrange(0, MERSENNE)
+        # Giá trị trong ô < MERSENNE // num_perm + 1; khoảng cách < num_perm
+        self.spread = MERSENNE // num_perm + 1
+
+    def signature(self, vector):
+        """Chữ ký MinHash của một SparseVector, dạng array('I') num_perm số."""
+        m = self.num_perm
+        if not len(vector):
+            return array(TYPECODE, [MERSENNE] * m)
+        empty = self.spread
+        if np is not None:
+            # a < 2^31 và x < 2^32 nên a*x + b vừa trong uint64
+            h = (vector._numpy().astype(np.uint64) * np.uint64(self.a) + np.uint64(self.b)) % np.uint64(MERSENNE)
+            bins = (h % np.uint64(m)).astype(np.intp)
+            mins = np.full(m, empty, dtype=np.uint64)
+            np.minimum.at(mins, bins, h // np.uint64(m))
+            bins = mins.tolist()
+        else:
+            a, b = self.a, self.b
+            bins = [empty] * m
+            for x in vector.indexes:
+                value, k = divmod((a * x + b) % MERSENNE, m)
+                if value < bins[k]:
+                    bins[k] = value
+        return array(TYPECODE, self._densify(bins))
+
+    def _densify(self, bins):
+        m = self.num_perm
+        empty = self.spread
+        if empty not in bins:
+            return bins
+        filled = list(bins)
+        for k in range(m):
+            if bins[k] == empty:
+                distance = 1
+                while bins[(k + distance) % m] == empty:
+                    distance += 1
+                filled[k] = bins[(k + distance) % m] + distance * self.spread
+        return filled
+
+def estimate_jaccard(sig1, sig2):
+    return sum(1 for x, y in zip(sig1, sig2) if x == y) / len(sig1)
+
+def _probability(s, bands, rows):
+    # Xác suất hai văn bản có Jaccard s thành ứng viên
+    return 1 - (1 - s ** rows) ** bands
+
+def optimal_bands(threshold, num_perm, weights=(0.5, 0.5), steps=100):
+    """
+    (bands, rows) với bands * rows <= num_perm, cực tiểu tổng có trọng số
+    `weights` của tỉ lệ ứng viên thừa dưới ngưỡng và tỉ lệ bỏ sót trên ngưỡng.
+    """
+    fp_weight, fn_weight = weights
+    below = [threshold * (k + 0.5) / steps for k in range(steps)]
+    above = [threshold + (1 - threshold) * (k + 0.5) / steps for k in range(steps)]
+    best, best_error = None, None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_pos = sum(_probability(s, bands, rows) for s in below) * threshold / steps
+            false_neg = sum(1 - _probability(s, bands, rows) for s in above) * (1 - threshold) / steps
+            error = fp_weight * false_pos + fn_weight * false_neg
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+class MinHashLSH:
+    def __init__(self, threshold=0.8, num_perm=128, bands=None, rows=None, weights=(0.5, 0.5), seed=1):
+        self.threshold = threshold
+        self.minhash = MinHash(num_perm, seed)
+        if bands is None or rows is None:
+            bands, rows = optimal_bands(threshold, num_perm, weights)
+        if bands * rows > num_perm:
+            raise ValueError(f"bands * rows ({bands * rows}) exceeds num_perm ({num_perm})")
+        self.bands = bands
+        self.rows = rows
+        self.tables = [defaultdict(list) for _ in range(bands)]
+        self.keys = set()
+
+    def _band_keys(self, signature):
+        r = self.rows
+        return (signature[i * r:(i + 1) * r].tobytes() for i in range(self.bands))
+
+    def insert(self, key, signature):
+        if key in self.keys:
+            raise ValueError(f"duplicate key {key!r}")
+        self.keys.add(key)
+        for table, band in zip(self.tables, self._band_keys(signature)):
+            table[band].append(key)
+
+    def query(self, signature):
+        """Các khóa đã thêm có chung ít nhất một dải với `signature`."""
+        candidates = set()
+        for table, band in zip(self.tables, self._band_keys(signature)):
+            candidates.update(table.get(band, ()))
+        return candidates
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+def find_near_duplicates(documents, threshold=0.8, num_perm=128, k=5, seed=1):
+    """
+    documents: các cặp (key, text). Văn bản có Jaccard shingle >= threshold
+    với một văn bản đến trước nó là bản sao; văn bản đầu tiên được giữ.
+    Ứng viên LSH được kiểm tra lại bằng Jaccard chính xác, nên các dải
+    được chọn nghiêng về không bỏ sót (ứng viên thừa chỉ tốn thời gian).
+    Trả về {khóa bản sao: khóa bản gốc}.
+    """
+    lsh = MinHashLSH(threshold, num_perm, weights=(0.1, 0.9), seed=seed)
+    shingles = {}
+    duplicates = {}
+    for key, text in documents:
+        vector = shingle_vector(text, k)
+        signature = lsh.minhash.signature(vector)
+        best, best_score = None, threshold
+        for other in lsh.query(signature):
+            score = jaccard_similarity(vector, shingles[other])
+            if score >= best_score:
+                best, best_score = other, score
+        if best is not None:
+            duplicates[key] = best
+        else:
+            lsh.insert(key, signature)
+            shingles[key] = vector
+    return duplicates
+
+def iter_crawl(root):
+    """
+    (đường dẫn, văn bản) của các bài trong kho crawl BTL (JSON Subject /
+    Summary / Content), sắp theo tên tệp, tức theo ngày đăng: bản gốc đến trước.
+    """
+    paths = []
+    for directory, _, files in os.walk(root):
+        paths.extend(os.path.join(directory, name) for name in files if name.endswith('.txt'))
+    paths.sort(key=os.path.basename)
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        yield path, f"{data.get('Subject', '')} . {data.get('Summary', '')} . {data.get('Content', '')}"
+
+## --------------------------------------------------
+## VÍ DỤ SỬ DỤNG
+## --------------------------------------------------
+
+def demo():
+    # Giả sử chúng ta có một từ điển:
+    # 0: "python", 1: "code", 2: "logic", 3: "vector", 4: "sparse", 5: "data"
+    print("--- Tạo Vector ---")
+    # Văn bản 1: "python logic sparse data"
+    doc1 = SparseVector([0, 2, 4, 5])
+    print("Văn bản 1:", end=" ")
+    doc1.print_vector()
+    print(f"Độ dài: {doc1.get_length()}")
+
+    # Văn bản 2: "python data vector"
+    doc2 = SparseVector()
+    doc2.insert(5) # "data"
+    doc2.insert(0) # "python"
+    doc2.insert(3) # "vector"
+    print("\nVăn bản 2:", end=" ")
+    doc2.print_vector()
+    print(f"Độ dài: {doc2.get_length()}")
+
+    print("\n--- Phép toán GỘP (Merge) ---")
+    merged_doc = merge_vectors(doc1, doc2)
+    print("Văn bản gộp:", end=" ")
+    merged_doc.print_vector()
+    print(f"Độ dài: {merged_doc.get_length()}")
+
+    print("\n--- Phép toán KHOẢNG CÁCH HAMMING ---")
+    # Giao = {0, 5} -> Hamming = 4 + 3 - 2 * 2 = 3
+    distance = calculate_hamming_distance(doc1, doc2)
+    print(f"Khoảng cách Hamming giữa doc1 và doc2 là: {distance}")
+    print("Ma trận Hamming của (doc1, doc2, gộp):", pairwise_hamming([doc1, doc2, merged_doc]))
+
+def main():
+    parser = argparse.ArgumentParser(description="Sparse binary vectors; near-duplicate detection for the BTL crawl.")
+    parser.add_argument("--dedup", metavar="ROOT", default=None,
+                        help="find near-duplicate articles under this crawl directory")
+    parser.add_argument("--out", default="duplicates.txt",
+                        help="one duplicate path per line, a tab, then the article it copies")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Jaccard similarity of shingles")
+    parser.add_argument("--shingle", type=int, default=5, help="words per shingle")
+    parser.add_argument("--num-perm", type=int, default=128, help="MinHash signature length")
+    args = parser.parse_args()
+    if args.dedup is None:
+        demo()
+        return
+
+    duplicates = find_near_duplicates(iter_crawl(args.dedup), args.threshold, args.num_perm, args.shingle)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        for path, original in duplicates.items():
+            f.write(f"{path}\t{original}\n")
+    print(f"{len(duplicates)} near-duplicate articles written to {args.out} "
+          f"(skip them with: analyzer.py --exclude {args.out})")
+
+if __name__ == "__main__":
+    main()
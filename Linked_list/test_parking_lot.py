@@ -0,0 +1,57 @@
+import datetime
+
+from parking_lot import ParkingLot, EventLog
+
+T0 = datetime.datetime(2024, 1, 1, 8, 0)
+
+
+def _cards(lot):
+    return [v.card_id for v in lot.vehicles()]
+
+
+def _minutes(m):
+    return T0 + datetime.timedelta(minutes=m)
+
+
+def test_recover_after_torn_last_line(tmp_path):
+    log_path = str(tmp_path / 'events.log')
+    lot = ParkingLot(log=EventLog(log_path))
+    lot.park_vehicle('A', '29A-001', _minutes(0))
+    lot.park_vehicle('B', '29A-002', _minutes(1))
+    lot.log.close()
+    # The process died halfway through writing the third event
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 3, "type": "in", "ca')
+
+    lot = ParkingLot.recover(log_path)
+    assert _cards(lot) == ['A', 'B']
+    lot.park_vehicle('C', '29A-003', _minutes(2))
+    lot.exit_vehicle('A', '29A-001', _minutes(3))
+    lot.log.close()
+
+    lot = ParkingLot.recover(log_path)
+    assert _cards(lot) == ['B', 'C']
+    assert lot.log.seq == 4
+    lot.log.close()
+
+
+def test_recover_from_snapshot_after_torn_line(tmp_path):
+    log_path, snapshot_path = str(tmp_path / 'events.log'), str(tmp_path / 'state.json')
+    lot = ParkingLot(log=EventLog(log_path))
+    lot.park_vehicle('A', '29A-001', _minutes(0))
+    lot.snapshot(snapshot_path)
+    lot.park_vehicle('B', '29A-002', _minutes(1))
+    lot.log.close()
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 3')
+
+    lot = ParkingLot.recover(log_path, snapshot_path)
+    lot.park_vehicle('C', '29A-003', _minutes(2))
+    lot.log.close()
+    assert _cards(ParkingLot.recover(log_path, snapshot_path)) == ['A', 'B', 'C']
+
+
+def test_read_skips_corrupt_lines(tmp_path):
+    log_path = tmp_path / 'events.log'
+    log_path.write_text('{"seq": 1, "type": "in"}\nnot json\n{"seq": 2, "type": "out"}\n', encoding='utf-8')
+    assert [e['seq'] for e in EventLog.read(str(log_path))] == [1, 2]
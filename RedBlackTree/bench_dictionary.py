@@ -0,0 +1,180 @@
+import gc
+import os
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from bisect import bisect_left
+from envi_dictionary import RedBlackTree
+
+# So sánh RedBlackTree với hai cách làm quen thuộc trên cùng một bộ từ vựng
+# giả lập: dict + danh sách khóa đã sắp xếp (bisect), và SortedDict của
+# sortedcontainers nếu đã cài. Đo thời gian dựng, tra cứu, truy vấn tiền tố,
+# truy vấn khoảng, duyệt toàn bộ, lưu/nạp và bộ nhớ (tracemalloc).
+
+try:
+    from sortedcontainers import SortedDict
+except ImportError:
+    SortedDict = None
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+def make_lexicon(n, seed):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n:
+        words.add(''.join(rng.choice(LETTERS) for _ in range(rng.randint(3, 12))))
+    words = list(words)
+    rng.shuffle(words)
+    return [(w, f"nghĩa của {w}") for w in words]
+
+class BisectMap:
+    """dict cho tra cứu + danh sách khóa đã sắp xếp cho truy vấn có thứ tự."""
+    def __init__(self, pairs):
+        self.data = dict(pairs)
+        self.keys = sorted(self.data)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def prefix(self, prefix, limit):
+        i = bisect_left(self.keys, prefix)
+        out = []
+        for key in self.keys[i:i + limit]:
+            if not key.startswith(prefix):
+                break
+            out.append((key, self.data[key]))
+        return out
+
+    def range(self, lo, hi):
+        i = bisect_left(self.keys, lo)
+        out = []
+        while i < len(self.keys) and self.keys[i] <= hi:
+            out.append((self.keys[i], self.data[self.keys[i]]))
+            i += 1
+        return out
+
+    def items(self):
+        return ((key, self.data[key]) for key in self.keys)
+
+class SortedDictMap:
+    def __init__(self, pairs):
+        self.data = SortedDict(pairs)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def prefix(self, prefix, limit):
+        out = []
+        for key in self.data.irange(prefix):
+            if len(out) >= limit or not key.startswith(prefix):
+                break
+            out.append((key, self.data[key]))
+        return out
+
+    def range(self, lo, hi):
+        return [(key, self.data[key]) for key in self.data.irange(lo, hi)]
+
+    def items(self):
+        return iter(self.data.items())
+
+class TreeMap:
+    def __init__(self, tree):
+        self.tree = tree
+
+    def get(self, key):
+        return self.tree.get(key)
+
+    def prefix(self, prefix, limit):
+        return list(self.tree.prefix_items(prefix, limit))
+
+    def range(self, lo, hi):
+        return list(self.tree.items(lo, hi))
+
+    def items(self):
+        return self.tree.items()
+
+def insert_all(pairs):
+    tree = RedBlackTree()
+    for key, value in pairs:
+        tree.insert(key, value)
+    return tree
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def measure_memory(build):
+    tracemalloc.start()
+    structure = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, structure
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RedBlackTree against dict+bisect and SortedDict.")
+    parser.add_argument("--words", type=int, default=300000)
+    parser.add_argument("--queries", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    pairs = make_lexicon(args.words, args.seed)
+    rng = random.Random(args.seed + 1)
+    lookups = [rng.choice(pairs)[0] for _ in range(args.queries)]
+    prefixes = [w[:rng.randint(1, 3)] for w, _ in rng.sample(pairs, min(len(pairs), args.queries // 10))]
+    # Narrow ranges, a page or so of words each
+    ranges = [(w[:3], w[:3] + 'c') for w, _ in rng.sample(pairs, 200)]
+    print(f"{len(pairs)} words, {len(lookups)} lookups, {len(prefixes)} prefix queries, "
+          f"{len(ranges)} range queries")
+
+    builders = {
+        'rbtree insert': lambda: TreeMap(insert_all(pairs)),
+        'rbtree bulk': lambda: TreeMap(RedBlackTree.from_sorted(sorted(pairs))),
+        'dict+bisect': lambda: BisectMap(pairs),
+    }
+    if SortedDict is not None:
+        builders['SortedDict'] = lambda: SortedDictMap(pairs)
+    else:
+        print("sortedcontainers is not installed; skipping SortedDict")
+
+    print(f"{'structure':<15}{'build s':>9}{'MB':>8}{'get us':>9}{'prefix us':>11}"
+          f"{'range us':>10}{'iterate s':>11}")
+    expected = None
+    for name, build in builders.items():
+        build_time, structure = timed(build)
+        memory, _ = measure_memory(build)
+        get_time, _ = timed(lambda: [structure.get(w) for w in lookups])
+        prefix_time, answers = timed(lambda: [structure.prefix(p, 10) for p in prefixes])
+        range_time, ranged = timed(lambda: [structure.range(lo, hi) for lo, hi in ranges])
+        iterate_time, everything = timed(lambda: sum(1 for _ in structure.items()))
+        if expected is None:
+            expected = (answers, ranged)
+        assert (answers, ranged) == expected, name
+        assert everything == len(pairs)
+        print(f"{name:<15}{build_time:>9.2f}{memory / (1 << 20):>8.1f}"
+              f"{get_time / len(lookups) * 1e6:>9.2f}{prefix_time / len(prefixes) * 1e6:>11.2f}"
+              f"{range_time / len(ranges) * 1e6:>10.2f}{iterate_time:>11.2f}")
+
+    # Node cây là đối tượng được GC theo dõi, nên mỗi lần thu gom thế hệ cũ
+    # đều duyệt cả cây; gc.freeze() sau khi nạp loại chúng khỏi các lần đó
+    tree = TreeMap(RedBlackTree.from_sorted(sorted(pairs)))
+    gc.freeze()
+    get_time, _ = timed(lambda: [tree.get(w) for w in lookups])
+    prefix_time, _ = timed(lambda: [tree.prefix(p, 10) for p in prefixes])
+    gc.unfreeze()
+    print(f"rbtree after gc.freeze(): get {get_time / len(lookups) * 1e6:.2f} us, "
+          f"prefix {prefix_time / len(prefixes) * 1e6:.2f} us")
+
+    tree = tree.tree
+    path = os.path.join(tempfile.mkdtemp(), 'lexicon.rbt')
+    save_time, _ = timed(lambda: tree.save(path))
+    load_time, loaded = timed(lambda: RedBlackTree.load(path))
+    loaded.validate()
+    print(f"save {save_time:.2f}s, load {load_time:.2f}s, {os.path.getsize(path) / (1 << 20):.1f} MB on disk")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
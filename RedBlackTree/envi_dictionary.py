@@ -0,0 +1,614 @@
+import gc
+import sys
+import pickle
+from contextlib import contextmanager
+
+# Từ điển Anh-Việt trên cây đỏ đen (bản module của EnVi_dictionary.ipynb),
+# dùng được cho cả bộ từ vựng vài trăm nghìn mục:
+#   - Node dùng __slots__ và màu là bool, nhỏ hơn nhiều so với node có __dict__
+#   - tìm kiếm, chèn, xóa đều lặp (không đệ quy)
+#   - from_sorted() dựng cây cân bằng từ dữ liệu đã sắp xếp trong O(n)
+#   - duyệt theo thứ tự, truy vấn khoảng [lo, hi] và theo tiền tố (gợi ý từ)
+#   - save()/load(): lưu các cặp theo thứ tự, nạp lại bằng from_sorted()
+#
+# Node là đối tượng được GC theo dõi: với từ điển nạp một lần rồi chỉ tra
+# cứu, gọi gc.freeze() sau khi nạp để bộ thu gom không duyệt lại cả cây
+# (xem bench_dictionary.py).
+
+RED = True
+BLACK = False
+
+FORMAT = 'envi-rbtree'
+VERSION = 1
+
+@contextmanager
+def _gc_paused():
+    # Dựng hàng trăm nghìn node liên tiếp làm bộ thu gom rác chạy lại nhiều
+    # lần trên toàn bộ cây (gần nửa thời gian dựng), dù không có rác nào
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+# 1. Cấu trúc Node
+class Node:
+    __slots__ = ('key', 'value', 'red', 'parent', 'left', 'right')
+
+    def __init__(self, key, value, red=RED, nil=None):
+        self.key = key
+        self.value = value
+        self.red = red
+        self.parent = None
+        self.left = nil
+        self.right = nil
+
+# 2. Cấu trúc Cây Đỏ-Đen (ánh xạ có thứ tự)
+class RedBlackTree:
+    def __init__(self):
+        # TNULL là node lá ảo, luôn là màu Đen. Mỗi cây có TNULL riêng vì
+        # thao tác xóa tạm gán TNULL.parent.
+        self.TNULL = Node(None, None, BLACK)
+        self.root = self.TNULL
+        self.size = 0
+        self._changes = 0   # số lần sửa cây, để phát hiện sửa trong lúc duyệt
+
+    def __len__(self):
+        return self.size
+
+    # --- TÌM KIẾM ---
+    def search_tree(self, key):
+        """Node chứa `key`, hoặc TNULL nếu không có."""
+        node = self.root
+        nil = self.TNULL
+        while node is not nil and key != node.key:
+            node = node.left if key < node.key else node.right
+        return node
+
+    def __contains__(self, key):
+        return self.search_tree(key) is not self.TNULL
+
+    def get(self, key, default=None):
+        node = self.search_tree(key)
+        return default if node is self.TNULL else node.value
+
+    def __getitem__(self, key):
+        node = self.search_tree(key)
+        if node is self.TNULL:
+            raise KeyError(key)
+        return node.value
+
+    def __setitem__(self, key, value):
+        self.insert(key, value)
+
+    def __delitem__(self, key):
+        if not self.delete_node(key):
+            raise KeyError(key)
+
+    def minimum(self, node):
+        while node.left is not self.TNULL:
+            node = node.left
+        return node
+
+    def maximum(self, node):
+        while node.right is not self.TNULL:
+            node = node.right
+        return node
+
+    def successor(self, node):
+        """Node đứng ngay sau `node` theo thứ tự khóa, hoặc None."""
+        if node.right is not self.TNULL:
+            return self.minimum(node.right)
+        parent = node.parent
+        while parent is not None and node is parent.right:
+            node = parent
+            parent = parent.parent
+        return parent
+
+    def predecessor(self, node):
+        if node.left is not self.TNULL:
+            return self.maximum(node.left)
+        parent = node.parent
+        while parent is not None and node is parent.left:
+            node = parent
+            parent = parent.parent
+        return parent
+
+    def ceiling_node(self, key, inclusive=True):
+        """Node có khóa nhỏ nhất >= key (> key nếu inclusive=False), hoặc None."""
+        node, best = self.root, None
+        nil = self.TNULL
+        while node is not nil:
+            if key < node.key or (inclusive and key == node.key):
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        return best
+
+    def floor_node(self, key, inclusive=True):
+        """Node có khóa lớn nhất <= key (< key nếu inclusive=False), hoặc None."""
+        node, best = self.root, None
+        nil = self.TNULL
+        while node is not nil:
+            if node.key < key or (inclusive and key == node.key):
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        return best
+
+    # --- DUYỆT THEO THỨ TỰ ---
+    # Duyệt bằng ngăn xếp tổ tiên: khi đi xuống tìm điểm bắt đầu, mỗi node
+    # mà ta rẽ trái (rẽ phải nếu duyệt ngược) được đẩy vào ngăn xếp, nên đỉnh
+    # ngăn xếp luôn là node kế tiếp. Mỗi bước O(1) khấu hao, không cần gọi
+    # successor() và không cần con trỏ cha.
+    def _walk(self, start=None, start_inclusive=True, stop=None, stop_inclusive=True, reverse=False):
+        nil = self.TNULL
+        stack = []
+        node = self.root
+        while node is not nil:
+            if start is None:
+                take = True
+            elif reverse:
+                take = node.key < start or (start_inclusive and node.key == start)
+            else:
+                take = start < node.key or (start_inclusive and node.key == start)
+            if take:
+                stack.append(node)
+                node = node.right if reverse else node.left
+            else:
+                node = node.left if reverse else node.right
+
+        changes = self._changes
+        while stack:
+            node = stack.pop()
+            if stop is not None:
+                past = (node.key < stop) if reverse else (stop < node.key)
+                if past or (not stop_inclusive and node.key == stop):
+                    return
+            yield node
+            if self._changes != changes:
+                raise RuntimeError("RedBlackTree changed during iteration")
+            child = node.left if reverse else node.right
+            while child is not nil:
+                stack.append(child)
+                child = child.right if reverse else child.left
+
+    def __iter__(self):
+        return (node.key for node in self._walk())
+
+    def __reversed__(self):
+        return (node.key for node in self._walk(reverse=True))
+
+    def irange(self, lo=None, hi=None, inclusive=(True, True), reverse=False):
+        """Các node có khóa trong khoảng [lo, hi] (None: không giới hạn), theo thứ tự."""
+        lo_inclusive, hi_inclusive = inclusive
+        if reverse:
+            return self._walk(hi, hi_inclusive, lo, lo_inclusive, reverse=True)
+        return self._walk(lo, lo_inclusive, hi, hi_inclusive)
+
+    def keys(self, lo=None, hi=None, inclusive=(True, True)):
+        return (node.key for node in self.irange(lo, hi, inclusive))
+
+    def values(self, lo=None, hi=None, inclusive=(True, True)):
+        return (node.value for node in self.irange(lo, hi, inclusive))
+
+    def items(self, lo=None, hi=None, inclusive=(True, True)):
+        return ((node.key, node.value) for node in self.irange(lo, hi, inclusive))
+
+    def prefix_items(self, prefix, limit=None):
+        """(key, value) của các khóa chuỗi bắt đầu bằng `prefix`, theo thứ tự."""
+        if limit == 0:
+            return
+        found = 0
+        for node in self._walk(prefix):
+            if not node.key.startswith(prefix):
+                return
+            yield node.key, node.value
+            found += 1
+            if found == limit:
+                return
+
+    def left_rotate(self, x):
+        y = x.right
+        x.right = y.left
+        if y.left is not self.TNULL:
+            y.left.parent = x
+        y.parent = x.parent
+        if x.parent is None:
+            self.root = y
+        elif x is x.parent.left:
+            x.parent.left = y
+        else:
+            x.parent.right = y
+        y.left = x
+        x.parent = y
+
+    def right_rotate(self, x):
+        y = x.left
+        x.left = y.right
+        if y.right is not self.TNULL:
+            y.right.parent = x
+        y.parent = x.parent
+        if x.parent is None:
+            self.root = y
+        elif x is x.parent.right:
+            x.parent.right = y
+        else:
+            x.parent.left = y
+        y.right = x
+        x.parent = y
+
+    # Thay thế cây con u bằng cây con v
+    def transplant(self, u, v):
+        if u.parent is None:
+            self.root = v
+        elif u is u.parent.left:
+            u.parent.left = v
+        else:
+            u.parent.right = v
+        v.parent = u.parent
+
+    # --- PHẦN INSERT (THÊM) ---
+    def insert(self, key, value):
+        """Thêm `key`; nếu đã có thì cập nhật giá trị. Trả về True nếu là khóa mới."""
+        nil = self.TNULL
+        y = None
+        x = self.root
+        while x is not nil:
+            y = x
+            if key < x.key:
+                x = x.left
+            elif x.key < key:
+                x = x.right
+            else:
+                # Nếu từ đã tồn tại, cập nhật nghĩa
+                x.value = value
+                return False
+
+        node = Node(key, value, RED, nil)  # Node mới luôn đỏ
+        node.parent = y
+        if y is None:
+            self.root = node
+        elif key < y.key:
+            y.left = node
+        else:
+            y.right = node
+        self.size += 1
+        self._changes += 1
+
+        if node.parent is None:
+            node.red = BLACK
+            return True
+        if node.parent.parent is None:
+            return True
+        self.fix_insert(node)
+        return True
+
+    def fix_insert(self, k):
+        while k.parent.red:
+            if k.parent is k.parent.parent.right:
+                u = k.parent.parent.left
+                if u.red:
+                    u.red = BLACK
+                    k.parent.red = BLACK
+                    k.parent.parent.red = RED
+                    k = k.parent.parent
+                else:
+                    if k is k.parent.left:
+                        k = k.parent
+                        self.right_rotate(k)
+                    k.parent.red = BLACK
+                    k.parent.parent.red = RED
+                    self.left_rotate(k.parent.parent)
+            else:
+                u = k.parent.parent.right
+                if u.red:
+                    u.red = BLACK
+                    k.parent.red = BLACK
+                    k.parent.parent.red = RED
+                    k = k.parent.parent
+                else:
+                    if k is k.parent.right:
+                        k = k.parent
+                        self.left_rotate(k)
+                    k.parent.red = BLACK
+                    k.parent.parent.red = RED
+                    self.right_rotate(k.parent.parent)
+            if k is self.root:
+                break
+        self.root.red = BLACK
+
+    # --- PHẦN DELETE (XÓA) ---
+    def delete_node(self, key):
+        """Xóa `key`. Trả về False nếu không có khóa này."""
+        z = self.search_tree(key)
+        if z is self.TNULL:
+            return False
+
+        y = z
+        y_original_red = y.red
+        if z.left is self.TNULL:
+            x = z.right
+            self.transplant(z, z.right)
+        elif z.right is self.TNULL:
+            x = z.left
+            self.transplant(z, z.left)
+        else:
+            y = self.minimum(z.right)
+            y_original_red = y.red
+            x = y.right
+            if y.parent is z:
+                x.parent = y
+            else:
+                self.transplant(y, y.right)
+                y.right = z.right
+                y.right.parent = y
+
+            self.transplant(z, y)
+            y.left = z.left
+            y.left.parent = y
+            y.red = z.red
+
+        if not y_original_red:
+            self.fix_delete(x)
+        self.TNULL.parent = None
+        self.size -= 1
+        self._changes += 1
+        return True
+
+    def fix_delete(self, x):
+        while x is not self.root and not x.red:
+            if x is x.parent.left:
+                s = x.parent.right # Node anh em (Sibling)
+                if s.red:
+                    s.red = BLACK
+                    x.parent.red = RED
+                    self.left_rotate(x.parent)
+                    s = x.parent.right
+
+                if not s.left.red and not s.right.red:
+                    s.red = RED
+                    x = x.parent
+                else:
+                    if not s.right.red:
+                        s.left.red = BLACK
+                        s.red = RED
+                        self.right_rotate(s)
+                        s = x.parent.right
+
+                    s.red = x.parent.red
+                    x.parent.red = BLACK
+                    s.right.red = BLACK
+                    self.left_rotate(x.parent)
+                    x = self.root
+            else:
+                s = x.parent.left
+                if s.red:
+                    s.red = BLACK
+                    x.parent.red = RED
+                    self.right_rotate(x.parent)
+                    s = x.parent.left
+
+                if not s.right.red and not s.left.red:
+                    s.red = RED
+                    x = x.parent
+                else:
+                    if not s.left.red:
+                        s.right.red = BLACK
+                        s.red = RED
+                        self.left_rotate(s)
+                        s = x.parent.left
+
+                    s.red = x.parent.red
+                    x.parent.red = BLACK
+                    s.left.red = BLACK
+                    self.right_rotate(x.parent)
+                    x = self.root
+        x.red = BLACK
+
+    # --- DỰNG CÂY HÀNG LOẠT ---
+    @classmethod
+    def from_sorted(cls, items, check=True):
+        """
+        Dựng cây từ các cặp (key, value) có khóa tăng dần nghiêm ngặt, trong O(n).
+        Cây dựng bằng cách lấy phần tử giữa làm gốc nên mọi tầng đều đầy trừ
+        tầng cuối; các node ở tầng cuối chưa đầy tô đỏ, còn lại tô đen, nên
+        mọi đường đi từ gốc xuống lá có cùng số node đen.
+        """
+        tree = cls()
+        items = items if isinstance(items, list) else list(items)
+        n = len(items)
+        if check:
+            for i in range(1, n):
+                if not items[i - 1][0] < items[i][0]:
+                    raise ValueError(f"keys must be strictly increasing: {items[i - 1][0]!r}, {items[i][0]!r}")
+        if n == 0:
+            return tree
+        # Tầng cuối (chưa đầy) nếu n + 1 không phải lũy thừa của 2
+        full_levels = (n + 1).bit_length() - 1
+        red_depth = full_levels if (n + 1) & n else -1
+        with _gc_paused():
+            tree.root = _build(items, 0, n, 0, None, red_depth, tree.TNULL)
+        tree.size = n
+        return tree
+
+    def validate(self):
+        """Kiểm tra các tính chất cây đỏ đen và thứ tự khóa; trả về chiều cao đen."""
+        if self.root.red:
+            raise AssertionError("root is red")
+        black_height = None
+        stack = [(self.root, 0, None, None)]
+        while stack:
+            node, blacks, lo, hi = stack.pop()
+            if node is self.TNULL:
+                if black_height is None:
+                    black_height = blacks
+                elif blacks != black_height:
+                    raise AssertionError("paths with different black heights")
+                continue
+            if (lo is not None and not lo < node.key) or (hi is not None and not node.key < hi):
+                raise AssertionError(f"key {node.key!r} out of order")
+            if node.red and (node.left.red or node.right.red):
+                raise AssertionError(f"red node {node.key!r} has a red child")
+            for child in (node.left, node.right):
+                if child is not self.TNULL and child.parent is not node:
+                    raise AssertionError(f"bad parent link under {node.key!r}")
+            blacks += not node.red
+            stack.append((node.left, blacks, lo, node.key))
+            stack.append((node.right, blacks, node.key, hi))
+        return black_height
+
+    # --- LƯU / NẠP ---
+    def save(self, path):
+        # Chỉ lưu các cặp theo thứ tự; cấu trúc cây dựng lại khi nạp
+        keys, values = [], []
+        for node in self._walk():
+            keys.append(node.key)
+            values.append(node.value)
+        with open(path, 'wb') as f:
+            pickle.dump({'format': FORMAT, 'version': VERSION, 'keys': keys, 'values': values},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if not isinstance(data, dict) or data.get('format') != FORMAT:
+            raise ValueError(f"{path} is not a saved RedBlackTree")
+        if data['version'] > VERSION:
+            raise ValueError(f"{path} has format version {data['version']}, newer than {VERSION}")
+        # Tệp do save() ghi nên khóa đã tăng dần, không cần kiểm tra lại
+        return cls.from_sorted(list(zip(data['keys'], data['values'])), check=False)
+
+def _build(items, lo, hi, depth, parent, red_depth, nil):
+    # Dựng cây con từ items[lo:hi] (xem RedBlackTree.from_sorted)
+    if lo >= hi:
+        return nil
+    mid = (lo + hi) // 2
+    key, value = items[mid]
+    node = Node(key, value, depth == red_depth, nil)
+    node.parent = parent
+    node.left = _build(items, lo, mid, depth + 1, node, red_depth, nil)
+    node.right = _build(items, mid + 1, hi, depth + 1, node, red_depth, nil)
+    return node
+
+# 3. Lớp Ứng Dụng: Từ điển
+class EnglishVietnameseDictionary:
+    def __init__(self, verbose=False):
+        self.bst = RedBlackTree()
+        self.verbose = verbose
+
+    @classmethod
+    def from_pairs(cls, pairs, verbose=False):
+        """Nạp cả bộ từ vựng [(en_word, vn_meaning)] một lần; từ trùng lấy nghĩa sau cùng."""
+        merged = {}
+        for en_word, vn_meaning in pairs:
+            merged[en_word.lower()] = vn_meaning
+        dictionary = cls(verbose)
+        dictionary.bst = RedBlackTree.from_sorted(sorted(merged.items()), check=False)
+        return dictionary
+
+    @classmethod
+    def load(cls, path, verbose=False):
+        dictionary = cls(verbose)
+        dictionary.bst = RedBlackTree.load(path)
+        return dictionary
+
+    def save(self, path):
+        self.bst.save(path)
+
+    def __len__(self):
+        return len(self.bst)
+
+    def add_word(self, en_word, vn_meaning):
+        self.bst.insert(en_word.lower(), vn_meaning)
+        if self.verbose:
+            print(f"Thêm: '{en_word}' -> '{vn_meaning}'")
+
+    def remove_word(self, en_word):
+        removed = self.bst.delete_node(en_word.lower())
+        if self.verbose:
+            print(f"Đã xóa: '{en_word}'" if removed else f"Không tìm thấy từ '{en_word}' để xóa.")
+        return removed
+
+    def meaning(self, en_word):
+        """Nghĩa của từ, hoặc None."""
+        return self.bst.get(en_word.lower())
+
+    def lookup(self, en_word):
+        node = self.bst.search_tree(en_word.lower())
+        if node is not self.bst.TNULL:
+            return f"[Tra cứu] {en_word}: {node.value}"
+        else:
+            return f"[Tra cứu] '{en_word}' chưa có trong từ điển."
+
+    def suggest(self, prefix, limit=10):
+        """Gợi ý: tối đa `limit` cặp (từ, nghĩa) bắt đầu bằng `prefix`."""
+        return list(self.bst.prefix_items(prefix.lower(), limit))
+
+    def words_between(self, first, last, limit=None):
+        """Các cặp (từ, nghĩa) từ `first` đến `last` (tính cả hai đầu) theo thứ tự từ điển."""
+        result = []
+        for item in self.bst.items(first.lower(), last.lower()):
+            if limit is not None and len(result) >= limit:
+                break
+            result.append(item)
+        return result
+
+    # Hàm in cây để kiểm tra cấu trúc (Debug)
+    def print_structure(self):
+        print("\n--- Cấu trúc cây hiện tại ---")
+        nil = self.bst.TNULL
+        stack = [(self.bst.root, "", True)]
+        while stack:
+            node, indent, last = stack.pop()
+            if node is nil:
+                continue
+            sys.stdout.write(indent)
+            if last:
+                sys.stdout.write("R----")
+                indent += "     "
+            else:
+                sys.stdout.write("L----")
+                indent += "|    "
+            s_color = "ĐỎ" if node.red else "ĐEN"
+            print(f"{node.key} ({s_color})")
+            # Con phải vào trước để con trái được in trước
+            stack.append((node.right, indent, True))
+            stack.append((node.left, indent, False))
+        print("-----------------------------\n")
+
+# --- CHẠY THỬ CHƯƠNG TRÌNH ---
+if __name__ == "__main__":
+    my_dict = EnglishVietnameseDictionary(verbose=True)
+
+    # 1. Thêm dữ liệu
+    my_dict.add_word("apple", "Quả táo")
+    my_dict.add_word("banana", "Quả chuối")
+    my_dict.add_word("cherry", "Quả anh đào")
+    my_dict.add_word("date", "Quả chà là")
+    my_dict.add_word("elderberry", "Quả cơm cháy")
+
+    # In cấu trúc để xem màu Đỏ/Đen được phân bố thế nào
+    my_dict.print_structure()
+
+    # 2. Tra cứu
+    print(my_dict.lookup("Banana"))
+    print(my_dict.lookup("Fig"))
+
+    # 3. Gợi ý theo tiền tố và truy vấn khoảng
+    print(my_dict.suggest("b"))
+    print(my_dict.words_between("banana", "date"))
+
+    # 4. Xóa dữ liệu (Thử thách cho cây)
+    print("\n--- Bắt đầu xóa ---")
+    my_dict.remove_word("banana") # Xóa một node giữa cây
+    my_dict.remove_word("apple")  # Xóa node gốc hoặc node biên
+
+    # 5. Kiểm tra lại sau khi xóa
+    print(my_dict.lookup("banana"))
+    my_dict.print_structure()
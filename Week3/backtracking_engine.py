@@ -0,0 +1,402 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import repeat
+
+# Khung quay lui dùng chung cho N-Hậu (Nquanhau.ipynb) và Sudoku (suduku.ipynb).
+#
+# Ràng buộc được giữ bằng bitmask thay vì quét lại bàn cờ:
+#   - N-Hậu: cols / ld / rd là các cột và hai hướng đường chéo đã bị chiếm
+#     ở hàng đang xét; các ô còn trống của hàng là ~(cols | ld | rd).
+#   - Sudoku: rows[r], cols[c], boxes[b] là 9 bit các chữ số đã dùng; ô được
+#     chọn là ô trống có ít ứng viên nhất (MRV), ô 0 ứng viên thì cắt nhánh.
+# Các tầng trên của cây tìm kiếm được tách thành các nhánh con (split) và chạy
+# trên một nhóm tiến trình; đếm lời giải không in gì ra màn hình.
+
+## --------------------------------------------------
+## BƯỚC 1: KHUNG CHUNG
+## --------------------------------------------------
+
+class BacktrackingSolver:
+    """
+    Lớp cơ sở. Lớp con định nghĩa:
+      _root()              trạng thái gốc
+      _children(state)     [(trạng thái con, trọng số)]; trạng thái đã xong trả về chính nó
+      _count_from(state)   số lời giải trong nhánh (tuần tự)
+      _first_from(state)   một lời giải trong nhánh hoặc None
+    Trọng số cho phép gộp các nhánh đối xứng (VD: N-Hậu chỉ thử nửa hàng đầu).
+    """
+    def split(self, depth):
+        """Các nhánh con sau `depth` tầng, dạng [(state, weight)]."""
+        frontier = [(self._root(), 1)]
+        for _ in range(depth):
+            frontier = [(child, weight * child_weight)
+                        for state, weight in frontier
+                        for child, child_weight in self._children(state)]
+        return frontier
+
+    def count(self, workers=None, split_depth=2):
+        """Tổng số lời giải; workers > 1 chia các nhánh ở tầng split_depth cho nhiều tiến trình."""
+        tasks = self.split(split_depth if workers and workers > 1 else 1)
+        if not workers or workers <= 1:
+            return sum(weight * self._count_from(state) for state, weight in tasks)
+        with ProcessPoolExecutor(workers) as pool:
+            counts = pool.map(_count_task, repeat(self), [state for state, _ in tasks],
+                              chunksize=max(1, len(tasks) // (workers * 8)))
+            return sum(weight * c for (_, weight), c in zip(tasks, counts))
+
+    def first_solution(self, workers=None, split_depth=2):
+        """Một lời giải bất kỳ (nhánh song song nào xong trước thì lấy)."""
+        if not workers or workers <= 1:
+            return self._first_from(self._root())
+        tasks = self.split(split_depth)
+        pool = ProcessPoolExecutor(workers)
+        try:
+            futures = [pool.submit(_first_task, self, state) for state, _ in tasks]
+            for future in as_completed(futures):
+                solution = future.result()
+                if solution is not None:
+                    return solution
+            return None
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+def _count_task(solver, state):
+    return solver._count_from(state)
+
+def _first_task(solver, state):
+    return solver._first_from(state)
+
+## --------------------------------------------------
+## BƯỚC 2: N-HẬU
+## --------------------------------------------------
+
+def _count_queens(full, cols, ld, rd, rows_left):
+    """Số cách xếp nốt rows_left hàng; hàng cuối chỉ cần đếm số bit trống."""
+    avail = full & ~(cols | ld | rd)
+    if rows_left == 1:
+        return bin(avail).count('1')
+    count = 0
+    while avail:
+        bit = avail & -avail
+        avail ^= bit
+        count += _count_queens(full, cols | bit, ((ld | bit) << 1) & full, (rd | bit) >> 1, rows_left - 1)
+    return count
+
+class NQueensSolver(BacktrackingSolver):
+    """
+    Lớp giải quyết bài toán N-Hậu bằng quay lui trên bitmask.
+    Bit c của một mask ứng với cột c.
+    """
+    def __init__(self, n):
+        self.n = n
+        self.full = (1 << n) - 1
+        self.positions = [-1] * n
+        self.solution_count = 0
+
+    # state = (positions đã đặt, cols, ld, rd)
+    def _root(self):
+        return ((), 0, 0, 0)
+
+    def _children(self, state):
+        positions, cols, ld, rd = state
+        if len(positions) == self.n:
+            return [(state, 1)]
+        avail = self.full & ~(cols | ld | rd)
+        children = []
+        for col in range(self.n):
+            bit = 1 << col
+            if not avail & bit:
+                continue
+            weight = 1
+            if not positions:
+                # Đối xứng gương: hàng đầu chỉ thử nửa trái, nhân đôi số lời giải
+                if 2 * col + 1 > self.n:
+                    break
+                weight = 1 if 2 * col + 1 == self.n else 2
+            children.append(((positions + (col,), cols | bit, ((ld | bit) << 1) & self.full,
+                              (rd | bit) >> 1), weight))
+        return children
+
+    def _count_from(self, state):
+        positions, cols, ld, rd = state
+        rows_left = self.n - len(positions)
+        if rows_left == 0:
+            return 1
+        return _count_queens(self.full, cols, ld, rd, rows_left)
+
+    def _first_from(self, state):
+        return next(self._solutions_from(state), None)
+
+    def _solutions_from(self, state):
+        start, cols, ld, rd = state
+        positions = list(start)
+        if len(positions) == self.n:
+            yield positions
+            return
+        full = self.full
+        # Mỗi tầng stack là một hàng: (mask của hàng, các cột còn chưa thử).
+        # Luôn có len(positions) == len(start) + len(stack) - 1.
+        stack = [(cols, ld, rd, full & ~(cols | ld | rd))]
+        while stack:
+            cols, ld, rd, avail = stack[-1]
+            if not avail:
+                stack.pop()
+                if stack:
+                    positions.pop()   # quay lui: bỏ hậu của hàng trên
+                continue
+            bit = avail & -avail
+            stack[-1] = (cols, ld, rd, avail ^ bit)
+            col = bit.bit_length() - 1
+            if len(positions) + 1 == self.n:
+                yield positions + [col]
+                continue
+            positions.append(col)
+            cols, ld, rd = cols | bit, ((ld | bit) << 1) & full, (rd | bit) >> 1
+            stack.append((cols, ld, rd, full & ~(cols | ld | rd)))
+
+    def solutions(self):
+        """Sinh lần lượt mọi lời giải dạng positions (positions[row] = col)."""
+        return self._solutions_from(self._root())
+
+    def solve_and_print(self):
+        """
+        Bắt đầu quá trình giải, in ra các giải pháp và trả về tổng số cách xếp.
+        """
+        self.solution_count = 0 # Reset bộ đếm
+        for positions in self.solutions():
+            self.solution_count += 1
+            self.positions = positions
+            self._print_solution()
+        print(f"\n>> Đã tìm thấy tổng cộng {self.solution_count} cách xếp cho bàn cờ {self.n}x{self.n}.")
+        return self.solution_count
+
+    def _print_solution(self):
+        """Hàm phụ trợ để in ra một giải pháp tìm được."""
+        print(f"Giải pháp #{self.solution_count}:")
+        for row in range(self.n):
+            print(" ".join("Q" if self.positions[row] == col else "." for col in range(self.n)))
+        print("-" * (2 * self.n - 1))
+
+## --------------------------------------------------
+## BƯỚC 3: SUDOKU
+## --------------------------------------------------
+
+ROW_OF = [i // 9 for i in range(81)]
+COL_OF = [i % 9 for i in range(81)]
+BOX_OF = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+# Với mỗi mask 9 bit: danh sách các bit được bật và số bit
+MASK_BITS = [[1 << d for d in range(9) if m >> d & 1] for m in range(512)]
+MASK_COUNT = [len(bits) for bits in MASK_BITS]
+
+def parse_puzzle(line):
+    """Chuỗi 81 ký tự ('0' hoặc '.' là ô trống, bỏ qua khoảng trắng) -> list 81 số."""
+    cells = [ch for ch in line if ch in '0123456789.']
+    if len(cells) < 81:
+        raise ValueError(f"cần 81 ô, chỉ có {len(cells)}: {line!r}")
+    return [0 if ch == '.' else int(ch) for ch in cells[:81]]
+
+def format_puzzle(cells):
+    return ''.join(str(v) if v else '.' for v in cells)
+
+class SudokuSolver(BacktrackingSolver):
+    def __init__(self, board):
+        # board: ma trận 9x9 như notebook, hoặc chuỗi / list 81 ô
+        if isinstance(board, str):
+            board = parse_puzzle(board)
+        if len(board) == 9:
+            self.board = board
+            cells = [v for row in board for v in row]
+        else:
+            cells = list(board)
+            self.board = [cells[r * 9:r * 9 + 9] for r in range(9)]
+        self.cells = cells
+        self.size = 9
+
+    def _root(self):
+        return tuple(self.cells)
+
+    @staticmethod
+    def _masks(cells):
+        """(rows, cols, boxes, empty) của một bàn, hoặc None nếu các số cho sẵn mâu thuẫn."""
+        rows, cols, boxes = [0] * 9, [0] * 9, [0] * 9
+        empty = []
+        for i, v in enumerate(cells):
+            if not v:
+                empty.append(i)
+                continue
+            bit = 1 << (v - 1)
+            r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return None
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+        return rows, cols, boxes, empty
+
+    def _children(self, state):
+        masks = self._masks(state)
+        if masks is None:
+            return []
+        rows, cols, boxes, empty = masks
+        if not empty:
+            return [(state, 1)]
+        best, best_mask = _most_constrained(empty, rows, cols, boxes)
+        cell = empty[best]
+        children = []
+        for bit in MASK_BITS[best_mask]:
+            child = list(state)
+            child[cell] = bit.bit_length()
+            children.append((tuple(child), 1))
+        return children
+
+    def _search_from(self, state, limit):
+        """(số lời giải tìm được, tối đa limit; lời giải đầu tiên hoặc None)."""
+        masks = self._masks(state)
+        if masks is None:
+            return 0, None
+        rows, cols, boxes, empty = masks
+        cells = list(state)
+        found = []
+        count = _search(cells, empty, rows, cols, boxes, limit, found)
+        return count, (found[0] if found else None)
+
+    def _count_from(self, state):
+        return self._search_from(state, float('inf'))[0]
+
+    def _first_from(self, state):
+        return self._search_from(state, 1)[1]
+
+    def count_solutions(self, limit=None, workers=None, split_depth=2):
+        """Số lời giải (dừng ở limit nếu có, VD limit=2 để kiểm tra lời giải duy nhất)."""
+        if limit is None:
+            return self.count(workers, split_depth)
+        return self._search_from(self._root(), limit)[0]
+
+    def solve(self, workers=None, split_depth=2):
+        """Hàm công khai để bắt đầu giải Sudoku: điền lời giải vào board, trả về board hoặc None."""
+        solution = self.first_solution(workers, split_depth)
+        if solution is None:
+            return None # Hoặc báo lỗi không giải được
+        self.cells = list(solution)
+        for r in range(9):
+            self.board[r][:] = solution[r * 9:r * 9 + 9]
+        return self.board
+
+    def print_board(self):
+        """Hàm phụ trợ để in bàn cờ ra màn hình."""
+        for i in range(self.size):
+            if i % 3 == 0 and i != 0:
+                print("- - - - - - - - - - -")
+            row = [str(v) for v in self.board[i]]
+            print(" | ".join(" ".join(row[j:j + 3]) for j in (0, 3, 6)))
+
+def _most_constrained(empty, rows, cols, boxes):
+    """Chỉ số (trong empty) của ô trống có ít ứng viên nhất và mask ứng viên của nó."""
+    best = 0
+    best_count = 10
+    best_mask = 0
+    for idx, cell in enumerate(empty):
+        mask = ~(rows[ROW_OF[cell]] | cols[COL_OF[cell]] | boxes[BOX_OF[cell]]) & 0x1FF
+        count = MASK_COUNT[mask]
+        if count < best_count:
+            best, best_count, best_mask = idx, count, mask
+            if count <= 1:
+                break
+    return best, best_mask
+
+def _search(cells, empty, rows, cols, boxes, limit, found):
+    if not empty:
+        if not found:
+            found.append(tuple(cells))
+        return 1
+    best, mask = _most_constrained(empty, rows, cols, boxes)
+    if not mask:
+        return 0
+    cell = empty[best]
+    # bỏ ô khỏi danh sách bằng cách đổi chỗ với phần tử cuối (O(1)), hoàn lại khi quay lui
+    empty[best], empty[-1] = empty[-1], empty[best]
+    empty.pop()
+    r, c, b = ROW_OF[cell], COL_OF[cell], BOX_OF[cell]
+    total = 0
+    for bit in MASK_BITS[mask]:
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+        cells[cell] = bit.bit_length()
+        total += _search(cells, empty, rows, cols, boxes, limit - total, found)
+        rows[r] ^= bit
+        cols[c] ^= bit
+        boxes[b] ^= bit
+        if total >= limit:
+            break
+    cells[cell] = 0
+    empty.append(cell)
+    empty[best], empty[-1] = empty[-1], empty[best]
+    return total
+
+def solve_puzzle(line):
+    """Một dòng đề -> chuỗi lời giải 81 ký tự, hoặc None nếu vô nghiệm."""
+    solution = SudokuSolver(parse_puzzle(line)).first_solution()
+    return format_puzzle(solution) if solution is not None else None
+
+def read_puzzles(path):
+    """Các đề trong tệp: mỗi dòng một đề 81 ký tự, bỏ qua dòng trống và dòng '#'."""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def solve_file(path, workers=None):
+    """Giải cả tệp đề, trả về [(đề, lời giải hoặc None)] theo thứ tự trong tệp."""
+    puzzles = read_puzzles(path)
+    if not workers or workers <= 1:
+        return [(p, solve_puzzle(p)) for p in puzzles]
+    with ProcessPoolExecutor(workers) as pool:
+        solutions = pool.map(solve_puzzle, puzzles, chunksize=max(1, len(puzzles) // (workers * 4)))
+        return list(zip(puzzles, solutions))
+
+
+# --- Ví dụ sử dụng ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="N-Queens counting and Sudoku solving with bitmask backtracking.")
+    parser.add_argument("--queens", type=int, help="count the solutions of N-Queens")
+    parser.add_argument("--sudoku-file", help="solve every puzzle in this file (one 81-character line each)")
+    parser.add_argument("--out", help="write the solutions of --sudoku-file here instead of stdout")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--split-depth", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.queens:
+        print(NQueensSolver(args.queens).count(args.workers, args.split_depth))
+    elif args.sudoku_file:
+        results = solve_file(args.sudoku_file, args.workers)
+        lines = [solution or f"unsolvable: {puzzle}" for puzzle, solution in results]
+        if args.out:
+            with open(args.out, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+        else:
+            print('\n'.join(lines))
+    else:
+        print("--- CÁC CÁCH XẾP CHO BÀN CỜ 4x4 ---")
+        NQueensSolver(4).solve_and_print()
+        print("\n" + "=" * 40 + "\n")
+        print(f"Số cách xếp 8x8 (chỉ đếm, không in): {NQueensSolver(8).count()}")
+
+        # 0 đại diện cho ô trống
+        puzzle = [
+            [5, 3, 0, 0, 7, 0, 0, 0, 0],
+            [6, 0, 0, 1, 9, 5, 0, 0, 0],
+            [0, 9, 8, 0, 0, 0, 0, 6, 0],
+            [8, 0, 0, 0, 6, 0, 0, 0, 3],
+            [4, 0, 0, 8, 0, 3, 0, 0, 1],
+            [7, 0, 0, 0, 2, 0, 0, 0, 6],
+            [0, 6, 0, 0, 0, 0, 2, 8, 0],
+            [0, 0, 0, 4, 1, 9, 0, 0, 5],
+            [0, 0, 0, 0, 8, 0, 0, 7, 9]
+        ]
+        solver = SudokuSolver(puzzle)
+        print("\nBàn cờ Sudoku ban đầu:")
+        solver.print_board()
+        if solver.solve():
+            print("\nGiải pháp tìm được:")
+            solver.print_board()
+        else:
+            print("\nKhông tìm thấy giải pháp cho Sudoku này.")
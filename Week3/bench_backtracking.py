@@ -0,0 +1,201 @@
+import os
+import time
+import argparse
+import tempfile
+import multiprocessing
+from backtracking_engine import NQueensSolver, SudokuSolver, parse_puzzle, solve_file
+
+# Đo bộ giải bitmask (backtracking_engine) so với thuật toán gốc của hai
+# notebook: đếm N-Hậu tới N=16 (tuần tự và chia nhánh cho nhiều tiến trình)
+# và giải các đề Sudoku khó. Mặc định dùng bộ đề khó có sẵn bên dưới; các tệp
+# chuẩn như top95.txt / hardest.txt (mỗi dòng 81 ký tự) truyền qua --sudoku-file.
+# Bản notebook của Sudoku chạy trong tiến trình riêng với giới hạn thời gian
+# vì có đề làm nó chạy rất lâu.
+
+QUEENS_COUNTS = [1, 0, 0, 2, 10, 4, 40, 92, 352, 724, 2680, 14200, 73712,
+                 365596, 2279184, 14772512]
+
+HARD_SUDOKU = {
+    'inkala-2012': "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    'ai-escargot': "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+    'easter-monster': "1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1",
+    'top95-1': "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    'top95-2': "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+    'top95-3': "6.....8.3.4.7.................5.4.7.3..2.....1.6.......2.....5.....8.6......1....",
+    'top95-4': "48.3............71.2.......7.5....6....2..8.............1.76...3.....4......5....",
+    'top95-5': "....14....3....2...7..........9...3.6.1.............8.2.....1.4....5.6.....7.8...",
+}
+
+class NotebookNQueens:
+    """Thuật toán của Nquanhau.ipynb (_is_safe quét lại các hàng trước), chỉ đếm."""
+    def __init__(self, n):
+        self.n = n
+        self.positions = [-1] * n
+        self.solution_count = 0
+
+    def count(self):
+        self.solution_count = 0
+        self._backtrack_solver(0)
+        return self.solution_count
+
+    def _is_safe(self, row, col):
+        for prev_row in range(row):
+            prev_col = self.positions[prev_row]
+            if prev_col == col or abs(row - prev_row) == abs(col - prev_col):
+                return False
+        return True
+
+    def _backtrack_solver(self, row):
+        if row == self.n:
+            self.solution_count += 1
+            return
+        for col in range(self.n):
+            if self._is_safe(row, col):
+                self.positions[row] = col
+                self._backtrack_solver(row + 1)
+
+class NotebookSudoku:
+    """Thuật toán của suduku.ipynb: tìm ô trống tuyến tính, kiểm tra hàng / cột / khối bằng vòng lặp."""
+    def __init__(self, board):
+        self.board = board
+        self.size = 9
+
+    def solve(self):
+        return self.board if self._solve_recursive() else None
+
+    def _find_empty_cell(self):
+        for r in range(self.size):
+            for c in range(self.size):
+                if self.board[r][c] == 0:
+                    return (r, c)
+        return None
+
+    def _is_valid_placement(self, row, col, num):
+        for c in range(self.size):
+            if self.board[row][c] == num:
+                return False
+        for r in range(self.size):
+            if self.board[r][col] == num:
+                return False
+        start_row, start_col = (row // 3) * 3, (col // 3) * 3
+        for r in range(start_row, start_row + 3):
+            for c in range(start_col, start_col + 3):
+                if self.board[r][c] == num:
+                    return False
+        return True
+
+    def _solve_recursive(self):
+        find = self._find_empty_cell()
+        if not find:
+            return True
+        row, col = find
+        for num in range(1, 10):
+            if self._is_valid_placement(row, col, num):
+                self.board[row][col] = num
+                if self._solve_recursive():
+                    return True
+                self.board[row][col] = 0
+        return False
+
+def notebook_sudoku(puzzle):
+    cells = parse_puzzle(puzzle)
+    start = time.perf_counter()
+    board = NotebookSudoku([cells[r * 9:r * 9 + 9] for r in range(9)]).solve()
+    return time.perf_counter() - start, board is not None
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def bench_queens(args):
+    print(f"{'N':>3}{'solutions':>11}{'notebook s':>12}{'bitmask s':>11}{f'{args.workers} workers s':>14}")
+    for n in range(args.min_n, args.max_n + 1):
+        expected = QUEENS_COUNTS[n - 1]
+        notebook = '-'
+        if n <= args.notebook_max_n:
+            seconds, count = timed(NotebookNQueens(n).count)
+            assert count == expected, n
+            notebook = f"{seconds:.3f}"
+        seconds, count = timed(NQueensSolver(n).count)
+        assert count == expected, n
+        parallel = '-'
+        if args.workers > 1:
+            parallel_seconds, count = timed(lambda: NQueensSolver(n).count(args.workers, args.split_depth))
+            assert count == expected, n
+            parallel = f"{parallel_seconds:.3f}"
+        print(f"{n:>3}{expected:>11}{notebook:>12}{seconds:>11.3f}{parallel:>14}")
+
+def bench_sudoku(args):
+    if args.sudoku_file:
+        with open(args.sudoku_file) as f:
+            lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        puzzles = {f"#{i + 1}": line for i, line in enumerate(lines)}
+    else:
+        puzzles = HARD_SUDOKU
+    print(f"\n{'puzzle':<16}{'notebook s':>12}{'bitmask+MRV s':>15}{'unique':>8}")
+    pool = multiprocessing.Pool(1) if args.notebook_timeout > 0 else None
+    total = 0.0
+    try:
+        for name, puzzle in puzzles.items():
+            notebook = '-'
+            if pool is not None:
+                job = pool.apply_async(notebook_sudoku, (puzzle,))
+                try:
+                    seconds, solved = job.get(timeout=args.notebook_timeout)
+                    notebook = f"{seconds:.3f}" if solved else 'unsolved'
+                except multiprocessing.TimeoutError:
+                    notebook = f">{args.notebook_timeout:g}"
+                    pool.terminate()
+                    pool = multiprocessing.Pool(1)
+            solver = SudokuSolver(puzzle)
+            seconds, solution = timed(solver.first_solution)
+            total += seconds
+            unique = SudokuSolver(puzzle).count_solutions(limit=2) == 1
+            print(f"{name:<16}{notebook:>12}{seconds:>15.4f}{'yes' if unique else 'no':>8}")
+    finally:
+        if pool is not None:
+            pool.terminate()
+    print(f"bitmask+MRV total {total:.3f}s for {len(puzzles)} puzzles")
+
+    # Chế độ lô: cả tệp đề, tuần tự và trên nhiều tiến trình
+    path = args.sudoku_file
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(handle, 'w') as f:
+            f.write('\n'.join(list(puzzles.values()) * args.batch_repeat) + '\n')
+    try:
+        for workers in sorted({1, args.workers}):
+            seconds, results = timed(lambda: solve_file(path, workers))
+            solved = sum(1 for _, solution in results if solution)
+            print(f"solve_file, {workers} worker(s): {len(results)} puzzles, {solved} solved, "
+                  f"{seconds:.2f}s ({len(results) / seconds:.1f} puzzles/s)")
+    finally:
+        if args.sudoku_file is None:
+            os.remove(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bitmask N-Queens and Sudoku solvers.")
+    parser.add_argument("--min-n", type=int, default=4)
+    parser.add_argument("--max-n", type=int, default=13, help="up to 16")
+    parser.add_argument("--notebook-max-n", type=int, default=10,
+                        help="largest N for the notebook N-Queens solver")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--split-depth", type=int, default=3)
+    parser.add_argument("--sudoku-file", help="one 81-character puzzle per line (e.g. top95.txt)")
+    parser.add_argument("--notebook-timeout", type=float, default=20.0,
+                        help="seconds per puzzle for the notebook Sudoku solver (0 skips it)")
+    parser.add_argument("--batch-repeat", type=int, default=10,
+                        help="copies of the built-in set in the batch file")
+    parser.add_argument("--skip-queens", action="store_true")
+    parser.add_argument("--skip-sudoku", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_queens:
+        bench_queens(args)
+    if not args.skip_sudoku:
+        bench_sudoku(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import sys
+import json
+import math
+import time
+import random
+import argparse
+from multiply_large_integer import (LimbInt, Multiplier, multiply_strings, karatsuba_multiply,
+                                    KARATSUBA_THRESHOLD, TOOM3_THRESHOLD, LIMB_BITS)
+
+# So sánh từng thuật toán của multiply_large_integer (ép dùng một thuật toán
+# bằng cách tắt các ngưỡng khác) với phép nhân int có sẵn của Python và hai
+# hàm gốc của notebook, từ 10 đến 10^6 chữ số thập phân. Một thuật toán bị
+# bỏ ở các kích thước lớn hơn khi một lần nhân đã vượt --budget giây.
+#   --tune   tìm điểm giao giữa các thuật toán (đơn vị limb) để đặt ngưỡng
+#   --batch  so sánh multiply_many (dùng lại biến đổi NTT) với gọi lẻ từng cặp
+#   --plot   vẽ đồ thị log-log nếu đã cài matplotlib
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+if hasattr(sys, 'set_int_max_str_digits'):
+    # các hàm của notebook đổi qua chuỗi thập phân
+    sys.set_int_max_str_digits(0)
+
+DIGIT_BITS = math.log2(10)
+
+def limb_method(multiplier):
+    def run(x, y, lx, ly):
+        return multiplier.multiply(lx, ly)
+    return run
+
+METHODS = {
+    'int': lambda x, y, lx, ly: x * y,
+    'notebook-strings': lambda x, y, lx, ly: multiply_strings(str(x), str(y)),
+    'notebook-karatsuba': lambda x, y, lx, ly: karatsuba_multiply(x, y),
+    'schoolbook': limb_method(Multiplier(karatsuba=None, toom3=None, ntt=None)),
+    'karatsuba': limb_method(Multiplier(KARATSUBA_THRESHOLD, toom3=None, ntt=None)),
+    'toom3': limb_method(Multiplier(KARATSUBA_THRESHOLD, TOOM3_THRESHOLD, ntt=None)),
+    'ntt': limb_method(Multiplier(ntt=0)),
+    'auto': limb_method(Multiplier()),
+}
+
+def time_call(fn, min_time):
+    """Thời gian một lần gọi: lặp cho tới khi tổng vượt min_time."""
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        result = fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs, result
+
+def operands(bits, rng):
+    # bit cao nhất luôn bật để đúng số chữ số yêu cầu
+    x = rng.getrandbits(bits) | (1 << (bits - 1))
+    y = rng.getrandbits(bits) | (1 << (bits - 1))
+    return x, y
+
+def run_sizes(args):
+    rng = random.Random(args.seed)
+    results = {name: [] for name in args.methods}
+    over_budget = set()
+    print(f"{'digits':>9}{'limbs':>8}" + ''.join(f"{name:>20}" for name in args.methods))
+    for digits in args.digits:
+        bits = max(int(digits * DIGIT_BITS), 1)
+        x, y = operands(bits, rng)
+        lx, ly = LimbInt.from_int(x), LimbInt.from_int(y)
+        expected = x * y
+        cells = []
+        for name in args.methods:
+            if name in over_budget:
+                cells.append(f"{'-':>20}")
+                continue
+            seconds, result = time_call(lambda: METHODS[name](x, y, lx, ly), args.min_time)
+            value = int(result) if isinstance(result, str) else result
+            assert value == expected, (name, digits)
+            results[name].append((digits, seconds))
+            if seconds > args.budget:
+                over_budget.add(name)
+            cells.append(f"{seconds:>20.6f}")
+        print(f"{digits:>9}{len(lx):>8}" + ''.join(cells))
+    return results
+
+def tune(args):
+    """
+    Điểm giao: kích thước (limb) nhỏ nhất mà một tầng của thuật toán nhanh
+    hơn (các nửa / phần ba rơi về thuật toán chậm hơn) thắng thuật toán chậm.
+    """
+    rng = random.Random(args.seed)
+    sizes = []
+    n = 8
+    while n <= args.tune_max:
+        sizes.append(n)
+        n = int(n * 1.25) + 1
+
+    def crossover(name, slow, fast, start):
+        # thắng ít nhất 3% ở hai kích thước liên tiếp, tránh nhiễu đo
+        first = None
+        for n in sizes:
+            if n < start:
+                continue
+            x, y = operands(n * LIMB_BITS, rng)
+            lx, ly = LimbInt.from_int(x), LimbInt.from_int(y)
+            slow_time, _ = time_call(lambda: slow.multiply(lx, ly), args.min_time)
+            fast_time, _ = time_call(lambda: fast(n).multiply(lx, ly), args.min_time)
+            if fast_time < slow_time * 0.97:
+                if first is not None:
+                    print(f"{name}: {first} limbs ({slow_time * 1e3:.3f} ms -> {fast_time * 1e3:.3f} ms at {n})")
+                    return first
+                first = n
+            else:
+                first = None
+        print(f"{name}: no crossover up to {args.tune_max} limbs")
+        return None
+
+    k = crossover('karatsuba', Multiplier(None, None, None),
+                  lambda n: Multiplier(n, None, None), 4) or KARATSUBA_THRESHOLD
+    t = crossover('toom3', Multiplier(k, None, None),
+                  lambda n: Multiplier(k, n, None), k) or TOOM3_THRESHOLD
+    nt = crossover('ntt', Multiplier(k, t, None), lambda n: Multiplier(k, t, 0), t)
+    print(f"suggested: Multiplier(karatsuba={k}, toom3={t}, ntt={nt})")
+
+def batch(args):
+    rng = random.Random(args.seed)
+    bits = int(args.batch_digits * DIGIT_BITS)
+    shared = LimbInt.from_int(operands(bits, rng)[0])
+    others = [LimbInt.from_int(operands(bits, rng)[0]) for _ in range(args.batch_size)]
+    pairs = [(shared, other) for other in others]
+    multiplier = Multiplier()
+    single, _ = time_call(lambda: [multiplier.multiply(a, b) for a, b in pairs], args.min_time)
+    batched, products = time_call(lambda: multiplier.multiply_many(pairs), args.min_time)
+    assert [p.to_int() for p in products] == [shared.to_int() * o.to_int() for o in others]
+    print(f"batch of {args.batch_size} products with one shared {args.batch_digits}-digit operand: "
+          f"one by one {single:.3f}s, multiply_many {batched:.3f}s ({single / batched:.2f}x)")
+
+def plot(results, path):
+    if plt is None:
+        print("matplotlib is not installed; skipping the plot")
+        return
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for name, points in results.items():
+        if points:
+            ax.plot([d for d, _ in points], [s for _, s in points], marker='o', label=name)
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('decimal digits per operand')
+    ax.set_ylabel('seconds per product')
+    ax.legend()
+    ax.grid(True, which='both', alpha=0.3)
+    fig.savefig(path, dpi=120, bbox_inches='tight')
+    print(f"plot written to {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the limb multiplication engine against Python int.")
+    parser.add_argument("--digits", type=int, nargs='+',
+                        default=[10, 30, 100, 300, 1000, 3000, 10000, 30000, 100000, 300000, 1000000])
+    parser.add_argument("--methods", nargs='+', default=list(METHODS), choices=list(METHODS))
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="drop a method for larger sizes once one product takes longer than this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="repeat fast products for at least this long")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the timings to this file")
+    parser.add_argument("--plot", help="write a log-log plot to this file (needs matplotlib)")
+    parser.add_argument("--tune", action="store_true", help="search the crossover thresholds instead")
+    parser.add_argument("--tune-max", type=int, default=4000, help="largest size (limbs) tried by --tune")
+    parser.add_argument("--batch", action="store_true", help="also time multiply_many against single calls")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--batch-digits", type=int, default=50000)
+    args = parser.parse_args()
+
+    if args.tune:
+        tune(args)
+        return
+    results = run_sizes(args)
+    if args.batch:
+        batch(args)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.plot:
+        plot(results, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+import sys
+from array import array
+from itertools import repeat
+from operator import add, sub, mul
+
+# Nhân số nguyên lớn (bản module của Multiply_large_interger.ipynb).
+#
+# Notebook làm việc trên chữ số thập phân: multiply_strings nhân từng cặp chữ
+# số, karatsuba_multiply gọi len(str(x)) và tính 10**m ở mỗi tầng đệ quy -
+# hai việc này tốn hơn chính phép tách mà chúng phục vụ. Ở đây số được lưu
+# thành mảng "limb" cơ số 2^16 (array('H'), limb thấp trước), chuyển đổi với
+# int qua to_bytes / from_bytes. Phép nhân coi hai mảng limb là hai đa thức:
+# nhân đa thức (hệ số không giới hạn nhờ int của Python, được phép âm trong
+# Toom-3) rồi chỉ xử lý số nhớ một lần ở cuối. Thuật toán được chọn theo số
+# limb của toán hạng nhỏ hơn:
+#   < karatsuba            nhân tay (mỗi hàng là một map() trên cả mảng)
+#   < toom3                Karatsuba, 3 phép nhân nửa kích thước
+#   < ntt                  Toom-3, 5 phép nhân một phần ba kích thước
+#   >= ntt                 NTT modulo số nguyên tố Goldilocks 2^64 - 2^32 + 1
+# Các ngưỡng chỉnh được qua Multiplier(karatsuba=..., toom3=..., ntt=...).
+
+LIMB_BITS = 16
+LIMB_MASK = (1 << LIMB_BITS) - 1
+
+# p - 1 = 2^32 * (2^32 - 1) nên có căn bậc 2^k của đơn vị với mọi k <= 32;
+# 7 là phần tử sinh. Hệ số của tích hai đa thức limb không vượt quá
+# n * (2^16 - 1)^2 < p với n < 2^32, nên một số nguyên tố là đủ (không cần CRT).
+NTT_PRIME = (1 << 64) - (1 << 32) + 1
+NTT_ROOT = 7
+
+# Ngưỡng mặc định (đơn vị: limb của toán hạng ngắn hơn), đo bằng bench_multiply.py
+KARATSUBA_THRESHOLD = 48
+TOOM3_THRESHOLD = 120
+NTT_THRESHOLD = 700
+
+## --------------------------------------------------
+## BƯỚC 1: BIỂU DIỄN SỐ BẰNG MẢNG LIMB
+## --------------------------------------------------
+
+class LimbInt:
+    """Số nguyên có dấu: mảng limb cơ số 2^16 (limb thấp trước, không có limb 0 ở đầu cao)."""
+    __slots__ = ('limbs', 'negative')
+
+    def __init__(self, limbs=(), negative=False):
+        self.limbs = limbs if isinstance(limbs, array) else array('H', limbs)
+        _strip(self.limbs)
+        self.negative = negative and bool(self.limbs)
+
+    @classmethod
+    def from_int(cls, x):
+        data = abs(x).to_bytes((abs(x).bit_length() + 15) // 16 * 2, 'little')
+        limbs = array('H')
+        limbs.frombytes(data)
+        if sys.byteorder == 'big':
+            limbs.byteswap()
+        return cls(limbs, x < 0)
+
+    def to_int(self):
+        limbs = self.limbs
+        if sys.byteorder == 'big':
+            limbs = array('H', limbs)
+            limbs.byteswap()
+        value = int.from_bytes(limbs.tobytes(), 'little')
+        return -value if self.negative else value
+
+    __int__ = to_int
+
+    def __len__(self):
+        return len(self.limbs)
+
+    def bit_length(self):
+        if not self.limbs:
+            return 0
+        return (len(self.limbs) - 1) * LIMB_BITS + self.limbs[-1].bit_length()
+
+    def __eq__(self, other):
+        if isinstance(other, int):
+            return self.to_int() == other
+        if isinstance(other, LimbInt):
+            return self.negative == other.negative and self.limbs == other.limbs
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.to_int())
+
+    def __mul__(self, other):
+        if isinstance(other, (int, LimbInt)):
+            return default_multiplier.multiply(self, other)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __str__(self):
+        # Đổi sang thập phân qua int (Python 3.11+ giới hạn 4300 chữ số,
+        # xem sys.set_int_max_str_digits)
+        return str(self.to_int())
+
+    def __repr__(self):
+        return f"LimbInt({len(self.limbs)} limbs, {self.bit_length()} bits)"
+
+def _strip(limbs):
+    while limbs and not limbs[-1]:
+        limbs.pop()
+
+def _as_limb_int(x):
+    return x if isinstance(x, LimbInt) else LimbInt.from_int(x)
+
+def _carry(coeffs):
+    """Hệ số đa thức (có thể > 2^16) -> mảng limb đã chuẩn hóa."""
+    out = array('H')
+    append = out.append
+    carry = 0
+    for c in coeffs:
+        carry += c
+        append(carry & LIMB_MASK)
+        carry >>= LIMB_BITS
+    while carry:
+        append(carry & LIMB_MASK)
+        carry >>= LIMB_BITS
+    _strip(out)
+    return out
+
+## --------------------------------------------------
+## BƯỚC 2: PHÉP TOÁN TRÊN VECTOR HỆ SỐ
+## --------------------------------------------------
+
+def _vadd(x, y):
+    if len(x) < len(y):
+        x, y = y, x
+    return list(map(add, x, y)) + x[len(y):]
+
+def _vsub(x, y):
+    if len(y) > len(x):
+        x = x + [0] * (len(y) - len(x))
+    return list(map(sub, x, y)) + x[len(y):]
+
+def _add_into(res, part, offset):
+    end = offset + len(part)
+    if end > len(res):
+        res.extend(repeat(0, end - len(res)))
+    res[offset:end] = map(add, res[offset:end], part)
+
+def _schoolbook(a, b):
+    """Nhân tay O(m * n); vòng lặp Python chạy trên toán hạng ngắn, mỗi hàng là một map()."""
+    if len(a) < len(b):
+        a, b = b, a
+    la = len(a)
+    res = [0] * (la + len(b) - 1)
+    for j, bj in enumerate(b):
+        if bj:
+            res[j:j + la] = map(add, res[j:j + la], map(mul, a, repeat(bj)))
+    return res
+
+## --------------------------------------------------
+## BƯỚC 3: NTT TRÊN Z_p
+## --------------------------------------------------
+
+def _ntt_forward(a, roots):
+    """
+    Biến đổi thuận tại chỗ (Gentleman-Sande, vào tự nhiên -> ra đảo bit).
+    Mỗi tầng xử lý bằng list comprehension trên các lát cắt: theo từng khối
+    khi khối dài, theo từng vị trí j (lát cắt bước 2h) khi khối ngắn, nên
+    số vòng lặp Python mỗi tầng không quá sqrt(n).
+    """
+    p = NTT_PRIME
+    n = len(a)
+    h = n // 2
+    while h:
+        step = n // (2 * h)
+        w = roots[::step]
+        if h >= step:
+            for s in range(0, n, 2 * h):
+                u, v = a[s:s + h], a[s + h:s + 2 * h]
+                a[s:s + h] = [(x + y) % p for x, y in zip(u, v)]
+                a[s + h:s + 2 * h] = [(x - y) * t % p for x, y, t in zip(u, v, w)]
+        else:
+            for j in range(h):
+                u, v, t = a[j::2 * h], a[j + h::2 * h], w[j]
+                a[j::2 * h] = [(x + y) % p for x, y in zip(u, v)]
+                a[j + h::2 * h] = [(x - y) * t % p for x, y in zip(u, v)]
+        h //= 2
+
+def _ntt_inverse(a, inv_roots):
+    """Biến đổi ngược tại chỗ (Cooley-Tukey, vào đảo bit -> ra tự nhiên), chưa chia n."""
+    p = NTT_PRIME
+    n = len(a)
+    h = 1
+    while h < n:
+        step = n // (2 * h)
+        w = inv_roots[::step]
+        if h >= step:
+            for s in range(0, n, 2 * h):
+                u = a[s:s + h]
+                v = [y * t % p for y, t in zip(a[s + h:s + 2 * h], w)]
+                a[s:s + h] = [(x + y) % p for x, y in zip(u, v)]
+                a[s + h:s + 2 * h] = [(x - y) % p for x, y in zip(u, v)]
+        else:
+            for j in range(h):
+                u, t = a[j::2 * h], w[j]
+                v = [y * t % p for y in a[j + h::2 * h]]
+                a[j::2 * h] = [(x + y) % p for x, y in zip(u, v)]
+                a[j + h::2 * h] = [(x - y) % p for x, y in zip(u, v)]
+        h *= 2
+
+## --------------------------------------------------
+## BƯỚC 4: BỘ NHÂN CHỌN THUẬT TOÁN THEO KÍCH THƯỚC
+## --------------------------------------------------
+
+class Multiplier:
+    """
+    Nhân LimbInt (hoặc int) với ngưỡng chuyển thuật toán tùy chỉnh, tính
+    theo số limb của toán hạng ngắn hơn. Đặt một ngưỡng bằng None để tắt
+    thuật toán đó; ntt=0 luôn dùng NTT.
+    """
+    def __init__(self, karatsuba=KARATSUBA_THRESHOLD, toom3=TOOM3_THRESHOLD, ntt=NTT_THRESHOLD):
+        self.karatsuba_threshold = max(karatsuba, 2) if karatsuba is not None else None
+        self.toom3_threshold = max(toom3, 3) if toom3 is not None else None
+        self.ntt_threshold = ntt
+        self._ntt_tables = {}   # n -> (roots, inv_roots, n^-1 mod p)
+
+    def multiply(self, x, y):
+        return self._multiply(_as_limb_int(x), _as_limb_int(y), None)
+
+    def multiply_many(self, pairs):
+        """
+        Tích của nhiều cặp (x, y). Toán hạng xuất hiện nhiều lần (cùng một
+        đối tượng) chỉ được chuyển sang limb và biến đổi NTT một lần;
+        bảng căn của đơn vị được dùng chung giữa các cặp cùng kích thước.
+        """
+        converted = {}
+        transforms = {}
+        results = []
+        for x, y in pairs:
+            operands = []
+            for v in (x, y):
+                entry = converted.get(id(v))
+                if entry is None:
+                    # giữ cả v để id(v) không bị đối tượng khác dùng lại trong lô
+                    entry = converted[id(v)] = (v, _as_limb_int(v))
+                operands.append(entry[1])
+            results.append(self._multiply(operands[0], operands[1], transforms))
+        return results
+
+    def _multiply(self, x, y, transforms):
+        negative = x.negative != y.negative
+        if not x.limbs or not y.limbs:
+            return LimbInt()
+        if len(x.limbs) < len(y.limbs):
+            x, y = y, x
+        if self.ntt_threshold is not None and len(y.limbs) >= self.ntt_threshold:
+            coeffs = self._ntt_multiply(x, y, transforms)
+        else:
+            coeffs = self._mul(list(x.limbs), list(y.limbs))
+        return LimbInt(_carry(coeffs), negative)
+
+    def _mul(self, a, b):
+        """Tích đa thức của hai vector hệ số (đệ quy cho Karatsuba / Toom-3)."""
+        if len(a) < len(b):
+            a, b = b, a
+        la, lb = len(a), len(b)
+        if self.karatsuba_threshold is None or lb < self.karatsuba_threshold:
+            return _schoolbook(a, b)
+        if 2 * lb <= la:
+            # Toán hạng lệch kích thước: cắt a thành các khối dài lb
+            res = [0] * (la + lb - 1)
+            for s in range(0, la, lb):
+                _add_into(res, self._mul(a[s:s + lb], b), s)
+            return res
+        if lb < la:
+            b = b + [0] * (la - lb)
+        if self.toom3_threshold is None or lb < self.toom3_threshold:
+            res = self._karatsuba(a, b)
+        else:
+            res = self._toom3(a, b)
+        del res[la + lb - 1:]   # hệ số cao do phần đệm 0 đều bằng 0
+        return res
+
+    def _karatsuba(self, a, b):
+        # a = a0 + a1 x^m, b = b0 + b1 x^m; (a0+a1)(b0+b1) - a0b0 - a1b1 = a0b1 + a1b0
+        m = len(a) // 2
+        a0, a1, b0, b1 = a[:m], a[m:], b[:m], b[m:]
+        z0 = self._mul(a0, b0)
+        z2 = self._mul(a1, b1)
+        z1 = _vsub(_vsub(self._mul(_vadd(a0, a1), _vadd(b0, b1)), z0), z2)
+        res = z0 + [0] * (2 * len(a) - 1 - len(z0))
+        _add_into(res, z1, m)
+        _add_into(res, z2, 2 * m)
+        return res
+
+    def _toom3(self, a, b):
+        # Chia mỗi toán hạng thành 3 phần, tính giá trị tại 0, 1, -1, -2, vô cùng,
+        # nhân 5 cặp rồi nội suy (dãy phép tính của Bodrato, các phép chia đều chẵn)
+        k = (len(a) + 2) // 3
+
+        def evaluate(v):
+            v0, v1, v2 = v[:k], v[k:2 * k], v[2 * k:]
+            t = _vadd(v0, v2)
+            m1 = _vsub(t, v1)
+            m2 = _vsub([2 * c for c in _vadd(m1, v2)], v0)
+            return v0, _vadd(t, v1), m1, m2, v2
+
+        pa, pb = evaluate(a), evaluate(b)
+        r0, r1, rm1, rm2, rinf = [self._mul(x, y) if x and y else [] for x, y in zip(pa, pb)]
+        r3 = [c // 3 for c in _vsub(rm2, r1)]
+        r1 = [c // 2 for c in _vsub(r1, rm1)]
+        r2 = _vsub(rm1, r0)
+        r3 = _vadd([c // 2 for c in _vsub(r2, r3)], [2 * c for c in rinf])
+        r2 = _vsub(_vadd(r2, r1), rinf)
+        r1 = _vsub(r1, r3)
+        res = r0 + [0] * (2 * len(a) - 1 - len(r0))
+        for i, part in enumerate((r1, r2, r3, rinf), 1):
+            _add_into(res, part, i * k)
+        return res
+
+    def ntt_tables(self, n):
+        tables = self._ntt_tables.get(n)
+        if tables is None:
+            p = NTT_PRIME
+            w = pow(NTT_ROOT, (p - 1) // n, p)
+            half = n // 2
+            roots = [1] * max(half, 1)
+            for i in range(1, half):
+                roots[i] = roots[i - 1] * w % p
+            # w^-j = w^(n-j) = -w^(n/2-j)
+            inv_roots = [1] + [p - roots[half - j] for j in range(1, half)]
+            tables = self._ntt_tables[n] = (roots, inv_roots, pow(n, p - 2, p))
+        return tables
+
+    def _transform(self, x, n, transforms):
+        key = (id(x), n)
+        if transforms is not None and key in transforms:
+            return transforms[key][1]
+        roots = self.ntt_tables(n)[0]
+        fx = list(x.limbs)
+        fx.extend(repeat(0, n - len(fx)))
+        _ntt_forward(fx, roots)
+        if transforms is not None:
+            transforms[key] = (x, fx)
+        return fx
+
+    def _ntt_multiply(self, x, y, transforms):
+        p = NTT_PRIME
+        size = len(x.limbs) + len(y.limbs) - 1
+        n = 1 << (size - 1).bit_length()
+        _, inv_roots, n_inv = self.ntt_tables(n)
+        fx = self._transform(x, n, transforms)
+        fy = fx if y is x else self._transform(y, n, transforms)
+        prod = [u * v % p for u, v in zip(fx, fy)]
+        _ntt_inverse(prod, inv_roots)
+        return [c * n_inv % p for c in prod[:size]]
+
+default_multiplier = Multiplier()
+
+def multiply(x, y):
+    """x * y (int hoặc LimbInt) với các ngưỡng mặc định, trả về LimbInt."""
+    return default_multiplier.multiply(x, y)
+
+def multiply_many(pairs):
+    return default_multiplier.multiply_many(pairs)
+
+## --------------------------------------------------
+## BƯỚC 5: CÁC HÀM GỐC CỦA NOTEBOOK (để so sánh)
+## --------------------------------------------------
+
+def multiply_strings(num1: str, num2: str) -> str:
+    """
+    Nhân hai số nguyên lớn được biểu diễn dưới dạng chuỗi.
+    Thuật toán: Nhân tay (Schoolbook Long Multiplication)
+    Độ phức tạp: O(m * n)
+    """
+    if num1 == "0" or num2 == "0":
+        return "0"
+    m = len(num1)
+    n = len(num2)
+    result = [0] * (m + n)
+    for i in range(m - 1, -1, -1):
+        for j in range(n - 1, -1, -1):
+            total_sum = int(num1[i]) * int(num2[j]) + result[i + j + 1]
+            result[i + j + 1] = total_sum % 10
+            result[i + j] += total_sum // 10
+    start_index = 0
+    while start_index < len(result) and result[start_index] == 0:
+        start_index += 1
+    if start_index == len(result):
+        return "0"
+    return "".join(map(str, result[start_index:]))
+
+def karatsuba_multiply(x: int, y: int) -> int:
+    """
+    Nhân hai số nguyên lớn x và y bằng thuật toán Karatsuba (trên chữ số thập phân).
+    """
+    if x < 10 or y < 10:
+        return x * y
+    n = max(len(str(x)), len(str(y)))
+    m = n // 2
+    power_of_10_m = 10**m
+    a, b = x // power_of_10_m, x % power_of_10_m
+    c, d = y // power_of_10_m, y % power_of_10_m
+    P1 = karatsuba_multiply(a, c)
+    P2 = karatsuba_multiply(b, d)
+    P3 = karatsuba_multiply(a + b, c + d)
+    middle_term = P3 - P1 - P2
+    return (P1 * 10**(2 * m)) + (middle_term * power_of_10_m) + P2
+
+
+# --- Ví dụ sử dụng ---
+if __name__ == "__main__":
+    import random
+
+    num1 = 123456789
+    num2 = 987654321
+    print(f"'{num1}' * '{num2}' = {multiply_strings(str(num1), str(num2))}")
+    print(f"Tích (Karatsuba): {karatsuba_multiply(num1, num2)}")
+    print(f"Tích (LimbInt):   {multiply(num1, num2)}")
+    print(f"Tích (Python '*'): {num1 * num2}")
+
+    rng = random.Random(0)
+    for bits in (100, 5000, 40000, 200000):
+        x, y = rng.getrandbits(bits), rng.getrandbits(bits)
+        for name, multiplier in (("auto", default_multiplier),
+                                 ("karatsuba", Multiplier(toom3=None, ntt=None)),
+                                 ("toom3", Multiplier(ntt=None)),
+                                 ("ntt", Multiplier(ntt=0))):
+            assert multiplier.multiply(x, y) == x * y, (bits, name)
+        print(f"{bits} bit: khớp với int ở mọi thuật toán")